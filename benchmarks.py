@@ -0,0 +1,184 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains benchmarks of scoring boards. Running it prints how many
+boards per second each way of scoring every goal manages, how many moves per
+second a MoveEvaluator evaluates, for boards of several depths, and how long a
+SmartPlayer turn takes on different numbers of processes.
+"""
+import random
+import time
+from typing import Callable, Dict, List
+
+from actions import ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, \
+    SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, PAINT, COMBINE
+from block import Block, generate_board, generate_boards
+from goal import BlobGoal, Goal, PerimeterGoal, score_all, score_boards
+from player import SmartPlayer
+from search import MoveEvaluator
+from settings import COLOUR_LIST
+
+
+def _one_goal_at_a_time(boards: List[Block], goals: List[Goal]) -> None:
+    """Score every goal in <goals> on every board in <boards> with
+    Goal.score.
+    """
+    for board in boards:
+        for goal in goals:
+            goal.score(board)
+
+
+def _one_board_at_a_time(boards: List[Block], goals: List[Goal]) -> None:
+    """Score every goal in <goals> on every board in <boards> with score_all.
+    """
+    for board in boards:
+        score_all(board, goals)
+
+
+# The ways of scoring boards that are compared, by name.
+_SCORERS: Dict[str, Callable[[List[Block], List[Goal]], object]] = {
+    'Goal.score': _one_goal_at_a_time,
+    'score_all': _one_board_at_a_time,
+    'score_boards': score_boards
+}
+
+
+def boards_per_second(n: int, max_depth: int, seed: int = 148,
+                      repeats: int = 3) -> Dict[str, float]:
+    """Return the number of boards per second each way of scoring boards
+    manages, when scoring a PerimeterGoal and a BlobGoal of every colour on
+    <n> boards with a depth of <max_depth>.
+
+    The boards are generated from <seed>, and each way is timed over
+    <repeats> runs, keeping the fastest.
+    """
+    boards = generate_boards(n, max_depth, 750, seed)
+    goals = [PerimeterGoal(colour) for colour in COLOUR_LIST] + \
+        [BlobGoal(colour) for colour in COLOUR_LIST]
+
+    rates = {}
+    for name, scorer in _SCORERS.items():
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            scorer(boards, goals)
+            best = min(best, time.perf_counter() - start)
+        rates[name] = n / best
+    return rates
+
+
+def report(n: int, depths: List[int]) -> None:
+    """Print the boards per second of each way of scoring <n> boards, for
+    boards of each depth in <depths>.
+    """
+    print(f'{"depth":>5}' + ''.join(f'{name:>14}' for name in _SCORERS))
+    for max_depth in depths:
+        rates = boards_per_second(n, max_depth)
+        print(f'{max_depth:>5}' +
+              ''.join(f'{rates[name]:>14,.0f}' for name in _SCORERS))
+
+
+def evaluations_per_second(n: int, max_depth: int, seed: int = 148) \
+        -> Dict[str, float]:
+    """Return the number of moves per second a MoveEvaluator evaluates for
+    each kind of goal, when evaluating <n> random moves on a board with a
+    depth of <max_depth> generated from <seed>.
+    """
+    random.seed(seed)
+    board = generate_board(max_depth, 750)
+    actions = [ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, SWAP_HORIZONTAL,
+               SWAP_VERTICAL, SMASH, COMBINE, PAINT]
+
+    rates = {}
+    for goal in [PerimeterGoal(COLOUR_LIST[0]), BlobGoal(COLOUR_LIST[0])]:
+        evaluator = MoveEvaluator(board, goal)
+        blocks = list(evaluator.board.iter_nodes())
+        for _ in range(n):
+            action = random.choice(actions)
+            evaluator.evaluate((action[0], action[1], random.choice(blocks)))
+        rates[type(goal).__name__] = evaluator.evaluations_per_second()
+    return rates
+
+
+def report_evaluations(n: int, depths: List[int]) -> None:
+    """Print the moves per second a MoveEvaluator evaluates for each kind of
+    goal, over <n> moves on a board of each depth in <depths>.
+    """
+    print(f'{"depth":>5}{"PerimeterGoal":>14}{"BlobGoal":>14}')
+    for max_depth in depths:
+        rates = evaluations_per_second(n, max_depth)
+        print(f'{max_depth:>5}{rates["PerimeterGoal"]:>14,.0f}'
+              f'{rates["BlobGoal"]:>14,.0f}')
+
+
+def seconds_per_turn(difficulty: int, max_depth: int, processes: int,
+                     turns: int = 3, seed: int = 148) -> float:
+    """Return the average number of seconds a SmartPlayer with <difficulty>
+    and <processes> processes takes to choose a move, over <turns> turns on
+    a board with a depth of <max_depth> generated from <seed>.
+
+    The first turn, which starts the processes, is not timed.
+    """
+    random.seed(seed)
+    board = generate_board(max_depth, 750)
+    player = SmartPlayer(0, BlobGoal(COLOUR_LIST[0]), difficulty, processes)
+    try:
+        player._proceed = True
+        player.generate_move(board)
+        start = time.perf_counter()
+        for _ in range(turns):
+            player._proceed = True
+            player.generate_move(board)
+        return (time.perf_counter() - start) / turns
+    finally:
+        player.close()
+
+
+def report_processes(difficulty: int, max_depth: int,
+                     processes: List[int]) -> None:
+    """Print how long a SmartPlayer with <difficulty> takes to choose a move
+    on a board with a depth of <max_depth>, and the speedup over one process,
+    for each number of processes in <processes>.
+    """
+    print(f'{"processes":>9}{"seconds":>10}{"speedup":>10}')
+    serial = seconds_per_turn(difficulty, max_depth, 1)
+    for n in processes:
+        seconds = serial if n == 1 else \
+            seconds_per_turn(difficulty, max_depth, n)
+        print(f'{n:>9}{seconds:>10.3f}{serial / seconds:>10.2f}')
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['report', 'report_evaluations', 'report_processes'],
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'random', 'typing', 'time', 'actions',
+            'block', 'goal', 'player', 'search', 'settings'
+        ]
+    })
+
+    report(2000, [2, 3, 4, 5, 6])
+    print()
+    report_evaluations(2000, [2, 3, 4, 5, 6])
+    print()
+    report_processes(500, 6, [1, 2, 4, 8])
@@ -0,0 +1,137 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains the Bitboard class, a view of a Blocky board as one bitmask
+of unit cells per colour, for scoring goals with whole-board bit operations.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from block import Block
+from settings import COLOUR_LIST
+
+# The masks used by Bitboards of each width, created the first time a Bitboard
+# of that width is needed. See _masks for what they are.
+_MASKS: Dict[int, Tuple[int, int]] = {}
+
+
+def _masks(width: int) -> Tuple[int, int]:
+    """Return the masks for a Bitboard that is <width> cells across.
+
+    They are, in order: every cell not in the left column, and every cell not
+    in the right column.
+    """
+    if width not in _MASKS:
+        column = sum(1 << (r * width) for r in range(width))
+        full = (1 << (width * width)) - 1
+        _MASKS[width] = (full & ~column, full & ~(column << (width - 1)))
+    return _MASKS[width]
+
+
+def _popcount(mask: int) -> int:
+    """Return the number of bits set in <mask>.
+    """
+    return bin(mask).count('1')
+
+
+class Bitboard:
+    """A Blocky board stored as one bitmask of unit cells for each colour.
+
+    The unit cell at column i and row j is bit j * width + i of a mask, so a
+    row of the board is a run of <width> consecutive bits. Moving every cell
+    of a mask one column or row over is then a single shift.
+
+    A Bitboard is a snapshot: it does not change when the board it was made
+    from does.
+
+    === Public Attributes ===
+    width:
+        The number of unit cells along each side of the board.
+    masks:
+        For each colour index in COLOUR_LIST, the mask of the unit cells of
+        that colour.
+
+    === Representation Invariants ===
+    - Every unit cell is set in exactly one mask.
+    """
+    width: int
+    masks: List[int]
+
+    def __init__(self, width: int, masks: List[int]) -> None:
+        """Initialize this Bitboard with <width> and <masks>.
+        """
+        self.width = width
+        self.masks = masks
+
+    @classmethod
+    def from_block(cls, board: Block) -> Bitboard:
+        """Return a Bitboard of <board>.
+
+        >>> board = Block((0, 0), 750, COLOUR_LIST[1], 0, 1)
+        >>> Bitboard.from_block(board).masks
+        [0, 15, 0, 0]
+        """
+        width = 2 ** (board.max_depth - board.level)
+        masks = [0] * len(COLOUR_LIST)
+        for leaf, column, row, span in board.iter_cells():
+            # Each leaf sets the same run of bits in each of its rows.
+            run = ((1 << span) - 1) << column
+            square = 0
+            for r in range(row, row + span):
+                square |= run << (r * width)
+            masks[leaf.colour_index] |= square
+        return cls(width, masks)
+
+    def largest_blob(self, colour: int) -> int:
+        """Return the number of unit cells in the largest connected blob of the
+        colour with index <colour>, or 0 if there are none.
+
+        Each blob is flood filled from its lowest cell, adding every cell
+        next to the blob so far in one step, until the blob stops growing.
+        """
+        width = self.width
+        not_left, not_right = _masks(width)
+        remaining = self.masks[colour]
+        largest = 0
+        while remaining:
+            blob = remaining & -remaining
+            while True:
+                grown = (blob | ((blob << 1) & not_left) |
+                         ((blob >> 1) & not_right) | (blob << width) |
+                         (blob >> width)) & remaining
+                if grown == blob:
+                    break
+                blob = grown
+            largest = max(largest, _popcount(blob))
+            remaining &= ~blob
+        return largest
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'typing', '__future__', 'block', 'settings'
+        ],
+        'max-attributes': 15
+    })
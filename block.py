@@ -24,10 +24,27 @@ This file contains the Block class, the main data structure used in the game.
 from __future__ import annotations
 
 import random
-from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, List, Optional, Tuple
 
 from math import exp
-from settings import COLOUR_LIST, colour_name
+from settings import COLOUR_LIST, colour_index, colour_name
+
+# For each child index, how many child sizes the child is offset from its
+# parent's upper left corner, along x and along y.
+_OFFSETS = ((1, 0), (0, 0), (0, 1), (1, 1))
+
+# For each direction of a rotate, the side of a block that ends up on each side
+# after the rotate. Sides are in the order top, right, bottom, left.
+_ROTATE_SIDES = {1: (3, 0, 1, 2), 3: (1, 2, 3, 0)}
+
+# Block hashes are kept to 64 bits.
+_HASH_MASK = (1 << 64) - 1
+
+# The random key of each (level, colour) leaf, created the first time it is
+# needed. Keys are seeded from the leaf itself so that every process agrees on
+# them.
+_ZOBRIST_KEYS = {}
 
 
 def generate_board(max_depth: int, size: int) -> Block:
@@ -47,7 +64,254 @@ def generate_board(max_depth: int, size: int) -> Block:
 
     return board
 
-class Block:
+
+def _generate_seeded_board(max_depth: int, size: int, seed: int) -> Block:
+    """Return a new game board with a depth of <max_depth> and dimensions of
+    <size> by <size>, generated from its own random stream seeded by <seed>.
+
+    The board is built one level at a time, drawing the colours of every new
+    block on a level, and whether each parent's children are smashed further,
+    in bulk. Blocks are smashed with the same probabilities as Block.smash.
+    """
+    rng = random.Random(seed)
+    board = Block((0, 0), size, rng.choice(COLOUR_LIST), 0, max_depth)
+
+    to_smash = [board]
+    level = 0
+    while to_smash and level < max_depth:
+        colours = rng.choices(range(len(COLOUR_LIST)), k=4 * len(to_smash))
+        threshold = exp(-0.25 * level)
+        splits = [rng.random() < threshold for _ in to_smash]
+
+        next_level = []
+        for i, parent in enumerate(to_smash):
+            positions = parent._children_positions()
+            child_size = parent._child_size()
+            for j in range(4):
+                b = Block(positions[j], child_size, None, level + 1,
+                          max_depth)
+                b.colour_index = colours[4 * i + j]
+                b._parent = parent
+                parent.children.append(b)
+            parent.colour_index = None
+            if splits[i]:
+                next_level.extend(parent.children)
+
+        to_smash = next_level
+        level += 1
+
+    return board
+
+
+def generate_boards(n: int, max_depth: int, size: int, seed: int,
+                    processes: int = 1) -> List[Block]:
+    """Return <n> new game boards with a depth of <max_depth> and dimensions
+    of <size> by <size>.
+
+    Each board is generated from its own random stream, and the streams are
+    all derived from <seed>, so the same arguments always give the same boards
+    no matter how many <processes> they are generated on. If <processes> is
+    greater than 1, the boards are generated in parallel by a process pool.
+
+    >>> boards = generate_boards(3, 3, 750, 148)
+    >>> len(boards)
+    3
+    >>> boards == generate_boards(3, 3, 750, 148)
+    True
+    """
+    master = random.Random(seed)
+    seeds = [master.getrandbits(64) for _ in range(n)]
+
+    if processes <= 1:
+        return [_generate_seeded_board(max_depth, size, s) for s in seeds]
+
+    with ProcessPoolExecutor(processes) as pool:
+        chunksize = max(1, n // (4 * processes))
+        return list(pool.map(_generate_seeded_board, [max_depth] * n,
+                             [size] * n, seeds, chunksize=chunksize))
+
+
+def _zobrist_key(level: int, colour: int) -> int:
+    """Return the random 64-bit key of a leaf at <level> whose colour has the
+    index <colour> in COLOUR_LIST.
+    """
+    key = (level, colour)
+    if key not in _ZOBRIST_KEYS:
+        _ZOBRIST_KEYS[key] = random.Random(f'{level}:{colour}').getrandbits(64)
+    return _ZOBRIST_KEYS[key]
+
+
+def _combine_hashes(level: int, hashes: List[int]) -> int:
+    """Return the hash of a Block at <level> whose children have <hashes>, in
+    order.
+
+    Every child is mixed in at a different step, so the result depends on the
+    order of the children as well as on their hashes.
+    """
+    h = level + 1
+    for child_hash in hashes:
+        h = (h * 0x9E3779B97F4A7C15 + child_hash) & _HASH_MASK
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _HASH_MASK
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _HASH_MASK
+        h ^= h >> 31
+    return h
+
+
+def _add_counts(a: Tuple[int, ...], b: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Return the sum of the colour counts <a> and <b>, colour by colour.
+    """
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def _describe(block: Block) -> str:
+    """Return the line describing <block> alone in Block.__str__.
+    """
+    indents = '\t' * block.level
+    if len(block.children) == 0:
+        colour = colour_name(block.colour)
+        return f'{indents}Leaf: colour={colour}, pos={block.position}, ' \
+               f'size={block.size}, level={block.level}\n'
+    return f'{indents}Parent: pos={block.position},' \
+           f'size={block.size}, level={block.level}\n'
+
+
+def _majority_colour(colours: List[Optional[int]]) -> Optional[int]:
+    """Return the majority colour among the four <colours> of a Block's
+    children, or None if there is no majority colour.
+
+    This is the rule used by Block.combine, shared so that every board
+    representation combines in exactly the same way.
+    """
+    counts = {}
+    for colour in colours:
+        if colour not in counts:
+            counts[colour] = 1
+        else:
+            counts[colour] += 1
+
+    if (max(counts.values()) > 2 and len(counts.values()) >= 2) or \
+            (max(counts.values()) == 2 and len(counts.values()) > 2):
+        return max(counts, key=counts.get)
+    return None
+
+
+class BlockTraversal:
+    """The non-recursive traversals shared by every kind of Blocky block.
+
+    Each traversal keeps its own stack of blocks still to visit, so it costs no
+    Python recursion and builds no lists of the blocks it visits. Blocks are
+    visited in pre-order, with each block's children visited in the order
+    upper-right, upper-left, lower-left, lower-right.
+
+    Subclasses must provide the level, max_depth and children of a block.
+    """
+    __slots__ = ()
+    level: int
+    max_depth: int
+    children: List[BlockTraversal]
+
+    def iter_nodes(self) -> Iterator[BlockTraversal]:
+        """Yield this block and all its descendants, in pre-order.
+        """
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            yield block
+            children = block.children
+            if children:
+                stack.extend(reversed(children))
+
+    def iter_leaves(self) -> Iterator[BlockTraversal]:
+        """Yield every block with no children in this block's subtree, in
+        pre-order.
+        """
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            children = block.children
+            if children:
+                stack.extend(reversed(children))
+            else:
+                yield block
+
+    def iter_level(self, level: int) -> Iterator[BlockTraversal]:
+        """Yield every block at <level> in this block's subtree, in pre-order.
+
+        Leaves above <level> have no blocks at <level> below them, so they
+        yield nothing.
+        """
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            if block.level == level:
+                yield block
+            elif block.level < level:
+                stack.extend(reversed(block.children))
+
+    def iter_cells(self) -> Iterator[Tuple[BlockTraversal, int, int, int]]:
+        """Yield (leaf, column, row, span) for every leaf in this block's
+        subtree, in pre-order.
+
+        The leaf covers the <span> by <span> square of unit cells whose upper
+        left cell is at <column> and <row>, counted in unit cells from the
+        upper left corner of this block.
+        """
+        stack = [(self, 0, 0, 2 ** (self.max_depth - self.level))]
+        while stack:
+            block, column, row, span = stack.pop()
+            children = block.children
+            if not children:
+                yield block, column, row, span
+            else:
+                half = span // 2
+                for i in range(3, -1, -1):
+                    stack.append((children[i], column + _OFFSETS[i][0] * half,
+                                  row + _OFFSETS[i][1] * half, half))
+
+    def iter_border_cells(self) -> \
+            Iterator[Tuple[BlockTraversal, int, int, int]]:
+        """Yield (leaf, column, row, span) as iter_cells does, but only for the
+        leaves that touch the outer edge of this block.
+
+        Blocks that do not touch the edge are never visited, so this costs
+        time in proportion to the number of leaves along the edge.
+        """
+        end = 2 ** (self.max_depth - self.level)
+        stack = [(self, 0, 0, end)]
+        while stack:
+            block, column, row, span = stack.pop()
+            children = block.children
+            if not children:
+                yield block, column, row, span
+            else:
+                half = span // 2
+                for i in range(3, -1, -1):
+                    c = column + _OFFSETS[i][0] * half
+                    r = row + _OFFSETS[i][1] * half
+                    if c == 0 or r == 0 or c + half == end or r + half == end:
+                        stack.append((children[i], c, r, half))
+
+    def edge_counts(self) -> Tuple[Tuple[int, ...], ...]:
+        """Return the number of unit cells of each colour along each side of
+        this block.
+
+        The sides are in the order top, right, bottom, left, and the counts
+        for each side are indexed by colour index. A corner cell is counted
+        on both of its sides, so the counts for a colour over all four sides
+        add up to its PerimeterGoal score.
+        """
+        end = 2 ** (self.max_depth - self.level)
+        counts = [[0] * len(COLOUR_LIST) for _ in range(4)]
+        for leaf, column, row, span in self.iter_border_cells():
+            sides = (row == 0, column + span == end, row + span == end,
+                     column == 0)
+            for i in range(4):
+                if sides[i]:
+                    counts[i][leaf.colour_index] += span
+        return tuple(tuple(side) for side in counts)
+
+
+class Block(BlockTraversal):
     """A square Block in the Blocky game, represented as a tree.
 
     In addition to its tree-related attributes, a Block also contains attributes
@@ -64,9 +328,10 @@ class Block:
         The (x, y) coordinates of the upper left corner of this Block.
     size:
         The height and width of this square Block.
-    colour:
-        If this block is not subdivided, <colour> stores its colour. Otherwise,
-        <colour> is None.
+    colour_index:
+        If this block is not subdivided, <colour_index> stores the index of its
+        colour in COLOUR_LIST. Otherwise, <colour_index> is None. The colour
+        itself can be read and set through <colour>.
     level:
         The level of this block within the overall block structure.
         The outermost block, corresponding to the root of the tree,
@@ -87,17 +352,39 @@ class Block:
         - their level is one greater than that of this Block.
         - their position is determined by the position and size of this Block,
           and their index in this Block's list of children.
-        - this Block's colour is None.
+        - this Block's colour_index is None.
     - If this Block has no children:
-        - its colour is not None.
+        - its colour_index is not None.
     - level <= max_depth
     """
+    # === Private Attributes ===
+    # _journal:
+    #   The undo log shared by every Block of the board this Block belongs to,
+    #   or None if moves on this Block are not being recorded. Each entry
+    #   holds the kind of move, the Block it was made on, and what is needed
+    #   to undo it.
+    # _parent:
+    #   The Block this Block is a child of, or None if it is the root or
+    #   if it has not been linked to its parent yet. Parents are linked when
+    #   the parent is created by smash or create_copy, or is hashed.
+    # _hash:
+    #   The cached hash of this Block's subtree, or None if it has not been
+    #   computed since this Block or one of its descendants last changed.
+    #   It does not depend on position, so it survives swaps of ancestors.
+    # _edges:
+    #   The cached edge_counts of this Block, or None if they have not been
+    #   computed since this Block or one of its descendants last changed.
+    #   Like <_hash>, a Block only has them if all its descendants do.
     position: Tuple[int, int]
     size: int
-    colour: Optional[Tuple[int, int, int]]
+    colour_index: Optional[int]
     level: int
     max_depth: int
     children: List[Block]
+    _journal: Optional[List[Tuple[str, Block, Any]]]
+    _parent: Optional[Block]
+    _hash: Optional[int]
+    _edges: Optional[Tuple[Tuple[int, ...], ...]]
 
     def __init__(self, position: Tuple[int, int], size: int,
                  colour: Optional[Tuple[int, int, int]], level: int,
@@ -110,6 +397,7 @@ class Block:
             - size > 0
             - level >= 0
             - max_depth >= level
+            - colour is None or colour in COLOUR_LIST
         """
         self.position = position
         self.size = size
@@ -117,47 +405,143 @@ class Block:
         self.level = level
         self.max_depth = max_depth
         self.children = []
+        self._journal = None
+        self._parent = None
+        self._hash = None
+        self._edges = None
+
+    @property
+    def colour(self) -> Optional[Tuple[int, int, int]]:
+        """The colour of this Block if it is not subdivided, otherwise None.
+        """
+        if self.colour_index is None:
+            return None
+        return COLOUR_LIST[self.colour_index]
+
+    @colour.setter
+    def colour(self, colour: Optional[Tuple[int, int, int]]) -> None:
+        """Set the colour of this Block to <colour>.
+
+        Precondition: colour is None or colour in COLOUR_LIST
+        """
+        self.colour_index = None if colour is None else colour_index(colour)
 
     def __str__(self) -> str:
         """Return this Block in a string format.
         """
-        if len(self.children) == 0:
-            indents = '\t' * self.level
-            colour = colour_name(self.colour)
-            return f'{indents}Leaf: colour={colour}, pos={self.position}, ' \
-                   f'size={self.size}, level={self.level}\n'
-        else:
-            indents = '\t' * self.level
-            result = f'{indents}Parent: pos={self.position},' \
-                     f'size={self.size}, level={self.level}\n'
-
-            for child in self.children:
-                result += str(child)
-
-            return result
+        return ''.join(_describe(block) for block in self.iter_nodes())
 
     def __eq__(self, other: Block) -> bool:
         """Return True iff this Block and all its descendents are equivalent to
         the <other> Block and all its descendents.
+
+        The hashes of the two Blocks are compared first, so Blocks that differ
+        are almost always told apart without walking them.
         """
-        if len(self.children) == 0 and len(other.children) == 0:
-            # Both self and other are leaves.
-            return self.position == other.position and \
-                   self.size == other.size and \
-                   self.colour == other.colour and \
-                   self.level == other.level and \
-                   self.max_depth == other.max_depth
-        elif len(self.children) != len(other.children):
-            # One of self or other is a leaf while the other is not.
+        if isinstance(other, Block) and self.zobrist() != other.zobrist():
             return False
-        else:
-            # Both self and other have four children.
-            for i in range(4):
-                # The != operator also uses the __eq__ special method.
-                if self.children[i] != other.children[i]:
-                    return False
 
-            return True
+        # Both walks are in pre-order, so as long as every pair of blocks
+        # so far has the same number of children, they stay in step.
+        for a, b in zip(self.iter_nodes(), other.iter_nodes()):
+            if len(a.children) != len(b.children):
+                # One of a or b is a leaf while the other is not.
+                return False
+            elif len(a.children) == 0 and (
+                    a.position != b.position or a.size != b.size or
+                    a.colour_index != b.colour_index or
+                    a.level != b.level or a.max_depth != b.max_depth):
+                return False
+
+        return True
+
+    def __hash__(self) -> int:
+        """Return a hash of this Block, so that boards can be used as keys in
+        score and search caches.
+
+        A Block must not be changed while it is a key in a dict or set.
+        """
+        return hash((self.position, self.size, self.max_depth,
+                     self.zobrist()))
+
+    def zobrist(self) -> int:
+        """Return a 64-bit hash of the colours and shape of this Block and all
+        its descendants.
+
+        Hashes are cached on every Block of the subtree and a move only clears
+        the hashes of the Blocks it changed and their ancestors, so after a
+        move only those are recomputed.
+        """
+        if self._hash is not None:
+            return self._hash
+
+        stack = [(self, False)]
+        while stack:
+            block, expanded = stack.pop()
+            if block._hash is not None:
+                continue
+            elif not block.children:
+                block._hash = _zobrist_key(block.level, block.colour_index)
+            elif expanded:
+                block._hash = _combine_hashes(
+                    block.level, [child._hash for child in block.children])
+            else:
+                stack.append((block, True))
+                for child in block.children:
+                    child._parent = block
+                    stack.append((child, False))
+
+        return self._hash
+
+    def edge_counts(self) -> Tuple[Tuple[int, ...], ...]:
+        """Return the number of unit cells of each colour along each side of
+        this Block.
+
+        The counts are cached on every Block of the subtree, and combined from
+        the counts of each Block's children, so after a move only the Blocks
+        on the path to the Block that was moved are recounted.
+        """
+        if self._edges is not None:
+            return self._edges
+
+        stack = [(self, False)]
+        while stack:
+            block, expanded = stack.pop()
+            if block._edges is not None:
+                continue
+            elif not block.children:
+                span = 2 ** (block.max_depth - block.level)
+                side = [0] * len(COLOUR_LIST)
+                side[block.colour_index] = span
+                block._edges = (tuple(side),) * 4
+            elif expanded:
+                ur, ul, ll, lr = [child._edges for child in block.children]
+                block._edges = (_add_counts(ul[0], ur[0]),
+                                _add_counts(ur[1], lr[1]),
+                                _add_counts(ll[2], lr[2]),
+                                _add_counts(ul[3], ll[3]))
+            else:
+                stack.append((block, True))
+                for child in block.children:
+                    child._parent = block
+                    stack.append((child, False))
+
+        return self._edges
+
+    def _invalidate(self) -> None:
+        """Clear the cached hash and edge counts of this Block and of its
+        ancestors.
+
+        Both are always computed for a whole subtree at a time, so once an
+        ancestor with neither cached is reached, none of the ones above it
+        have either.
+        """
+        block = self
+        while block is not None and (block._hash is not None or
+                                     block._edges is not None):
+            block._hash = None
+            block._edges = None
+            block = block._parent
 
     def _child_size(self) -> int:
         """Return the size of this Block's children.
@@ -183,16 +567,14 @@ class Block:
         <position> is the (x, y) coordinates of the upper-left corner of this
         Block.
         """
-        # TODO: Implement me
-
-        # use _children_position to get the positions of children
         self.position = position
-        child_pos = self._children_positions()
-        # set the children Blocks with positions as appropriate
-        for i in range(len(self.children)):
-            self.children[i].position = child_pos[i]
-        for blocky in self.children:
-            blocky._update_children_positions(blocky.position)
+        # Blocks are visited in pre-order, so each Block's position is already
+        # updated by the time its children are given theirs.
+        for block in self.iter_nodes():
+            if block.children:
+                positions = block._children_positions()
+                for i in range(4):
+                    block.children[i].position = positions[i]
 
     def smashable(self) -> bool:
         """Return True iff this block can be smashed.
@@ -202,13 +584,16 @@ class Block:
         """
         return self.level != self.max_depth and len(self.children) == 0
 
-    def smash(self) -> bool:
+    def smash(self, rng: Optional[random.Random] = None) -> bool:
         """Sub-divide this block so that it has four randomly generated
         children.
 
         If this Block's level is <max_depth>, do nothing. If this block has
         children, do nothing.
 
+        The children are drawn from <rng> if it is given, and from the random
+        module otherwise.
+
         Return True iff the smash was performed.
         """
 
@@ -217,37 +602,44 @@ class Block:
             return False
 
         else:
+            if rng is None:
+                rng = random
+            old_colour = self.colour_index
             child_pos = self._children_positions()
 
             # Append self.children with 4 blocks
             for i in range(4):
-                b = Block(child_pos[i], self._child_size(),
-                          random.choice(COLOUR_LIST), self.level + 1,
-                          self.max_depth)
+                b = Block(child_pos[i], self._child_size(), None,
+                          self.level + 1, self.max_depth)
+                b.colour_index = rng.randrange(len(COLOUR_LIST))
+                b._parent = self
                 self.children.append(b)
 
             # Determine if each blocky can be smashed further
-            num = random.random()
+            num = rng.random()
             for blocky in self.children:
                 if num < exp(-0.25 * self.level):
                     # Subdivide this blocky
-                    blocky.smash()
+                    blocky.smash(rng)
 
                 else:
                     # Set this blocky's colour to a random one
-                    self.colour = random.choice(COLOUR_LIST)
-            self.colour = None
+                    self.colour_index = rng.randrange(len(COLOUR_LIST))
+            self.colour_index = None
+            self._invalidate()
+
+            if self._journal is not None:
+                # The new blocks were made without a journal, so the whole
+                # smash is recorded here as a single entry.
+                self._set_journal(self._journal)
+                self._journal.append(('smash', self,
+                                      (old_colour, self.children)))
             return True
 
-    def swap(self, direction: int) -> bool:
-        """Swap the child Blocks of this Block.
-
-        If this Block has no children, do nothing. Otherwise, if <direction> is
-        1, swap vertically. If <direction> is 0, swap horizontally.
+    def _swap(self, direction: int) -> bool:
+        """Swap the child Blocks of this Block without recording the move.
 
         Return True iff the swap was performed.
-
-        Precondition: <direction> is either 0 or 1
         """
         # TODO: Implement me
         # Base case: Block has no children
@@ -255,6 +647,7 @@ class Block:
             return False
         else:
             # block has children and we're swapping them
+            self._invalidate()
             if direction == 0:
                 pos = self._children_positions()
 
@@ -284,15 +677,11 @@ class Block:
             return True
 
 
-    def rotate(self, direction: int) -> bool:
-        """Rotate this Block and all its descendants.
-
-        If this Block has no children, do nothing. If <direction> is 1, rotate
-        clockwise. If <direction> is 3, rotate counter-clockwise.
+    def _rotate(self, direction: int) -> bool:
+        """Rotate this Block and all its descendants without recording the
+        move.
 
         Return True iff the rotate was performed.
-
-        Precondition: <direction> is either 1 or 3.
         """
         # TODO: Implement me
         # Case 1: Blocky has no children
@@ -301,6 +690,9 @@ class Block:
 
         # Case 2: Blocky has children
         else:
+            # Every descendant is rotated, so every cached hash below is stale
+            edges = self._edges
+            self._invalidate()
 
             if direction == 1:
                 pos = self._children_positions()
@@ -325,22 +717,65 @@ class Block:
                 self._update_children_positions(self.position)
 
             for block in self.children:
-                block.rotate(direction)
+                block._rotate(direction)
 
+            if edges is not None:
+                # Rotating a Block turns its sides without changing them.
+                self._edges = tuple(edges[i] for i in _ROTATE_SIDES[direction])
             return True
 
+    def swap(self, direction: int) -> bool:
+        """Swap the child Blocks of this Block.
+
+        If this Block has no children, do nothing. Otherwise, if <direction> is
+        1, swap vertically. If <direction> is 0, swap horizontally.
+
+        Return True iff the swap was performed.
+
+        Precondition: <direction> is either 0 or 1
+        """
+        if not self._swap(direction):
+            return False
+
+        if self._journal is not None:
+            self._journal.append(('swap', self, direction))
+        return True
+
+    def rotate(self, direction: int) -> bool:
+        """Rotate this Block and all its descendants.
+
+        If this Block has no children, do nothing. If <direction> is 1, rotate
+        clockwise. If <direction> is 3, rotate counter-clockwise.
+
+        Return True iff the rotate was performed.
+
+        Precondition: <direction> is either 1 or 3.
+        """
+        if not self._rotate(direction):
+            return False
+
+        if self._journal is not None:
+            self._journal.append(('rotate', self, direction))
+        return True
+
     def paint(self, colour: Tuple[int, int, int]) -> bool:
         """Change this Block's colour iff it is a leaf at a level of max_depth
         and its colour is different from <colour>.
 
         Return True iff this Block's colour was changed.
+
+        Precondition: colour in COLOUR_LIST
         """
         # TODO: Implement me
         if self.level == self.max_depth and not self.children:
-            if self.colour == colour:
+            index = colour_index(colour)
+            if self.colour_index == index:
                 return False
             else:
-                self.colour = colour
+                if self._journal is not None:
+                    self._journal.append(('paint', self, self.colour_index))
+                self.colour_index = index
+                self._invalidate()
                 return True
         else:
             return False
@@ -361,43 +796,97 @@ class Block:
         # TODO: Implement me
 
         if self.level == self.max_depth - 1 and self.children:
-            colours = {}
-
-            for block in self.children:
-                if block.colour not in colours:
-                    colours[block.colour] = 1
-                else:
-                    colours[block.colour] += 1
-
+            colour = _majority_colour([block.colour_index
+                                       for block in self.children])
 
-            if (max(colours.values()) > 2 and len(colours.values()) >= 2) or \
-                    (max(colours.values()) == 2 and len(colours.values()) > 2):
-                colour = max(colours, key=colours.get)
+            if colour is not None:
+                if self._journal is not None:
+                    self._journal.append(('combine', self, self.children))
                 self.children = []
-                self.colour = colour
+                self.colour_index = colour
+                self._invalidate()
                 return True
             return False
         else:
             return False
 
+    def _set_journal(self, journal: Optional[List[Tuple[str, Block, Any]]]) \
+            -> None:
+        """Make <journal> the journal of this Block and all its descendants.
+        """
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            block._journal = journal
+            stack.extend(block.children)
+
+    def checkpoint(self) -> int:
+        """Start recording the moves made on this Block and its descendants,
+        if they are not being recorded already, and return a checkpoint for the
+        current state of this Block.
+
+        The checkpoint can later be passed to rollback to undo every move made
+        since.
+        """
+        if self._journal is None:
+            self._set_journal([])
+        return len(self._journal)
+
+    def rollback(self, checkpoint: int) -> None:
+        """Undo every recorded move made since <checkpoint>, most recent first,
+        so that this Block is exactly as it was when <checkpoint> was returned.
+
+        Precondition: <checkpoint> was returned by a call to checkpoint on this
+        Block or one of its ancestors, and has not been rolled back past.
+        """
+        journal = self._journal
+        while len(journal) > checkpoint:
+            action, block, undo = journal.pop()
+            if action == 'swap':
+                # A swap is its own inverse.
+                block._swap(undo)
+            elif action == 'rotate':
+                block._rotate(4 - undo)
+            elif action == 'paint':
+                block.colour_index = undo
+            elif action == 'combine':
+                block.colour_index = None
+                block.children = undo
+            else:
+                # action == 'smash'
+                block.colour_index = undo[0]
+                block.children = []
+            block._invalidate()
+
+    def discard_journal(self) -> None:
+        """Stop recording the moves made on this Block and its descendants, and
+        forget the moves recorded so far.
+        """
+        self._set_journal(None)
+
     def create_copy(self) -> Block:
         """Return a new Block that is a deep copy of this Block.
 
         Remember that a deep copy has new blocks (not aliases) at every level.
         """
-        # TODO: Implement me
-        if not self.children:
-            return Block(self.position, self.size, self.colour, self.level,
-                         self.max_depth)
-
-        else:
-            b = Block(self.position, self.size, self.colour, self.level,
-                      self.max_depth)
-
-            for bby in self.children:
-                b.children.append(bby.create_copy())
-
-            return b
+        root = Block(self.position, self.size, None, self.level,
+                     self.max_depth)
+        stack = [(self, root)]
+        while stack:
+            block, copy = stack.pop()
+            copy.colour_index = block.colour_index
+            # Hashes and edge counts do not depend on position, so the copy
+            # can reuse them
+            copy._hash = block._hash
+            copy._edges = block._edges
+            for child in block.children:
+                c = Block(child.position, child.size, None, child.level,
+                          child.max_depth)
+                c._parent = copy
+                copy.children.append(c)
+                stack.append((child, c))
+
+        return root
 
 
 if __name__ == '__main__':
@@ -406,7 +895,7 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'allowed-import-modules': [
             'doctest', 'python_ta', 'random', 'typing', '__future__', 'math',
-            'settings'
+            'concurrent.futures', 'settings'
         ],
         'max-attributes': 15,
         'max-args': 6
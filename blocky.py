@@ -29,6 +29,7 @@ import pygame
 from actions import ACTION_MESSAGE, ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE,\
     SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, PASS, PAINT, COMBINE, ACTION_PENALTY
 from block import Block
+from goal import BlobGoal, BlobIndex, score_all
 from player import Player
 from renderer import Renderer
 from settings import ANIMATION_DURATION
@@ -48,19 +49,8 @@ def _block_to_squares(board: Block) -> List[Tuple[Tuple[int, int, int],
 
     The order of the squares does not matter.
     """
-    # TODO: Implement me
-    # board is a single block
-    if len(board.children) == 0:
-        return [(board.colour, board.position, board.size)]
-    else:
-        # We know that board has children, so recurse
-        lst = []
-        for child in board.children:
-            if len(child.children) == 0:
-                lst.append((child.colour, child.position, child.size))
-            else:
-                lst.extend(_block_to_squares(child))
-        return lst
+    return [(leaf.colour, leaf.position, leaf.size)
+            for leaf in board.iter_leaves()]
 
 class GameData:
     """
@@ -83,12 +73,25 @@ class GameData:
     === Representation Invariants ===
     - len(players) >= 1
     """
+    # === Private Attributes ===
+    # _scored_hash:
+    #   The hash of the board when the scores in <_goal_scores> were computed,
+    #   or None if no score has been computed yet.
+    # _goal_scores:
+    #   The goal score of each player id on the board as it was when
+    #   <_scored_hash> was computed.
+    # _blobs:
+    #   The blobs on the board, kept up to date as moves are made, or None if
+    #   no player has a BlobGoal.
     max_turns: int
     board: Block
     players: List[Player]
     smashes: Dict[int, int]
     combines: Dict[int, int]
     paints: Dict[int, int]
+    _scored_hash: Optional[int]
+    _goal_scores: Dict[int, int]
+    _blobs: Optional[BlobIndex]
 
     def __init__(self, board: Block, players: List[Player]) -> None:
         """Initialize the game data, saving a reference to <board> and
@@ -105,18 +108,45 @@ class GameData:
         self.combines = {}
         self.paints = {}
 
-        # Start off all counts at 0
+        # Start off all counts at 0, and tell each player who is playing
         for player in players:
             self.smashes[player.id] = 0
             self.combines[player.id] = 0
             self.paints[player.id] = 0
+            player.set_players(players)
+
+        self._scored_hash = None
+        self._goal_scores = {}
+        self._blobs = None
+        if any(isinstance(player.goal, BlobGoal) for player in players):
+            self._blobs = BlobIndex(board)
+
+    def record_move(self, block: Block) -> None:
+        """Bring everything kept about the board up to date after a move was
+        made on <block>.
+        """
+        if self._blobs is not None:
+            self._blobs.update(block)
 
     def calculate_score(self, player_id: int) -> Tuple[int, int]:
         """Return a tuple containing first the <player_id>'s score based on
         their goal in the game and second the deductions from their score based
         on the actions they've taken.
         """
-        goal_score = self.players[player_id].goal.score(self.board)
+        # Every player's score is recomputed, in one pass over the board,
+        # only when the board has changed since they were last computed. A
+        # board that cannot be hashed with zobrist is rescored every time.
+        board_hash = None
+        if hasattr(self.board, 'zobrist'):
+            board_hash = self.board.zobrist()
+        if board_hash is None or board_hash != self._scored_hash:
+            self._scored_hash = board_hash
+            scores = score_all(self.board,
+                               [player.goal for player in self.players],
+                               self._blobs)
+            self._goal_scores = {player.id: score for player, score
+                                 in zip(self.players, scores)}
+        goal_score = self._goal_scores[player_id]
 
         penalty = self.smashes[player_id] * ACTION_PENALTY[SMASH] + \
                   self.combines[player_id] * ACTION_PENALTY[COMBINE] + \
@@ -218,6 +248,8 @@ class MainState(GameState):
             move_successful = True
 
         if move_successful:
+            if action != PASS:
+                self._data.record_move(block)
             self._update_player()
 
         return move_successful
@@ -346,6 +378,10 @@ class GameOverState(GameState):
 
         self._winner = max(self._scores, key=lambda item: item[1] - item[2])[0]
 
+        # No player moves again, so their processes can be shut down.
+        for p in data.players:
+            p.close()
+
     def process_event(self, event: pygame.event.Event) -> None:
         # Simply ignore the event
         return
@@ -376,7 +412,7 @@ if __name__ == '__main__':
         'allowed-io': ['run_game'],
         'allowed-import-modules': [
             'doctest', 'python_ta', 'random', 'typing', 'pygame', '__future__',
-            'block', 'player', 'renderer', 'settings', 'actions'
+            'block', 'goal', 'player', 'renderer', 'settings', 'actions'
         ],
         'generated-members': 'pygame.*'
     })
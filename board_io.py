@@ -0,0 +1,308 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains a compact binary format for Blocky boards, and a corpus
+file format for storing many boards in one file.
+
+A board is encoded as a small header followed by a stream of bits. The blocks
+are visited in pre-order; every block above max_depth contributes one bit
+saying whether it is split, and every leaf contributes the index of its colour
+in COLOUR_LIST.
+
+A corpus file starts with a header and a table of offsets, one per board, so a
+single board can be decoded from a memory-mapped corpus without reading the
+others.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from typing import BinaryIO, Iterable, List, Union
+
+from block import Block
+from settings import COLOUR_LIST
+
+# The number of bits used to store the colour of a leaf.
+_COLOUR_BITS = max(1, (len(COLOUR_LIST) - 1).bit_length())
+
+# The header of an encoded board: its size and its max_depth.
+_BOARD_HEADER = struct.Struct('<IB')
+
+# The header of a corpus file: a magic string, the format version, and the
+# number of boards. It is followed by count + 1 offsets, where board k is
+# stored from offset k up to offset k + 1.
+_CORPUS_MAGIC = b'BLKC'
+_CORPUS_VERSION = 1
+_CORPUS_HEADER = struct.Struct('<4sHI')
+_OFFSET = struct.Struct('<Q')
+
+
+class _BitWriter:
+    """Packs values into bytes, most significant bit first.
+    """
+    # === Private Attributes ===
+    # _data:
+    #   The bytes that have been filled so far.
+    # _acc:
+    #   The bits that have not yet filled a whole byte.
+    # _count:
+    #   The number of bits in <_acc>.
+    _data: bytearray
+    _acc: int
+    _count: int
+
+    def __init__(self) -> None:
+        self._data = bytearray()
+        self._acc = 0
+        self._count = 0
+
+    def write(self, value: int, bits: int) -> None:
+        """Append the lowest <bits> bits of <value>.
+        """
+        self._acc = (self._acc << bits) | value
+        self._count += bits
+        while self._count >= 8:
+            self._count -= 8
+            self._data.append((self._acc >> self._count) & 0xFF)
+        self._acc &= (1 << self._count) - 1
+
+    def getvalue(self) -> bytes:
+        """Return everything written so far, padded with 0 bits to a whole
+        number of bytes.
+        """
+        if self._count == 0:
+            return bytes(self._data)
+        return bytes(self._data) + bytes([self._acc << (8 - self._count)])
+
+
+class _BitReader:
+    """Reads values written by a _BitWriter.
+    """
+    # === Private Attributes ===
+    # _data:
+    #   The bytes being read.
+    # _pos:
+    #   The index of the next byte of <_data> to read.
+    # _acc:
+    #   The bits that have been read from <_data> but not yet returned.
+    # _count:
+    #   The number of bits in <_acc>.
+    _data: Union[bytes, memoryview]
+    _pos: int
+    _acc: int
+    _count: int
+
+    def __init__(self, data: Union[bytes, memoryview], start: int) -> None:
+        self._data = data
+        self._pos = start
+        self._acc = 0
+        self._count = 0
+
+    def read(self, bits: int) -> int:
+        """Return the next <bits> bits as an int.
+        """
+        while self._count < bits:
+            self._acc = (self._acc << 8) | self._data[self._pos]
+            self._pos += 1
+            self._count += 8
+        self._count -= bits
+        value = self._acc >> self._count
+        self._acc &= (1 << self._count) - 1
+        return value
+
+
+def encode_board(board: Block) -> bytes:
+    """Return <board> encoded in the compact binary format.
+
+    Precondition: <board> is at level 0 and every leaf has a colour in
+    COLOUR_LIST.
+
+    >>> from settings import COLOUR_LIST
+    >>> len(encode_board(Block((0, 0), 750, COLOUR_LIST[0], 0, 3)))
+    6
+    """
+    writer = _BitWriter()
+    stack = [board]
+    while stack:
+        block = stack.pop()
+        if block.level < block.max_depth:
+            writer.write(1 if block.children else 0, 1)
+        if block.children:
+            stack.extend(reversed(block.children))
+        else:
+            writer.write(block.colour_index, _COLOUR_BITS)
+
+    return _BOARD_HEADER.pack(board.size, board.max_depth) + writer.getvalue()
+
+
+def max_encoded_size(max_depth: int) -> int:
+    """Return the most bytes that encode_board can return for a board with
+    <max_depth>, which it does for a board split all the way down.
+
+    >>> max_encoded_size(3)
+    24
+    """
+    bits = (4 ** max_depth - 1) // 3 + 4 ** max_depth * _COLOUR_BITS
+    return _BOARD_HEADER.size + -(-bits // 8)
+
+
+def decode_board(data: Union[bytes, memoryview]) -> Block:
+    """Return the board that was encoded as <data> by encode_board.
+
+    The board is placed at (0, 0).
+    """
+    size, max_depth = _BOARD_HEADER.unpack_from(data)
+    reader = _BitReader(data, _BOARD_HEADER.size)
+
+    root = Block((0, 0), size, None, 0, max_depth)
+    stack = [root]
+    while stack:
+        block = stack.pop()
+        if block.level < max_depth and reader.read(1):
+            positions = block._children_positions()
+            for i in range(4):
+                child = Block(positions[i], block._child_size(), None,
+                              block.level + 1, max_depth)
+                child._parent = block
+                block.children.append(child)
+            stack.extend(reversed(block.children))
+        else:
+            block.colour_index = reader.read(_COLOUR_BITS)
+
+    return root
+
+
+def write_corpus(path: str, boards: Iterable[Block]) -> int:
+    """Write every board in <boards> to a corpus file at <path>, replacing
+    the file if it exists.
+
+    Return the number of boards written.
+    """
+    records = [encode_board(board) for board in boards]
+    start = _CORPUS_HEADER.size + _OFFSET.size * (len(records) + 1)
+
+    offsets = [start]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    with open(path, 'wb') as f:
+        f.write(_CORPUS_HEADER.pack(_CORPUS_MAGIC, _CORPUS_VERSION,
+                                    len(records)))
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+        for record in records:
+            f.write(record)
+
+    return len(records)
+
+
+class BoardCorpus:
+    """A read-only, memory-mapped corpus file of boards.
+
+    Boards are only decoded when they are accessed, so opening a corpus and
+    reading a few boards from it costs the same no matter how many boards it
+    holds.
+
+    >>> import os, tempfile
+    >>> from block import generate_boards
+    >>> path = os.path.join(tempfile.mkdtemp(), 'boards.blkc')
+    >>> boards = generate_boards(10, 4, 750, 148)
+    >>> write_corpus(path, boards)
+    10
+    >>> with BoardCorpus(path) as corpus:
+    ...     len(corpus), corpus[7] == boards[7]
+    (10, True)
+    """
+    # === Private Attributes ===
+    # _file:
+    #   The open corpus file.
+    # _map:
+    #   The memory map of <_file>.
+    # _count:
+    #   The number of boards in the corpus.
+    _file: BinaryIO
+    _map: mmap.mmap
+    _count: int
+
+    def __init__(self, path: str) -> None:
+        """Open the corpus file at <path>.
+
+        Raise ValueError if the file is not a corpus this module can read.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = _CORPUS_HEADER.unpack_from(self._map)
+        if magic != _CORPUS_MAGIC or version != _CORPUS_VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a version {_CORPUS_VERSION} '
+                             f'board corpus')
+        self._count = count
+
+    def __len__(self) -> int:
+        """Return the number of boards in this corpus.
+        """
+        return self._count
+
+    def __getitem__(self, k: int) -> Block:
+        """Return board <k> of this corpus, decoding only that board.
+
+        Raise IndexError if there is no board <k>.
+        """
+        if k < 0:
+            k += self._count
+        if not 0 <= k < self._count:
+            raise IndexError('board index out of range')
+
+        table = _CORPUS_HEADER.size + k * _OFFSET.size
+        start, = _OFFSET.unpack_from(self._map, table)
+        end, = _OFFSET.unpack_from(self._map, table + _OFFSET.size)
+        return decode_board(self._map[start:end])
+
+    def boards(self) -> List[Block]:
+        """Return every board in this corpus, decoded.
+        """
+        return [self[k] for k in range(self._count)]
+
+    def close(self) -> None:
+        """Close this corpus. No boards can be read from it afterwards.
+        """
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> BoardCorpus:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['write_corpus', '__init__'],
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'typing', '__future__', 'mmap', 'struct',
+            'block', 'settings'
+        ],
+        'max-attributes': 15
+    })
@@ -23,19 +23,35 @@ This file contains some sample tests for Assignment 2.
 Please use this as a starting point to check your work and write your own
 tests!
 """
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+import math
 import os
+import random
+import time
 import pygame
 import pytest
 
-from block import Block
-from blocky import _block_to_squares
-from goal import BlobGoal, PerimeterGoal, _flatten, generate_goals, _grid
-from player import Player, _get_block, create_players
+from block import Block, BlockTraversal, generate_board, generate_boards
+from linear_block import LinearBlock, generate_linear_board
+from lazy_block import LazyBlock, generate_lazy_board
+from persistent_block import PersistentBoard, generate_persistent_board
+from blocky import GameData, GameOverState, MainState, _block_to_squares
+from bitboard import Bitboard
+from board_io import BoardCorpus, decode_board, encode_board, \
+    max_encoded_size, write_corpus
+from goal import BlobGoal, PerimeterGoal, _blob_sizes, _flatten, \
+    _flatten_array, _grid, _stack_arrays, generate_goals, score_all, \
+    score_boards, BlobIndex
+from search import BoardPool, MoveEvaluator, apply_move, block_at, \
+    block_path, evaluate_candidates, iter_legal_moves, iter_legal_paths
+from player import Player, LookaheadPlayer, MCTSPlayer, RandomPlayer, \
+    SmartPlayer, _entry_bytes, _get_block, _get_blocks, create_players
+from game import Game
 from renderer import Renderer
 from settings import COLOUR_LIST
-from actions import KEY_ACTION, ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, \
-    SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, PASS, PAINT, COMBINE
+from actions import ACTION_PENALTY, KEY_ACTION, ROTATE_CLOCKWISE, \
+    ROTATE_COUNTER_CLOCKWISE, SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, PASS, \
+    PAINT, COMBINE
 
 def set_children(block: Block, colours: List[Optional[Tuple[int, int, int]]]) \
         -> None:
@@ -226,19 +242,19 @@ def board_16x16_combine() -> Block:
 
 
 @pytest.fixture
-def flattened_board_16x16() -> List[List[Tuple[int, int, int]]]:
+def flattened_board_16x16() -> List[List[int]]:
     """Create a list of the unit cells inside the reference board."""
     return [
-        [COLOUR_LIST[2], COLOUR_LIST[2], COLOUR_LIST[1], COLOUR_LIST[1]],
-        [COLOUR_LIST[2], COLOUR_LIST[2], COLOUR_LIST[1], COLOUR_LIST[1]],
-        [COLOUR_LIST[1], COLOUR_LIST[1], COLOUR_LIST[3], COLOUR_LIST[3]],
-        [COLOUR_LIST[0], COLOUR_LIST[3], COLOUR_LIST[3], COLOUR_LIST[3]]
+        [2, 2, 1, 1],
+        [2, 2, 1, 1],
+        [1, 1, 3, 3],
+        [0, 3, 3, 3]
     ]
 
 @pytest.fixture
-def flattened_board_16x16_max() -> List[List[Tuple[int, int, int]]]:
+def flattened_board_16x16_max() -> List[List[int]]:
     """Create a list of the unit cells inside the reference board."""
-    a, b, c, d = COLOUR_LIST[0], COLOUR_LIST[1], COLOUR_LIST[2], COLOUR_LIST[3]
+    a, b, c, d = 0, 1, 2, 3
     return [
         [c, c, c, c, c, c, c, c, b, b, b, b, b, b, b, b],
         [c, c, c, c, c, c, c, c, b, b, b, b, b, b, b, b],
@@ -416,6 +432,24 @@ class TestBlock:
         assert board_1x1._children_positions() == [(188, 0), (0, 0),
                                                    (0, 188), (188, 188)]
 
+    def test_generate_boards_reproducible(self) -> None:
+        """Tests that seeded boards do not depend on the number of processes
+        they are generated on."""
+        boards = generate_boards(6, 4, 750, 2020)
+        assert len(boards) == 6
+        assert boards == generate_boards(6, 4, 750, 2020, processes=2)
+        assert boards != generate_boards(6, 4, 750, 2021)
+        for board in boards:
+            assert len(board.children) == 4
+            assert board.colour is None
+
+    def test_smash_with_rng(self, board_no_children) -> None:
+        """Tests that smashing with the same random stream gives the same
+        children."""
+        copy = board_no_children.create_copy()
+        assert board_no_children.smash(random.Random(5))
+        assert copy.smash(random.Random(5))
+        assert board_no_children == copy
 
     # Main methods
     def test_smashable(self, board_no_children) -> None:
@@ -515,6 +549,16 @@ class TestBlock:
         board_16x16.children[0].paint(COLOUR_LIST[3])
         assert not board_16x16 == board_16x16_paint
 
+    def test_colour_index(self, board_16x16) -> None:
+        """Tests that a block's colour and colour index stay in step."""
+        block = board_16x16.children[0].children[0]
+        assert block.colour == COLOUR_LIST[block.colour_index]
+        block.paint(COLOUR_LIST[3])
+        assert block.colour_index == 3
+        assert block.colour == COLOUR_LIST[3]
+        assert board_16x16.colour is None
+        assert board_16x16.colour_index is None
+
     def test_combine(self, board_16x16, board_16x16_combine) -> None:
         """Tests that combine works on the top right block of reference bord on
         level 1. """
@@ -542,6 +586,124 @@ class TestBlock:
         board_16x16.create_copy()
         assert board_16x16 == board_16x16_copy
 
+    def test_iter_nodes_and_leaves(self, board_16x16) -> None:
+        """Tests that the traversals visit blocks in pre-order."""
+        top_right = board_16x16.children[0]
+        nodes = list(board_16x16.iter_nodes())
+        assert nodes[:6] == [board_16x16, top_right] + top_right.children
+        assert nodes[6:] == board_16x16.children[1:]
+        assert list(board_16x16.iter_leaves()) == \
+            top_right.children + board_16x16.children[1:]
+        assert list(board_16x16.iter_level(1)) == board_16x16.children
+        assert list(board_16x16.iter_level(2)) == top_right.children
+
+    def test_iter_cells(self, board_16x16) -> None:
+        """Tests that each leaf is given the unit cells it covers."""
+        cells = [(leaf.colour_index, column, row, span)
+                 for leaf, column, row, span in board_16x16.iter_cells()]
+        assert cells == [(0, 3, 0, 1), (1, 2, 0, 1), (1, 2, 1, 1),
+                         (3, 3, 1, 1), (2, 0, 0, 2), (1, 0, 2, 2),
+                         (3, 2, 2, 2)]
+
+    def test_edge_counts(self, board_16x16) -> None:
+        """Tests the colour counts along each side of the board."""
+        assert board_16x16.edge_counts() == ((1, 1, 2, 0), (1, 0, 0, 3),
+                                             (0, 2, 0, 2), (0, 2, 2, 0))
+
+    def test_edge_counts_track_moves(self) -> None:
+        """Tests that cached edge counts stay correct across moves and
+        rollbacks."""
+        rng = random.Random(5)
+        for board in generate_boards(10, 4, 750, 2):
+            board.edge_counts()
+            mark = board.checkpoint()
+            for _ in range(20):
+                block = rng.choice(list(board.iter_nodes()))
+                rng.choice([lambda: block.swap(rng.randint(0, 1)),
+                            lambda: block.rotate(rng.choice([1, 3])),
+                            lambda: block.paint(rng.choice(COLOUR_LIST)),
+                            block.combine, block.smash])()
+                assert board.edge_counts() == \
+                    BlockTraversal.edge_counts(board)
+            board.rollback(mark)
+            assert board.edge_counts() == BlockTraversal.edge_counts(board)
+
+    def test_iter_border_cells(self, board_16x16) -> None:
+        """Tests that only the leaves on the edge of the board are visited."""
+        cells = [(leaf.colour_index, column, row, span)
+                 for leaf, column, row, span in board_16x16.iter_border_cells()]
+        assert cells == [(0, 3, 0, 1), (1, 2, 0, 1), (3, 3, 1, 1),
+                         (2, 0, 0, 2), (1, 0, 2, 2), (3, 2, 2, 2)]
+
+    def test_deep_board_copy_and_str(self) -> None:
+        """Tests that a deep board can be copied, compared and printed."""
+        board = generate_boards(1, 9, 750, 11)[0]
+        copy = board.create_copy()
+        assert copy == board
+        assert str(copy) == str(board)
+        assert len(str(board).splitlines()) == \
+            sum(1 for _ in board.iter_nodes())
+
+    def test_hash_tracks_moves(self, board_16x16, board_16x16_copy) -> None:
+        """Tests that a move changes the hash of the board, undoing it
+        restores the hash, and equal boards can be used as the same key."""
+        before = board_16x16.zobrist()
+        assert board_16x16.children[0].rotate(1)
+        assert board_16x16.zobrist() != before
+        assert board_16x16 != board_16x16_copy
+        assert board_16x16.children[0].rotate(3)
+        assert board_16x16.zobrist() == before
+        assert board_16x16 == board_16x16_copy
+
+        cache = {board_16x16_copy: 1}
+        assert cache[board_16x16] == 1
+        copy = board_16x16.create_copy()
+        assert copy.children[0].children[0].paint(COLOUR_LIST[3])
+        assert copy.zobrist() != before
+        assert board_16x16.zobrist() == before
+
+    def test_hash_after_rollback(self) -> None:
+        """Tests that hashes are kept up to date when moves are undone."""
+        board = generate_board(4, 750)
+        before = board.zobrist()
+        mark = board.checkpoint()
+        for child in board.children:
+            child.smash() or child.swap(1)
+        board.rollback(mark)
+        assert board.zobrist() == before
+
+    def test_rollback_each_move(self, board_16x16, board_16x16_copy) -> None:
+        """Tests that every kind of move can be undone with rollback."""
+        mark = board_16x16.checkpoint()
+        assert board_16x16.swap(1)
+        assert board_16x16.children[3].rotate(1)
+        assert board_16x16.children[3].children[2].paint(COLOUR_LIST[2])
+        assert board_16x16.children[3].combine()
+        assert board_16x16.children[1].smash()
+        assert board_16x16 != board_16x16_copy
+        board_16x16.rollback(mark)
+        assert board_16x16 == board_16x16_copy
+        assert board_16x16.children[1].children == []
+
+    def test_rollback_nested(self) -> None:
+        """Tests that rolling back to a checkpoint keeps earlier moves."""
+        board = generate_board(4, 750)
+        original = board.create_copy()
+        board.checkpoint()
+        board.rotate(3)
+        after_rotate = board.create_copy()
+        mark = board.checkpoint()
+        for child in board.children:
+            child.swap(0)
+            child.smash()
+            child.rotate(1)
+        board.rollback(mark)
+        assert board == after_rotate
+        board.rollback(0)
+        assert board == original
+        board.discard_journal()
+        assert board._journal is None
+
 
 class TestPlayer:
     """A collection of methods for testing the methods and functions in the
@@ -569,6 +731,22 @@ class TestPlayer:
         assert _get_block(board_16x16, top_right, 2) == \
                board_16x16.children[0].children[0]
 
+    def test_get_block_outside(self, board_16x16) -> None:
+        """Test that no block is found for a location off the board."""
+        assert _get_block(board_16x16, (750, 10), 0) is None
+        assert _get_block(board_16x16, (10, 750), 2) is None
+
+    def test_get_blocks_matches_get_block(self) -> None:
+        """Test that locating many points at once agrees with locating them
+        one at a time."""
+        board = generate_board(5, 750)
+        locations = [(random.randrange(0, 760), random.randrange(0, 760))
+                     for _ in range(300)]
+        levels = [random.randrange(0, 6) for _ in range(300)]
+        found = _get_blocks(board, locations, levels)
+        for i in range(300):
+            assert found[i] is _get_block(board, locations[i], levels[i])
+
     def test_create_players(self) -> None:
         hp = create_players(3, 0, [])
         for player in hp:
@@ -595,6 +773,392 @@ class TestPlayer:
         playas[1].generate_move(board_16x16)
         assert board_16x16 == b
 
+    def test_smart_player_move(self) -> None:
+        """Tests that a smart player's move is on the board it was given and
+        scores more than passing, unless it is a pass."""
+        for seed in range(10):
+            random.seed(seed)
+            board = generate_board(3, 750)
+            copy = board.create_copy()
+            player = SmartPlayer(0, BlobGoal(COLOUR_LIST[seed % 4]), 5)
+            player._proceed = True
+            move = player.generate_move(board)
+            assert board == copy
+            assert _get_block(board, move[2].position, move[2].level) \
+                is move[2]
+            # A smash is made with the random module, which the player seeds
+            # to make the smash it scored.
+            if (move[0], move[1]) != PASS:
+                assert apply_move(move, player.goal.colour)
+                assert player.goal.score(board) > player.goal.score(copy)
+
+    def test_smart_player_smash(self, monkeypatch) -> None:
+        """Tests that a smash chosen by a smart player makes the board it was
+        scored on when it is played."""
+        scored = []
+
+        def recorded(*args) -> List[Optional[int]]:
+            scores = evaluate_candidates(*args)
+            scored.append(scores)
+            return scores
+
+        monkeypatch.setattr('player.evaluate_candidates', recorded)
+        for seed in range(10):
+            random.seed(seed)
+            board = Block((0, 0), 750, COLOUR_LIST[1], 0, 2)
+            player = SmartPlayer(0, BlobGoal(COLOUR_LIST[0]), 5)
+            player._proceed = True
+            move = player.generate_move(board)
+            # A smash is the only move that changes this board.
+            assert (move[0], move[1]) == SMASH
+            assert apply_move(move, player.goal.colour)
+            assert player.goal.score(board) == scored[-1][0]
+
+    def test_smart_player_processes(self) -> None:
+        """Tests that a smart player chooses the same moves with one process
+        as with several."""
+        serial = SmartPlayer(0, BlobGoal(COLOUR_LIST[0]), 30)
+        parallel = SmartPlayer(1, BlobGoal(COLOUR_LIST[0]), 30, 2)
+        try:
+            for seed in range(3):
+                random.seed(seed)
+                board = generate_board(4, 750)
+                moves = []
+                for player in [serial, parallel]:
+                    random.seed(seed)
+                    player._proceed = True
+                    moves.append(player.generate_move(board))
+                assert moves[0] == moves[1]
+        finally:
+            parallel.close()
+
+    def test_game_over_closes_players(self, renderer) -> None:
+        """Tests that a game passes its number of processes on to its smart
+        players, and that their processes are shut down when it is over."""
+        game = Game(2, 0, 1, [3], 2)
+        players = game._data.players
+        assert players[1]._processes == 2
+        players[1]._proceed = True
+        players[1].generate_move(game._data.board)
+        assert players[1]._pool is not None
+        GameOverState(game._data)
+        assert players[1]._pool is None
+
+    def test_mcts_player_move(self) -> None:
+        """Tests that an MCTS player finds the move that raises its score,
+        within its time budget, without mutating the board."""
+        random.seed(24)
+        board = Block((0, 0), 750, None, 0, 1)
+        board.smash()
+        for i in range(4):
+            board.children[i].colour_index = int(i != 0)
+        copy = board.create_copy()
+        player = MCTSPlayer(0, PerimeterGoal(COLOUR_LIST[0]), 50)
+        player._proceed = True
+        move = player.generate_move(board)
+        assert board == copy
+        assert (move[0], move[1]) == PAINT and move[2] in board.children
+        assert 0 < player.elapsed < 1
+        assert player.playouts_per_second() > 0
+        assert player.generate_move(board) is None
+
+    def test_mcts_player_other_boards(self) -> None:
+        """Tests that an MCTS player finds the move that raises its score on
+        boards that cannot record their moves, without mutating them."""
+        random.seed(24)
+        board = Block((0, 0), 750, None, 0, 1)
+        board.smash()
+        for i in range(4):
+            board.children[i].colour_index = int(i != 0)
+        for other in [LinearBlock.from_block(board),
+                      LazyBlock.from_block(board)]:
+            copy = other.create_copy()
+            player = MCTSPlayer(0, PerimeterGoal(COLOUR_LIST[0]), 50)
+            player._proceed = True
+            move = player.generate_move(other)
+            assert other == copy
+            assert (move[0], move[1]) == PAINT
+            assert move[2] in other.children
+            assert player.playouts > 0
+
+    def test_mcts_player_pass(self) -> None:
+        """Tests that an MCTS player passes when no move can do better."""
+        board = Block((0, 0), 750, COLOUR_LIST[0], 0, 1)
+        player = MCTSPlayer(0, BlobGoal(COLOUR_LIST[0]), 20)
+        player._proceed = True
+        assert player.generate_move(board) == (PASS[0], PASS[1], board)
+
+    def test_lookahead_player_value(self) -> None:
+        """Tests that the lookahead search finds the same value as searching
+        every move without pruning."""
+        def minimax(player: LookaheadPlayer, depth: int, turn: int) -> float:
+            if depth == 0:
+                return player.goal.score(player._scratch.current_board())
+            mover = player._players[turn]
+            values = []
+            for move_key, block in player._ordered_moves(mover, 0, None):
+                checkpoint = player._scratch.checkpoint()
+                penalty = 0
+                if move_key[0] != PASS[0]:
+                    player._make(move_key, block, mover)
+                    if mover is player:
+                        penalty = ACTION_PENALTY[(move_key[0], move_key[1])]
+                values.append(minimax(player, depth - 1,
+                                      (turn + 1) % len(player._players)) -
+                              penalty)
+                player._scratch.revert(checkpoint)
+            return max(values) if mover is player else min(values)
+
+        for seed in range(2):
+            random.seed(seed)
+            board = generate_board(2, 750)
+            players = [LookaheadPlayer(i, PerimeterGoal(COLOUR_LIST[i]), 5000,
+                                       table_bytes=20000) for i in range(2)]
+            for player in players:
+                player.set_players(players)
+            player = players[seed % 2]
+            player._scratch = MoveEvaluator(board, player.goal)
+            player._deadline = math.inf
+            for depth in range(1, 4):
+                # A table kept from a shallower search may give values from
+                # deeper than <depth>, which minimax would not.
+                player._clear_table()
+                assert player._search(depth, seed % 2, -math.inf, math.inf,
+                                      0) == minimax(player, depth, seed % 2)
+                assert player._scratch.current_board() == board
+                assert player._table_used <= 20000
+                assert player._table_used == sum(
+                    _entry_bytes(key, entry)
+                    for key, entry in player._table.items())
+
+    def test_lookahead_player_move(self) -> None:
+        """Tests that a lookahead player is told who is playing by GameData,
+        and finds a move that raises its score without mutating the board."""
+        random.seed(25)
+        board = Block((0, 0), 750, None, 0, 1)
+        board.smash()
+        for i in range(4):
+            board.children[i].colour_index = int(i != 0)
+        copy = board.create_copy()
+        players = [LookaheadPlayer(0, PerimeterGoal(COLOUR_LIST[0]), 200),
+                   RandomPlayer(1, BlobGoal(COLOUR_LIST[1]))]
+        GameData(board, players)
+        assert players[0]._players is players
+        players[0]._proceed = True
+        move = players[0].generate_move(board)
+        assert board == copy
+        assert (move[0], move[1]) == PAINT and move[2] in board.children
+        assert players[0].depth >= 2
+
+    def test_lookahead_player_other_boards(self) -> None:
+        """Tests that a lookahead player finds the same value on boards that
+        cannot record their moves or be hashed with zobrist, and finds a move
+        that raises its score without mutating them."""
+        random.seed(25)
+        board = Block((0, 0), 750, None, 0, 1)
+        board.smash()
+        for i in range(4):
+            board.children[i].colour_index = int(i != 0)
+        players = [LookaheadPlayer(0, PerimeterGoal(COLOUR_LIST[0]), 200,
+                                   max_depth=2),
+                   RandomPlayer(1, BlobGoal(COLOUR_LIST[1]))]
+        players[0].set_players(players)
+        values = []
+        for other in [board, LinearBlock.from_block(board),
+                      LazyBlock.from_block(board)]:
+            players[0]._clear_table()
+            players[0]._scratch = MoveEvaluator(other, players[0].goal)
+            players[0]._deadline = math.inf
+            values.append(players[0]._search(2, 0, -math.inf, math.inf, 0))
+            assert players[0]._scratch.current_board() == other
+
+            copy = other.create_copy()
+            players[0]._proceed = True
+            move = players[0].generate_move(other)
+            assert other == copy
+            assert (move[0], move[1]) == PAINT
+            assert move[2] in other.children
+        assert values[0] == values[1] == values[2]
+
+    def test_lookahead_player_budget(self) -> None:
+        """Tests that a lookahead player keeps to its time budget on a board
+        too deep to search fully in time, and to its table's limit."""
+        random.seed(26)
+        board = generate_board(4, 750)
+        players = [LookaheadPlayer(0, BlobGoal(COLOUR_LIST[0]), 300,
+                                   table_bytes=10000),
+                   RandomPlayer(1, PerimeterGoal(COLOUR_LIST[1]))]
+        players[0].set_players(players)
+        players[0]._proceed = True
+        start = time.perf_counter()
+        assert players[0].generate_move(board) is not None
+        assert time.perf_counter() - start < 0.3 + 0.1
+        assert players[0].depth < 3
+        assert 0 < players[0]._table_used <= 10000
+
+
+class TestLegalMoves:
+    """A collection of methods for testing iter_legal_moves."""
+
+    def test_legal_moves(self) -> None:
+        """Tests that every move that changes the board is listed once, and
+        every listed move is successful."""
+        actions = [ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, SWAP_HORIZONTAL,
+                   SWAP_VERTICAL, SMASH, PAINT, COMBINE]
+        colour = COLOUR_LIST[1]
+        for board in generate_boards(10, 3, 750, 22):
+            listed = [(move[0], move[1], move[2].position, move[2].level)
+                      for move in iter_legal_moves(board, colour)]
+            assert len(listed) == len(set(listed))
+
+            for block in board.iter_nodes():
+                for action in actions:
+                    key = (action[0], action[1], block.position, block.level)
+                    copy = board.create_copy()
+                    target = _get_block(copy, block.position, block.level)
+                    done = apply_move((action[0], action[1], target), colour)
+                    if key in listed:
+                        assert done
+                    elif done:
+                        assert action != SMASH and copy == board
+
+    def test_uniform_blocks(self) -> None:
+        """Tests that moves which cannot change the board are left out."""
+        board = Block((0, 0), 750, COLOUR_LIST[0], 0, 1)
+        board.smash()
+        for child in board.children:
+            child.colour_index = 0
+        assert list(iter_legal_moves(board, COLOUR_LIST[0])) == []
+        assert len(list(iter_legal_moves(board, COLOUR_LIST[1]))) == 4
+
+    def test_legal_moves_other_boards(self) -> None:
+        """Tests that the moves listed on boards that are not Blocks are those
+        listed on the same Block, and that a RandomPlayer can play on them."""
+        colour = COLOUR_LIST[1]
+        for board in generate_boards(5, 3, 750, 23):
+            expected = [(move[0], move[1], move[2].position, move[2].level)
+                        for move in iter_legal_moves(board, colour)]
+            for other in [LinearBlock.from_block(board),
+                          LazyBlock.from_block(board)]:
+                assert [(move[0], move[1], move[2].position, move[2].level)
+                        for move in iter_legal_moves(other, colour)] == \
+                    expected
+                player = RandomPlayer(0, BlobGoal(colour))
+                player._proceed = True
+                assert player.generate_move(other) is not None
+
+
+class TestMoveEvaluator:
+    """A collection of methods for testing the MoveEvaluator class."""
+
+    def test_evaluate(self) -> None:
+        """Tests that evaluating a move matches making it on a copy of the
+        board, and leaves the scratch board as it was."""
+        board = generate_board(4, 750)
+        goal = PerimeterGoal(COLOUR_LIST[0])
+        evaluator = MoveEvaluator(board, goal)
+        actions = [ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, SWAP_HORIZONTAL,
+                   SWAP_VERTICAL, PAINT, COMBINE]
+        for block in evaluator.board.iter_nodes():
+            for action in actions:
+                move = (action[0], action[1], block)
+                copy = board.create_copy()
+                target = _get_block(copy, block.position, block.level)
+                expected = goal.score(copy) if \
+                    apply_move((action[0], action[1], target), goal.colour) \
+                    else None
+                assert evaluator.evaluate(move) == expected
+                assert evaluator.board == board
+        assert evaluator.evaluations > 0
+        assert evaluator.evaluations_per_second() > 0
+
+    def test_evaluate_other_boards(self) -> None:
+        """Tests that moves on boards that are not Blocks score the same as on
+        the same Block, and that a SmartPlayer chooses the same move on
+        them."""
+        board = generate_boards(1, 3, 750, 31)[0]
+        goal = BlobGoal(COLOUR_LIST[2])
+        expected = MoveEvaluator(board, goal)
+        for other in [LinearBlock.from_block(board),
+                      LazyBlock.from_block(board)]:
+            evaluator = MoveEvaluator(other, goal)
+            for move in iter_legal_moves(evaluator.board, goal.colour):
+                block = _get_block(expected.board, move[2].position,
+                                   move[2].level)
+                assert evaluator.evaluate(move, random.Random(1)) == \
+                    expected.evaluate((move[0], move[1], block),
+                                      random.Random(1))
+                assert evaluator.board == other
+
+            moves = []
+            for b in [board, other]:
+                player = SmartPlayer(0, goal, 20)
+                player._proceed = True
+                random.seed(32)
+                move = player.generate_move(b)
+                moves.append((move[0], move[1], move[2].position,
+                              move[2].level))
+            assert moves[0] == moves[1]
+
+    def test_checkpoint_other_boards(self) -> None:
+        """Tests that reverting to a checkpoint leaves the scratch board as it
+        was at the checkpoint, on Blocks and on boards that are not."""
+        board = generate_boards(1, 3, 750, 33)[0]
+        goal = PerimeterGoal(COLOUR_LIST[1])
+        for other in [board, LinearBlock.from_block(board),
+                      LazyBlock.from_block(board)]:
+            evaluator = MoveEvaluator(other, goal)
+            moves = list(iter_legal_paths(other, goal.colour))[:3]
+            seen = [evaluator.current_board().create_copy()]
+            checkpoints = []
+            for move in moves:
+                checkpoints.append(evaluator.checkpoint())
+                block = block_at(evaluator.current_board(), move[2])
+                assert evaluator.apply((move[0], move[1], block),
+                                       random.Random(1))
+                seen.append(evaluator.current_board().create_copy())
+            for i in (1, 1, 0):
+                evaluator.revert(checkpoints[i])
+                assert evaluator.current_board() == seen[i]
+            evaluator.apply((moves[2][0], moves[2][1],
+                             block_at(evaluator.current_board(), moves[2][2])))
+            evaluator.revert()
+            assert evaluator.current_board() == other == seen[0]
+
+    def test_evaluate_candidates(self) -> None:
+        """Tests that candidates score the same in a pool of processes as
+        they do here, smashes included, for each board written to the
+        pool."""
+        goal = BlobGoal(COLOUR_LIST[1])
+        pool = BoardPool(2, 4)
+        try:
+            for board in generate_boards(2, 4, 750, 24):
+                candidates = [(move[0], move[1], block_path(move[2]), seed)
+                              for seed, move in enumerate(
+                                  iter_legal_moves(board, goal.colour))]
+                assert any(c[0] == SMASH[0] for c in candidates)
+                serial = evaluate_candidates(board, goal, candidates)
+                assert evaluate_candidates(board, goal, candidates, pool) == \
+                    serial
+                assert serial == evaluate_candidates(board, goal, candidates)
+                for candidate, score in zip(candidates, serial):
+                    assert block_path(block_at(board, candidate[2])) == \
+                        candidate[2]
+                    assert score is not None
+        finally:
+            pool.shutdown()
+
+    def test_best_move(self, board_16x16) -> None:
+        """Tests that the best move is the first one with the highest score."""
+        evaluator = MoveEvaluator(board_16x16, BlobGoal(COLOUR_LIST[2]))
+        root = evaluator.board
+        moves = [(PAINT[0], PAINT[1], root), (SWAP_VERTICAL[0], 1, root),
+                 (SWAP_HORIZONTAL[0], 0, root),
+                 (ROTATE_CLOCKWISE[0], 1, root)]
+        assert evaluator.best_move(moves) == (moves[1], 4)
+        assert evaluator.best_move(moves[:1]) == (None, None)
+
+
 class TestGoal:
     """A collection of methods for testing the sub-classes of Goal.
 
@@ -616,7 +1180,7 @@ class TestGoal:
 
     def test_block_flatten_unit_cell(self, board_1x1) -> None:
         """Test that flatten correctly flattens a unit cell."""
-        assert _flatten(board_1x1) == [[board_1x1.colour]]
+        assert _flatten(board_1x1) == [[board_1x1.colour_index]]
 
     def test_block_flatten_max_depth_4(self, board_16x16,
                                        flattened_board_16x16_max) -> None:
@@ -655,6 +1219,35 @@ class TestGoal:
             goal = BlobGoal(colour)
             assert goal.score(board_16x16) == expected
 
+    def test_blob_histogram(self, board_16x16) -> None:
+        """Tests that every blob of the goal colour is counted by size."""
+        assert BlobGoal(COLOUR_LIST[1]).histogram(board_16x16) == {4: 1, 2: 1}
+        assert BlobGoal(COLOUR_LIST[3]).histogram(board_16x16) == {5: 1}
+
+    def test_blob_goal_large_blob(self) -> None:
+        """Tests that a blob far larger than the recursion limit is scored."""
+        board = Block((0, 0), 750, COLOUR_LIST[2], 0, 8)
+        goal = BlobGoal(COLOUR_LIST[2])
+        assert goal.score(board) == 256 * 256
+        assert goal.histogram(board) == {256 * 256: 1}
+        assert goal._score_flattened(_flatten(board)) == 256 * 256
+        flattened = _flatten(board)
+        assert goal._undiscovered_blob_size((0, 0), flattened,
+                                            _grid(flattened)) == 256 * 256
+
+    def test_blob_goal_matches_flattened_score(self) -> None:
+        """Tests that scoring blobs on the tree agrees with scoring them on the
+        flattened board, including on boards of mixed depth."""
+        for max_depth in range(5):
+            for board in generate_boards(10, max_depth, 750, max_depth):
+                cells = _flatten(board)
+                for colour in COLOUR_LIST:
+                    goal = BlobGoal(colour)
+                    assert goal.score(board) == goal._score_flattened(cells)
+                    sizes = _blob_sizes(cells, goal.colour_index)
+                    assert goal.histogram(board) == \
+                        {size: sizes.count(size) for size in sizes}
+
     def test_blob_goal_only_middle(self, board_16x16_blobby) -> None:
         """Tests for only the middle of blob."""
         correct_scores = [
@@ -700,6 +1293,21 @@ class TestGoal:
         goal = PerimeterGoal(COLOUR_LIST[1])
         assert goal.score(board_1x1) == 4
 
+    def test_perimeter_goal_1x1_block_other_colour(self, board_1x1) -> None:
+        """Tests that a 1x1 board of another colour scores nothing."""
+        goal = PerimeterGoal(COLOUR_LIST[0])
+        assert goal.score(board_1x1) == 0
+        assert goal._score_flattened(_flatten(board_1x1)) == 0
+
+    def test_perimeter_goal_matches_flattened_score(self) -> None:
+        """Tests that scoring the edge of the tree agrees with scoring the
+        flattened board."""
+        for board in generate_boards(20, 6, 750, 42):
+            cells = _flatten(board)
+            for colour in COLOUR_LIST:
+                goal = PerimeterGoal(colour)
+                assert goal.score(board) == goal._score_flattened(cells)
+
     def test_perimeter_goal_no_middle(self, board_16x16_perimeter):
         """Tests that the blobs in the middle are not counted to the score"""
         correct_scores = [
@@ -728,6 +1336,152 @@ class TestGoal:
             goal = PerimeterGoal(colour)
             assert goal.score(board_16x16_blobby) == expected
 
+    def test_score_all(self) -> None:
+        """Tests that scoring every goal at once matches scoring each one."""
+        for board in generate_boards(20, 5, 750, 7):
+            goals = [PerimeterGoal(colour) for colour in COLOUR_LIST] + \
+                    [BlobGoal(colour) for colour in COLOUR_LIST]
+            assert score_all(board, goals) == \
+                [goal.score(board) for goal in goals]
+
+    def test_score_boards(self) -> None:
+        """Tests that scoring a batch of boards matches scoring each one."""
+        goals = [BlobGoal(colour) for colour in COLOUR_LIST] + \
+                [PerimeterGoal(colour) for colour in COLOUR_LIST]
+        for max_depth in range(5):
+            boards = generate_boards(30, max_depth, 750, max_depth)
+            assert score_boards(boards, goals) == \
+                [score_all(board, goals) for board in boards]
+        assert score_boards([], goals) == []
+
+    def test_score_boards_different_sizes(self) -> None:
+        """Tests that boards of different sizes cannot be scored together."""
+        boards = [generate_board(2, 750), generate_board(3, 750)]
+        with pytest.raises(ValueError):
+            score_boards(boards, [BlobGoal(COLOUR_LIST[0])])
+
+    def test_score_delta(self) -> None:
+        """Tests that score_delta matches making the move on a copy of the
+        board and rescoring it."""
+        rng = random.Random(3)
+        actions = [ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, SWAP_HORIZONTAL,
+                   SWAP_VERTICAL, PAINT, COMBINE, PASS]
+        goals = [PerimeterGoal(colour) for colour in COLOUR_LIST] + \
+                [BlobGoal(colour) for colour in COLOUR_LIST]
+        for board in generate_boards(10, 4, 750, 9):
+            blocks = list(board.iter_nodes())
+            index = BlobIndex(board)
+            for _ in range(10):
+                block = rng.choice(blocks)
+                action = rng.choice(actions)
+                for goal in goals:
+                    copy = board.create_copy()
+                    moved = _get_block(copy, block.position, block.level)
+                    if action[0] in ('rotate', 'swap'):
+                        getattr(moved, action[0])(action[1])
+                    elif action == PAINT:
+                        moved.paint(goal.colour)
+                    elif action == COMBINE:
+                        moved.combine()
+                    move = (action[0], action[1], block)
+                    delta = goal.score(copy) - goal.score(board)
+                    assert goal.score_delta(board, move) == delta
+                    assert goal.score_delta(board, move, index) == delta
+
+    def test_score_delta_smash(self, board_no_children) -> None:
+        """Tests that a smash cannot be scored before it is made."""
+        with pytest.raises(ValueError):
+            BlobGoal(COLOUR_LIST[0]).score_delta(
+                board_no_children, (SMASH[0], SMASH[1], board_no_children))
+
+    def test_blob_score_delta_relabels_less(self, monkeypatch) -> None:
+        """Tests that BlobGoal.score_delta relabels fewer leaves than
+        labelling the whole board when it is given a BlobIndex, and still
+        agrees with rescoring after the board is changed and the index is
+        updated."""
+        calls = []
+        around = BlobIndex._around
+
+        def counted(index: BlobIndex, *args) -> Iterator[int]:
+            calls.append(args)
+            return around(index, *args)
+
+        monkeypatch.setattr(BlobIndex, '_around', counted)
+        random.seed(4)
+        board = generate_board(5, 750)
+        goal = BlobGoal(COLOUR_LIST[0])
+        index = BlobIndex(board)
+        rescore = len(calls)
+
+        block = next(b for b in board.iter_nodes()
+                     if b.level == board.max_depth - 1 and b.children)
+        move = (ROTATE_CLOCKWISE[0], ROTATE_CLOCKWISE[1], block)
+        calls.clear()
+        goal.score_delta(board, move, index)
+        assert len(calls) < rescore
+
+        block.rotate(ROTATE_CLOCKWISE[1])
+        index.update(block)
+        for b in board.iter_nodes():
+            if b.children:
+                move = (SWAP_VERTICAL[0], SWAP_VERTICAL[1], b)
+                copy = board.create_copy()
+                _get_block(copy, b.position, b.level).swap(SWAP_VERTICAL[1])
+                assert goal.score_delta(board, move, index) == \
+                    goal.score(copy) - goal.score(board)
+
+    def test_blob_index_tracks_moves(self) -> None:
+        """Tests that a BlobIndex updated after each move agrees with scoring
+        the board from scratch."""
+        rng = random.Random(5)
+        for board in generate_boards(10, 4, 750, 2):
+            index = BlobIndex(board)
+            for _ in range(20):
+                block = rng.choice(list(board.iter_nodes()))
+                rng.choice([lambda: block.swap(rng.randint(0, 1)),
+                            lambda: block.rotate(rng.choice([1, 3])),
+                            lambda: block.paint(rng.choice(COLOUR_LIST)),
+                            block.combine, block.smash])()
+                index.update(block)
+                for colour in COLOUR_LIST:
+                    goal = BlobGoal(colour)
+                    assert index.largest(goal.colour_index) == \
+                        goal.score(board)
+                    assert index.histogram(goal.colour_index) == \
+                        goal.histogram(board)
+
+    def test_game_data_scores_track_moves(self) -> None:
+        """Tests that the scores kept by GameData follow the moves made in
+        the game."""
+        board = generate_boards(1, 4, 750, 8)[0]
+        players = [RandomPlayer(i, BlobGoal(COLOUR_LIST[i])) for i in range(2)]
+        data = GameData(board, players)
+        state = MainState(data)
+        rng = random.Random(8)
+        for _ in range(20):
+            block = rng.choice(list(board.iter_nodes()))
+            state._do_move(rng.choice([ROTATE_CLOCKWISE, SWAP_VERTICAL, COMBINE,
+                                       PAINT]) + (block,))
+            for player in players:
+                assert data.calculate_score(player.id)[0] == \
+                    player.goal.score(board)
+
+    def test_game_data_scores_other_boards(self) -> None:
+        """Tests that GameData scores boards that are not Blocks, before and
+        after a move."""
+        random.seed(6)
+        for board in [generate_linear_board(3, 750),
+                      generate_lazy_board(3, 750)]:
+            players = [RandomPlayer(0, BlobGoal(COLOUR_LIST[0])),
+                       RandomPlayer(1, PerimeterGoal(COLOUR_LIST[1]))]
+            data = GameData(board, players)
+            state = MainState(data)
+            for block in [board, board.children[2]]:
+                for player in players:
+                    assert data.calculate_score(player.id)[0] == \
+                        player.goal.score(board)
+                state._do_move(ROTATE_CLOCKWISE + (block,))
+
     def test_generate_goals(self) -> None:
         """Tests generate_goal, testing that there are no duplicates """
         goals = generate_goals(4)
@@ -762,6 +1516,258 @@ class TestGoal:
         g2 = goal2._undiscovered_blob_size((0, 0), flattened, visited)
         assert g2 == 0
 
+    def test_flatten_array(self, board_16x16, flattened_board_16x16) -> None:
+        """Tests that _flatten_array matches _flatten."""
+        pytest.importorskip('numpy')
+        assert _flatten_array(board_16x16).tolist() == flattened_board_16x16
+        board = generate_boards(1, 5, 750, 3)[0]
+        assert _flatten_array(board).tolist() == _flatten(board)
+
+    def test_stack_arrays(self, board_16x16, flattened_board_16x16) -> None:
+        """Tests that the stacked grids match _flatten."""
+        pytest.importorskip('numpy')
+        board = generate_boards(1, 2, 750, 3)[0]
+        grids = _stack_arrays([board_16x16, board])
+        assert grids[0].tolist() == flattened_board_16x16
+        assert grids[1].tolist() == _flatten(board)
+
+    def test_array_scores_match_list_scores(self) -> None:
+        """Tests that the numpy scoring paths agree with the list ones on
+        random boards."""
+        pytest.importorskip('numpy')
+        for board in generate_boards(20, 5, 750, 148):
+            grid, cells = _flatten_array(board), _flatten(board)
+            for colour in COLOUR_LIST:
+                for goal in (BlobGoal(colour), PerimeterGoal(colour)):
+                    assert goal._score_array(grid) == \
+                        goal._score_flattened(cells)
+
+
+class TestLinearBlock:
+    """A collection of methods for testing the LinearBlock class against the
+    reference boards built from Blocks.
+    """
+
+    def test_from_block(self, board_16x16) -> None:
+        """Test that converting a Block keeps its structure."""
+        linear = LinearBlock.from_block(board_16x16)
+        assert linear == board_16x16
+        assert linear.to_block() == board_16x16
+
+    def test_swap(self, board_16x16, board_16x16_swap0,
+                  board_16x16_swap1) -> None:
+        linear = LinearBlock.from_block(board_16x16)
+        assert linear.swap(0)
+        assert linear == board_16x16_swap0
+        assert linear.swap(0)
+        assert linear.swap(1)
+        assert linear == board_16x16_swap1
+
+    def test_rotate(self, board_16x16, board_16x16_rotate1,
+                    board_16x16_rotate3) -> None:
+        linear = LinearBlock.from_block(board_16x16)
+        assert linear.children[0].rotate(1)
+        assert linear == board_16x16_rotate1
+        assert linear.children[0].rotate(3)
+        assert linear.children[0].rotate(3)
+        assert linear == board_16x16_rotate3
+
+    def test_paint_and_combine(self, board_16x16, board_16x16_paint,
+                               board_16x16_combine) -> None:
+        linear = LinearBlock.from_block(board_16x16)
+        assert not linear.children[0].paint(COLOUR_LIST[3])
+        assert linear.children[0].children[0].paint(COLOUR_LIST[3])
+        assert linear == board_16x16_paint
+
+        linear = LinearBlock.from_block(board_16x16)
+        assert linear.children[0].combine()
+        assert linear == board_16x16_combine
+
+    def test_create_copy(self, board_16x16) -> None:
+        """Test that a copy does not share its nodes with the original."""
+        linear = LinearBlock.from_block(board_16x16)
+        copy = linear.create_copy()
+        copy.swap(0)
+        assert linear == board_16x16
+        assert copy != linear
+
+    def test_smash_and_goals(self) -> None:
+        """Test that a random linear board can be scored and searched like a
+        Block."""
+        board = generate_linear_board(4, 750)
+        block = board.to_block()
+        for colour in COLOUR_LIST:
+            assert PerimeterGoal(colour).score(board) == \
+                PerimeterGoal(colour).score(block)
+            assert BlobGoal(colour).score(board) == \
+                BlobGoal(colour).score(block)
+        assert _get_block(board, (700, 700), 4) == \
+            _get_block(block, (700, 700), 4)
+
+
+class TestLazyBlock:
+    """A collection of methods for testing the LazyBlock class against the
+    reference boards built from Blocks.
+    """
+
+    def test_positions(self, board_16x16) -> None:
+        """Test that derived positions and sizes match the stored ones."""
+        lazy = LazyBlock.from_block(board_16x16)
+        assert lazy == board_16x16
+        assert lazy.children[0].children[3].path() == [0, 3]
+        assert lazy.children[0].children[3].position == (563, 188)
+        assert lazy.children[0].children[3].size == 188
+        assert lazy.to_block() == board_16x16
+
+    def test_swap_moves_children_only(self, board_16x16,
+                                      board_16x16_swap0) -> None:
+        lazy = LazyBlock.from_block(board_16x16)
+        top_right = lazy.children[0]
+        assert lazy.swap(0)
+        assert lazy.children[1] is top_right
+        assert top_right.children[0].position == (188, 0)
+        assert lazy == board_16x16_swap0
+
+    def test_rotate(self, board_16x16, board_16x16_rotate1,
+                    board_16x16_rotate3) -> None:
+        lazy = LazyBlock.from_block(board_16x16)
+        assert lazy.children[0].rotate(1)
+        assert lazy == board_16x16_rotate1
+        assert lazy.children[0].rotate(3)
+        assert lazy.children[0].rotate(3)
+        assert lazy == board_16x16_rotate3
+
+    def test_slots(self) -> None:
+        """Test that LazyBlocks do not carry an instance dictionary."""
+        board = generate_lazy_board(3, 750)
+        assert not hasattr(board, '__dict__')
+        copy = board.create_copy()
+        assert copy == board
+
+
+class TestPersistentBoard:
+    """A collection of methods for testing the PersistentBoard class."""
+
+    def test_moves(self, board_16x16, board_16x16_swap0, board_16x16_rotate1,
+                   board_16x16_paint, board_16x16_combine) -> None:
+        """Test that each move returns the expected board and leaves the
+        original unchanged."""
+        board = PersistentBoard.from_block(board_16x16)
+        assert board.swap([], 0).to_block() == board_16x16_swap0
+        assert board.rotate([0], 1).to_block() == board_16x16_rotate1
+        assert board.paint([0, 0], COLOUR_LIST[3]).to_block() == \
+            board_16x16_paint
+        assert board.combine([0]).to_block() == board_16x16_combine
+        assert board.to_block() == board_16x16
+
+    def test_invalid_moves(self, board_16x16) -> None:
+        board = PersistentBoard.from_block(board_16x16)
+        assert board.swap([1], 0) is None
+        assert board.rotate([0, 0], 1) is None
+        assert board.paint([1], COLOUR_LIST[0]) is None
+        assert board.combine([]) is None
+        assert board.smash([0, 0]) is None
+        assert board.smash([1]) is not None
+
+    def test_structural_sharing(self, board_16x16) -> None:
+        """Test that a move only copies the path to the moved block."""
+        board = PersistentBoard.from_block(board_16x16)
+        moved = board.swap([0], 1)
+        assert moved.root is not board.root
+        for i in range(1, 4):
+            assert moved.root.children[i] is board.root.children[i]
+        assert board.create_copy().root is board.root
+
+    def test_rotate_copies_path(self) -> None:
+        """Test that a rotate only copies the path to the rotated block, and
+        that later moves see the rotated board."""
+        rng = random.Random(3)
+        for seed in range(5):
+            random.seed(seed)
+            block = generate_board(4, 750)
+            board = PersistentBoard.from_block(block)
+            for _ in range(10):
+                target = rng.choice([b for b in block.iter_nodes()
+                                     if b.children])
+                path = list(block_path(target))
+                direction = rng.choice([1, 3])
+                rotated = board.rotate(path, direction)
+                assert rotated.block_at(path)._children is \
+                    board.block_at(path)._children
+                target.rotate(direction)
+                assert rotated.to_block() == block
+                board = rotated
+        board = generate_persistent_board(4, 750)
+        block = board.to_block()
+        path = board.path_at((600, 100), 4)
+        expected = _get_block(block, (600, 100), 4)
+        assert board.block_at(path).colour == expected.colour
+        assert len(path) == expected.level
+
+
+class TestBitboard:
+    """A collection of methods for testing the Bitboard class."""
+
+    def test_from_block(self, board_16x16) -> None:
+        """Tests that cells are stored one row after another."""
+        bits = Bitboard.from_block(board_16x16)
+        assert bits.width == 4
+        assert bits.masks[0] == 1 << 3
+        assert bits.masks[2] == 1 | 1 << 1 | 1 << 4 | 1 << 5
+        assert sum(bin(mask).count('1') for mask in bits.masks) == 16
+
+    def test_scores_match_goals(self) -> None:
+        """Tests that scoring a Bitboard agrees with scoring the tree."""
+        for board in generate_boards(20, 5, 750, 21):
+            bits = Bitboard.from_block(board)
+            for colour in COLOUR_LIST:
+                blob = BlobGoal(colour)
+                assert blob._score_bitboard(bits) == \
+                    max(_blob_sizes(_flatten(board), blob.colour_index),
+                        default=0)
+
+
+class TestBoardIO:
+    """A collection of methods for testing the binary board format."""
+
+    def test_round_trip(self, board_16x16, board_1x1) -> None:
+        assert decode_board(encode_board(board_16x16)) == board_16x16
+        assert decode_board(encode_board(board_1x1)) == board_1x1
+
+    def test_round_trip_random(self) -> None:
+        for board in generate_boards(20, 6, 750, 148):
+            assert decode_board(encode_board(board)) == board
+
+    def test_max_encoded_size(self) -> None:
+        """Tests that a board split all the way down takes the most bytes."""
+        for max_depth in range(5):
+            board = Block((0, 0), 750, COLOUR_LIST[0], 0, max_depth)
+            full = board.create_copy()
+            for block in full.iter_nodes():
+                block.smash()
+            assert len(encode_board(full)) == max_encoded_size(max_depth)
+            for b in generate_boards(10, max_depth, 750, max_depth):
+                assert len(encode_board(b)) <= max_encoded_size(max_depth)
+
+    def test_corpus(self, tmp_path) -> None:
+        """Test that boards can be read back from a corpus in any order."""
+        boards = generate_boards(25, 5, 750, 3)
+        path = str(tmp_path / 'boards.blkc')
+        assert write_corpus(path, boards) == 25
+        with BoardCorpus(path) as corpus:
+            assert len(corpus) == 25
+            assert corpus[24] == boards[24]
+            assert corpus[-25] == boards[0]
+            assert corpus.boards() == boards
+            with pytest.raises(IndexError):
+                corpus[25]
+
+    def test_not_a_corpus(self, tmp_path) -> None:
+        path = tmp_path / 'boards.blkc'
+        path.write_bytes(b'not a corpus file at all')
+        with pytest.raises(ValueError):
+            BoardCorpus(str(path))
+
 
 if __name__ == '__main__':
     pytest.main(['example_tests.py'])
@@ -52,14 +52,18 @@ class Game:
     def __init__(self, max_depth: int,
                  num_human: int,
                  num_random: int,
-                 smart_players: List[int]) -> None:
+                 smart_players: List[int],
+                 processes: int = 1) -> None:
         """Initialize this game, as described in the Assignment 2 handout.
 
+        Each SmartPlayer evaluates its moves on <processes> processes.
+
         Precondition:
             2 <= max_depth <= 5
         """
         board = generate_board(max_depth, BOARD_SIZE)
-        players = create_players(num_human, num_random, smart_players)
+        players = create_players(num_human, num_random, smart_players,
+                                 processes)
 
         self._renderer = Renderer(BOARD_SIZE)
         self._data = GameData(board, players)
@@ -77,6 +81,8 @@ class Game:
             # Process events
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
+                    for player in self._data.players:
+                        player.close()
                     return
                 else:
                     self._state.process_event(e)
@@ -23,9 +23,19 @@ This file contains the hierarchy of Goal classes.
 """
 from __future__ import annotations
 import random
-from typing import List, Tuple, Union
-from block import Block
-from settings import colour_name, COLOUR_LIST
+from typing import Dict, Iterator, List, Optional, Tuple
+from bitboard import Bitboard
+from block import Block, _OFFSETS
+from settings import colour_index, colour_name, COLOUR_LIST
+
+# BlobGoal scores boards with at most this many levels below the root on a
+# Bitboard, which is faster than labelling leaves until boards get larger.
+_BITBOARD_LEVELS = 6
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def _instantiate_goal(goal_type: str, colour: Tuple[int, int, int]) -> Goal:
@@ -72,7 +82,7 @@ def generate_goals(num_goals: int) -> List[Goal]:
     return result
 
 
-def _grid(flattened: List[List[Tuple[int, int, int]]]) -> List[List[int]]:
+def _grid(flattened: List[List[int]]) -> List[List[int]]:
     """Returns a <flattened> block with -1 in the position of each cell."""
     r = []
     for _ in flattened:
@@ -83,20 +93,7 @@ def _grid(flattened: List[List[Tuple[int, int, int]]]) -> List[List[int]]:
     return r
 
 
-def _decolumnise(block: Union[List[Tuple],
-                              List[List[Tuple]]]) -> List[Tuple[int, int, int]]:
-    """Return a list representing the raw colours in this <block>, flattening
-    the columns."""
-    lst = []
-    for b in block:
-        if not isinstance(b, list):
-            lst.append(b)
-        else:
-            lst.extend(_decolumnise(b))
-    return lst
-
-
-def _flatten(block: Block) -> List[List[Tuple[int, int, int]]]:
+def _flatten(block: Block) -> List[List[int]]:
     """Return a two-dimensional list representing <block> as rows and columns of
     unit cells.
 
@@ -105,46 +102,483 @@ def _flatten(block: Block) -> List[List[Tuple[int, int, int]]]:
         - L[i] represents column i and
         - L[i][j] represents the unit cell at column i and row j.
 
-    Each unit cell is represented by a tuple of 3 ints, which is the colour
+    Each unit cell is represented by the index in COLOUR_LIST of the colour
     of the block at the cell location[i][j]
 
     L[0][0] represents the unit cell in the upper left corner of the Block.
     """
-    # TODO: Implement me
-    # TT: Must test on board with depth >= 3 and diff depths
-    if block.colour is not None:
-        res = []
-        for _ in range(2 ** (block.max_depth - block.level)):
-            cell = []
-            for _ in range(2 ** (block.max_depth - block.level)):
-                cell.append(block.colour)
-            res.append(cell)
-        return res
+    size = 2 ** (block.max_depth - block.level)
+    res = [[None] * size for _ in range(size)]
+
+    # Each leaf fills its own square of cells, one column slice at a time.
+    for leaf, column, row, span in block.iter_cells():
+        cells = [leaf.colour_index] * span
+        for i in range(column, column + span):
+            res[i][row:row + span] = cells
+
+    return res
+
+
+def _blob_sizes(flattened: List[List[int]], colour: int) -> List[int]:
+    """Return the size of every connected blob of cells of <colour> in the
+    <flattened> board, in no particular order.
+
+    The cells are labelled in a single pass with a union-find structure that
+    holds one entry per cell, joining each cell of <colour> to the cells of
+    <colour> to its left and above it.
+    """
+    n = len(flattened)
+    # parent[k] is the parent of cell k, where cell k is at column k // n and
+    # row k % n. The root of each blob is its own parent.
+    parent = list(range(n * n))
+
+    def find(k: int) -> int:
+        while parent[k] != k:
+            # Path halving: point each cell on the way at its grandparent.
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    for i in range(n):
+        column = flattened[i]
+        for j in range(n):
+            if column[j] != colour:
+                continue
+            k = i * n + j
+            if j > 0 and column[j - 1] == colour:
+                parent[find(k)] = find(k - 1)
+            if i > 0 and flattened[i - 1][j] == colour:
+                root, other = find(k), find(k - n)
+                if root != other:
+                    parent[root] = other
+
+    sizes = {}
+    for i in range(n):
+        for j in range(n):
+            if flattened[i][j] == colour:
+                root = find(i * n + j)
+                sizes[root] = sizes.get(root, 0) + 1
+    return list(sizes.values())
+
+
+def _leaf_blob_sizes(board: Block, colour: int) -> List[int]:
+    """Return the size in unit cells of every connected blob of <colour> on
+    <board>, in no particular order, without flattening <board>.
+    """
+    return [size for _, size in _leaf_blobs(board, colour)]
+
+
+def _leaf_blobs(board: Block, colour: Optional[int]) -> List[Tuple[int, int]]:
+    """Return the colour index and the size in unit cells of every connected
+    blob of <colour> on <board>, or of every blob of every colour if <colour>
+    is None, in no particular order.
+    """
+    end = 2 ** (board.max_depth - board.level)
+    labels = _BlobLabels(end, colour)
+    labels.add((board, 0, 0, end))
+    return labels.blobs()
+
+
+def _child_cells(entry: Tuple[Block, int, int, int],
+                 i: int) -> Tuple[Block, int, int, int]:
+    """Return child <i> of the block in <entry> with the cells it covers, in
+    the same form as the (block, column, row, span) <entry>.
+
+    A leaf is returned as it is, since it covers the cells of all its would-be
+    children.
+    """
+    block, column, row, span = entry
+    if not block.children:
+        return entry
+    half = span // 2
+    return (block.children[i], column + _OFFSETS[i][0] * half,
+            row + _OFFSETS[i][1] * half, half)
+
+
+class _BlobLabels:
+    """The blobs formed by some of the leaves of a board, labelled with a
+    union-find structure.
+
+    Blocks are given as (block, column, row, span) entries, as yielded by
+    iter_cells, and each leaf is named by the unit cell at its upper left
+    corner. Touching leaves of the same colour are joined whenever they share
+    part of an edge, and each blob's size is the total area of its leaves.
+    The shared edges are found by pairing up, for each pair of neighbouring
+    siblings, the blocks along the side they share, so the cost depends on the
+    number of leaves and not on the number of unit cells.
+    """
+    # === Private Attributes ===
+    # _end:
+    #   The number of unit cells along each side of the board.
+    # _colour:
+    #   The colour index of the leaves being labelled, or None if leaves of
+    #   every colour are.
+    # _parent:
+    #   The parent of each leaf that has been added. The root of each blob is
+    #   its own parent.
+    # _area:
+    #   The number of unit cells in each blob, stored at its root.
+    # _colours:
+    #   The colour index of each leaf that has been added.
+    _end: int
+    _colour: Optional[int]
+    _parent: Dict[int, int]
+    _area: Dict[int, int]
+    _colours: Dict[int, int]
+
+    def __init__(self, end: int, colour: Optional[int]) -> None:
+        self._end = end
+        self._colour = colour
+        self._parent = {}
+        self._area = {}
+        self._colours = {}
+
+    def copy(self) -> _BlobLabels:
+        """Return a copy of these labels that can be added to separately.
+        """
+        labels = _BlobLabels(self._end, self._colour)
+        labels._parent = self._parent.copy()
+        labels._area = self._area.copy()
+        labels._colours = self._colours.copy()
+        return labels
+
+    def _find(self, k: int) -> int:
+        """Return the root of the blob of leaf <k>.
+        """
+        parent = self._parent
+        while parent[k] != k:
+            # Path halving: point each leaf on the way at its grandparent.
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    def blobs(self) -> List[Tuple[int, int]]:
+        """Return the colour index and size of every blob, in no particular
+        order.
+        """
+        return [(self._colours[k], self._area[k])
+                for k, parent in self._parent.items() if k == parent]
+
+    def largest(self) -> int:
+        """Return the size of the largest blob, or 0 if there are none.
+        """
+        return max((self._area[k] for k, parent in self._parent.items()
+                    if k == parent), default=0)
+
+    def add(self, entry: Tuple[Block, int, int, int],
+            hole: Optional[Tuple[int, int, int]] = None) -> \
+            List[Tuple[Tuple[Block, int, int, int],
+                       Tuple[Block, int, int, int], bool]]:
+        """Add the leaves of the block in <entry> and join them into blobs.
+
+        If <hole> is a (column, row, span), the block covering exactly those
+        cells is left out. Return the pairs of neighbouring blocks, in the form
+        taken by join, in which one of the blocks is the one left out.
+        """
+        nodes = [entry]
+        pairs = []
+        while nodes:
+            entry = nodes.pop()
+            block = entry[0]
+            if entry[1:] == hole:
+                continue
+            elif not block.children:
+                if self._colour is None or block.colour_index == self._colour:
+                    k = entry[1] * self._end + entry[2]
+                    self._parent[k] = k
+                    self._area[k] = entry[3] * entry[3]
+                    self._colours[k] = block.colour_index
+                continue
+            kids = [_child_cells(entry, i) for i in range(4)]
+            nodes.extend(kids)
+            pairs.extend([(kids[1], kids[0], True), (kids[2], kids[3], True),
+                          (kids[1], kids[2], False), (kids[0], kids[3], False)])
+        return self.join(pairs, hole)
+
+    def join(self, pairs: List[Tuple[Tuple[Block, int, int, int],
+                                     Tuple[Block, int, int, int], bool]],
+             hole: Optional[Tuple[int, int, int]] = None) -> \
+            List[Tuple[Tuple[Block, int, int, int],
+                       Tuple[Block, int, int, int], bool]]:
+        """Join the leaves along the shared side of each pair in <pairs>.
+
+        Each pair holds two neighbouring blocks, and whether the first is to
+        the left of the second rather than above it. The leaves must already
+        have been added. Pairs that reach the block covering the cells in
+        <hole> are not followed into it, and are returned instead.
+        """
+        colour = self._colour
+        holes = []
+        while pairs:
+            a, b, beside = pairs.pop()
+            if a[1:] == hole or b[1:] == hole:
+                holes.append((a, b, beside))
+            elif colour is not None and (
+                    (not a[0].children and a[0].colour_index != colour) or
+                    (not b[0].children and b[0].colour_index != colour)):
+                # No leaf on this side of the edge can join a blob.
+                continue
+            elif not a[0].children and not b[0].children:
+                if a[0].colour_index != b[0].colour_index:
+                    continue
+                root = self._find(a[1] * self._end + a[2])
+                other = self._find(b[1] * self._end + b[2])
+                if root != other:
+                    self._parent[root] = other
+                    self._area[other] += self._area[root]
+            elif beside:
+                # The right side of a meets the left side of b.
+                pairs.append((_child_cells(a, 0), _child_cells(b, 1), True))
+                pairs.append((_child_cells(a, 3), _child_cells(b, 2), True))
+            else:
+                # The bottom of a meets the top of b.
+                pairs.append((_child_cells(a, 2), _child_cells(b, 1), False))
+                pairs.append((_child_cells(a, 3), _child_cells(b, 0), False))
+        return holes
 
+
+def _cells_of(board: Block, block: Block) -> Tuple[int, int, int]:
+    """Return the (column, row, span) of the unit cells covered by <block>, as
+    iter_cells would give them for <board>.
+
+    Precondition: <block> is <board> or one of its descendants.
+    """
+    column, row, span = 0, 0, 2 ** (board.max_depth - board.level)
+    x, y = block.position
+    while board.level < block.level:
+        # The child that includes <block> is found from which side of the
+        # centre of <board> the corner of <block> is on.
+        size = board._child_size()
+        i = (1, 0, 2, 3)[(y >= board.position[1] + size) * 2 +
+                         (x >= board.position[0] + size)]
+        board, column, row, span = _child_cells((board, column, row, span), i)
+    return column, row, span
+
+
+def _after_move(move: Tuple[str, Optional[int], Block],
+                colour: Tuple[int, int, int]) -> Optional[Block]:
+    """Return a copy of the block that <move> is made on, with <move> made on
+    the copy, or None if <move> would not change the board.
+
+    A paint uses <colour>. Raise ValueError if <move> is a smash, since the
+    result of a smash is random.
+    """
+    action, direction, block = move
+    if action == 'smash':
+        raise ValueError('a smash cannot be scored before it is made')
+
+    copy = block.create_copy()
+    if action == 'swap':
+        changed = copy.swap(direction)
+    elif action == 'rotate':
+        changed = copy.rotate(direction)
+    elif action == 'paint':
+        changed = copy.paint(colour)
+    elif action == 'combine':
+        changed = copy.combine()
     else:
-        # Recursive case: block has children
-        size, res = 2 ** (block.max_depth - block.level), []
+        # action == 'pass'
+        changed = False
+    return copy if changed else None
+
+
+def _border_score(block: Block, column: int, row: int, end: int,
+                  colour: int) -> int:
+    """Return the number of unit cells of <colour> covered by <block> that are
+    on the perimeter of a board <end> cells across, counting corner cells
+    twice. <block> covers the cells from <column> and <row>.
+
+    Only the blocks that touch the perimeter are visited.
+    """
+    score = 0
+    stack = [(block, column, row, 2 ** (block.max_depth - block.level))]
+    while stack:
+        entry = stack.pop()
+        b, c, r, span = entry
+        if c != 0 and r != 0 and c + span != end and r + span != end:
+            continue
+        elif not b.children:
+            # A leaf scores its span once for each side of the board it lies
+            # on, so a leaf in a corner scores the corner cell twice.
+            if b.colour_index == colour:
+                score += span * ((c == 0) + (r == 0) + (c + span == end) +
+                                 (r + span == end))
+        else:
+            stack.extend(_child_cells(entry, i) for i in range(4))
+    return score
+
+
+def score_all(board: Block, goals: List[Goal],
+              blobs: Optional[BlobIndex] = None) -> List[int]:
+    """Return the score of each goal in <goals> on <board>, in order.
+
+    The perimeter counts of every colour come from the board's edge counts.
+    The largest blob of every colour is looked up in <blobs> if it is given,
+    and otherwise found in one walk over the board, however many goals there
+    are, and only if some goal needs it.
+
+    Precondition: <blobs> is None or an up to date BlobIndex of <board>.
+
+    >>> from block import Block
+    >>> board = Block((0, 0), 750, COLOUR_LIST[1], 0, 1)
+    >>> score_all(board, [PerimeterGoal(COLOUR_LIST[1]),
+    ...                   BlobGoal(COLOUR_LIST[1]), BlobGoal(COLOUR_LIST[0])])
+    [8, 4, 0]
+    """
+    perimeter = [0] * len(COLOUR_LIST)
+    if any(isinstance(goal, PerimeterGoal) for goal in goals):
+        for side in board.edge_counts():
+            for colour in range(len(COLOUR_LIST)):
+                perimeter[colour] += side[colour]
+
+    largest = [0] * len(COLOUR_LIST)
+    if blobs is not None:
+        largest = [blobs.largest(colour) for colour in range(len(COLOUR_LIST))]
+    elif any(isinstance(goal, BlobGoal) for goal in goals):
+        for colour, size in _leaf_blobs(board, None):
+            largest[colour] = max(largest[colour], size)
+
+    return [perimeter[goal.colour_index] if isinstance(goal, PerimeterGoal)
+            else largest[goal.colour_index] for goal in goals]
+
+
+def _flatten_array(block: Block) -> np.ndarray:
+    """Return the same grid as _flatten(<block>), as a numpy array of colour
+    indices.
+
+    A[i, j] is the index in COLOUR_LIST of the colour of the unit cell at
+    column i and row j.
+
+    Precondition: numpy is installed.
+    """
+    return _stack_arrays([block])[0]
+
 
-        # Reorder them based on the order of the output
-        blockies = block.children[1], block.children[2], \
-                   block.children[0], block.children[3]
+def _stack_arrays(boards: List[Block]) -> np.ndarray:
+    """Return the boards in <boards> flattened into grids of colour indices
+    and stacked into one array, so that A[k, i, j] is the index in
+    COLOUR_LIST of the colour of the unit cell at column i and row j of
+    <boards>[k], as in _flatten. Each leaf is written into the array with a
+    single slice assignment over the cells it covers.
 
-        i = 0
-        # Make a column and append it to res
-        while i < 4:
-            # Flatten and take adjacent blockies out of their columns
-            curr, nxt = _flatten(blockies[i]), _flatten(blockies[i + 1])
-            c, n = _decolumnise(curr), _decolumnise(nxt)
+    Raise ValueError if the boards do not all have the same number of unit
+    cells.
+
+    Precondition: numpy is installed.
+    """
+    sizes = {2 ** (board.max_depth - board.level) for board in boards}
+    if len(sizes) > 1:
+        raise ValueError('boards of different sizes cannot be stacked')
+
+    size = sizes.pop() if sizes else 1
+    grids = np.empty((len(boards), size, size), dtype=np.uint8)
+    for k, board in enumerate(boards):
+        grid = grids[k]
+        for leaf, column, row, span in board.iter_cells():
+            grid[column:column + span, row:row + span] = leaf.colour_index
+
+    return grids
+
+
+def _region_labels(grids: np.ndarray) -> np.ndarray:
+    """Return a label for every cell of the stack of grids <grids>, flattened,
+    where two cells have the same label if and only if they are connected in
+    the same grid by cells with the same value whose sides touch.
+
+    The label of a region is the flat index of its first cell. Regions are
+    found by union-find over every pair of touching cells with the same value
+    in the whole stack at once: each round, the root of each pair with the
+    larger label is hooked under the smaller, then every cell is pointed
+    straight at its root, until every pair has the same root. Cells in
+    different grids never touch, so regions never span grids.
+    """
+    total = grids.size
+    index = np.arange(total).reshape(grids.shape)
+    same_row = grids[:, 1:] == grids[:, :-1]
+    same_column = grids[:, :, 1:] == grids[:, :, :-1]
+    first = np.concatenate((index[:, 1:][same_row],
+                            index[:, :, 1:][same_column]))
+    second = np.concatenate((index[:, :-1][same_row],
+                             index[:, :, :-1][same_column]))
+
+    parent = np.arange(total)
+    while True:
+        first_root, second_root = parent[first], parent[second]
+        apart = first_root != second_root
+        if not apart.any():
+            return parent
+        first, second = first[apart], second[apart]
+        first_root, second_root = first_root[apart], second_root[apart]
+        np.minimum.at(parent, np.maximum(first_root, second_root),
+                      np.minimum(first_root, second_root))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def _largest_blobs(grids: np.ndarray) -> np.ndarray:
+    """Return an array A where A[k, c] is the number of cells in the largest
+    blob of colour c in grids[k], or 0 if it has none, for the stack of grids
+    <grids> made by _flatten_array or _stack_arrays.
+    """
+    count, cells = len(grids), grids[0].size if len(grids) else 0
+    largest = np.zeros((count, len(COLOUR_LIST)), dtype=np.int64)
+    if count == 0:
+        return largest
+
+    sizes = np.bincount(_region_labels(grids), minlength=grids.size)
+    labels = np.flatnonzero(sizes)
+    np.maximum.at(largest, (labels // cells, grids.ravel()[labels]),
+                  sizes[labels])
+    return largest
+
+
+def score_boards(boards: List[Block], goals: List[Goal]) -> List[List[int]]:
+    """Return the score of each goal in <goals> on each board in <boards>, so
+    that entry k is score_all(<boards>[k], <goals>).
+
+    With numpy, the boards are flattened into one stack of grids. The
+    perimeter counts of every colour on every board are one comparison and
+    sum over the stacked sides, and the blobs of every colour on every board
+    are labelled together by _largest_blobs. Without numpy, each board is
+    scored by score_all.
+
+    Raise ValueError if the boards do not all have the same number of unit
+    cells and numpy is installed.
+
+    >>> from block import Block
+    >>> boards = [Block((0, 0), 750, colour, 0, 1) for colour in COLOUR_LIST]
+    >>> score_boards(boards[:2], [PerimeterGoal(COLOUR_LIST[1]),
+    ...                           BlobGoal(COLOUR_LIST[0])])
+    [[0, 4], [8, 0]]
+    """
+    if np is None or not boards:
+        return [score_all(board, goals) for board in boards]
 
-            # Make columns with adjacent top and bottom blockies
-            start, end = 0, size // 2
-            while start < len(c):
-                top, bottom = c[start:end], n[start:end]
-                res.append(top + bottom)
-                start, end = start + size // 2, end + size // 2
-            i += 2
+    grids = _stack_arrays(boards)
+    colours = np.arange(len(COLOUR_LIST), dtype=np.uint8)
+    scores = np.zeros((len(boards), len(goals)), dtype=np.int64)
 
-        return res
+    perimeter = [k for k, goal in enumerate(goals)
+                 if isinstance(goal, PerimeterGoal)]
+    if perimeter:
+        sides = np.concatenate((grids[:, 0], grids[:, -1], grids[:, :, 0],
+                                grids[:, :, -1]), axis=1)
+        # counts[k, c] is the number of cells of colour c on the sides of
+        # board k.
+        counts = (sides[:, :, np.newaxis] == colours).sum(axis=1)
+        for k in perimeter:
+            scores[:, k] = counts[:, goals[k].colour_index]
+
+    blob = [k for k, goal in enumerate(goals) if isinstance(goal, BlobGoal)]
+    if blob:
+        largest = _largest_blobs(grids)
+        for k in blob:
+            scores[:, k] = largest[:, goals[k].colour_index]
+
+    return scores.tolist()
 
 
 class Goal:
@@ -156,13 +590,20 @@ class Goal:
     colour:
         The target colour for this goal, that is the colour to which
         this goal applies.
+    colour_index:
+        The index of the target colour in COLOUR_LIST, which is what the
+        colours of a board are compared against.
     """
     colour: Tuple[int, int, int]
+    colour_index: int
 
     def __init__(self, target_colour: Tuple[int, int, int]) -> None:
         """Initialize this goal to have the given target colour.
+
+        Precondition: target_colour in COLOUR_LIST
         """
         self.colour = target_colour
+        self.colour_index = colour_index(target_colour)
 
     def score(self, board: Block) -> int:
         """Return the current score for this goal on the given board.
@@ -171,6 +612,26 @@ class Goal:
         """
         raise NotImplementedError
 
+    def score_delta(self, board: Block,
+                    move: Tuple[str, Optional[int], Block],
+                    blobs: Optional[BlobIndex] = None) -> int:
+        """Return how much the score for this goal on <board> would change if
+        <move> were made, without making it.
+
+        <move> is in the form returned by Player.generate_move, and a paint
+        uses this goal's colour. Only the part of the board that <move> could
+        change is rescored. The blobs of <board> are looked up in <blobs> if
+        it is given, so that the moves of a turn can all be scored against
+        blobs that were only labelled once.
+
+        Raise ValueError if <move> is a smash, since its result is random.
+
+        Preconditions:
+            - the block of <move> is <board> or one of its descendants
+            - <blobs> is None or an up to date BlobIndex of <board>
+        """
+        raise NotImplementedError
+
     def description(self) -> str:
         """Return a description of this goal.
         """
@@ -189,35 +650,74 @@ class PerimeterGoal(Goal):
     colour:
         The target colour for this goal, that is the colour to which
         this goal applies.
+    colour_index:
+        The index of the target colour in COLOUR_LIST.
     """
     colour: Tuple[int, int, int]
+    colour_index: int
 
     def score(self, board: Block) -> int:
         """Returns the number of blocks of the target colour that are in the
         perimeter of the board."""
-        # TODO: Implement me
-        b = _flatten(board)
+        # A corner cell is counted on both of its sides.
+        return sum(side[self.colour_index] for side in board.edge_counts())
+
+    def score_delta(self, board: Block,
+                    move: Tuple[str, Optional[int], Block],
+                    blobs: Optional[BlobIndex] = None) -> int:
+        # Only the cells of the moved block that are on the perimeter can
+        # change the score, so a block that does not touch the perimeter is
+        # never copied.
+        end = 2 ** (board.max_depth - board.level)
+        column, row, span = _cells_of(board, move[2])
+        if column != 0 and row != 0 and column + span != end and \
+                row + span != end:
+            if move[0] == 'smash':
+                raise ValueError('a smash cannot be scored before it is made')
+            return 0
+        after = _after_move(move, self.colour)
+        if after is None:
+            return 0
+        return _border_score(after, column, row, end, self.colour_index) - \
+            _border_score(move[2], column, row, end, self.colour_index)
+
+    def _score_flattened(self, b: List[List[int]]) -> int:
+        """Return the score of the board flattened into <b> by _flatten.
+        """
         score = 0
         for i in range(len(b)):
             if len(b[i]) == 1:
-                score += 4
+                # The only cell is all four corners at once.
+                if b[i][0] == self.colour_index:
+                    score += 4
 
             # Check if colour is in a corner spot
             elif i in (0, len(b) - 1):
-                score += b[i].count(self.colour)
-                if b[i][0] == self.colour:
+                score += b[i].count(self.colour_index)
+                if b[i][0] == self.colour_index:
                     score += 1
-                if b[i][-1] == self.colour:
+                if b[i][-1] == self.colour_index:
                     score += 1
 
             else:
                 # We are at a middle column
-                if b[i][0] == self.colour:
+                if b[i][0] == self.colour_index:
                     score += 1
-                if b[i][-1] == self.colour:
+                if b[i][-1] == self.colour_index:
                     score += 1
         return score
 
+    def _score_array(self, grid: np.ndarray) -> int:
+        """Return the score of the board flattened into <grid> by
+        _flatten_array.
+
+        Each side of the board is counted separately, which counts the corner
+        cells twice.
+        """
+        matches = grid == self.colour_index
+        return int(matches[0].sum() + matches[-1].sum() +
+                   matches[:, 0].sum() + matches[:, -1].sum())
+
     def description(self) -> str:
         # TODO: Implement me
         return f'Get as many blocks of colour {colour_name(self.colour)} on ' \
@@ -237,31 +737,68 @@ class BlobGoal(Goal):
     colour:
         The target colour for this goal, that is the colour to which
         this goal applies.
+    colour_index:
+        The index of the target colour in COLOUR_LIST.
     """
     colour: Tuple[int, int, int]
+    colour_index: int
 
     def score(self, board: Block) -> int:
         """Returns the score of the number of target coloured blocks in larger
         connected blocks of the same colour."""
-        # TODO: Implement me
-        b = _flatten(board)
+        if board.max_depth - board.level <= _BITBOARD_LEVELS:
+            return self._score_bitboard(Bitboard.from_block(board))
+        return max(_leaf_blob_sizes(board, self.colour_index), default=0)
+
+    def score_delta(self, board: Block,
+                    move: Tuple[str, Optional[int], Block],
+                    blobs: Optional[BlobIndex] = None) -> int:
+        after = _after_move(move, self.colour)
+        if after is None:
+            return 0
+        block = move[2]
+        if all(leaf.colour_index != self.colour_index
+               for leaf in block.iter_leaves()) and \
+                all(leaf.colour_index != self.colour_index
+                    for leaf in after.iter_leaves()):
+            # There are no cells of the goal colour to move.
+            return 0
 
-        # Make parallel structure for visited
-        visited = _grid(b)
-        _max = []
+        # Only the blobs that touch the moved block are relabelled.
+        if blobs is None:
+            blobs = BlobIndex(board)
+        return blobs.largest_after(block, after, self.colour_index) - \
+            blobs.largest(self.colour_index)
 
-        # Start with top left
-        for i in range(len(b)):
-            for j in range(len(b)):
-                pos = i, j
-                # Get the largest blob starting from pos
-                if visited[i][j] == -1:
-                    _max.append(self._undiscovered_blob_size(pos, b, visited))
+    def histogram(self, board: Block) -> Dict[int, int]:
+        """Return how many blobs of the target colour there are on <board> of
+        each size, as a dictionary from blob size to number of blobs.
 
-        return max(_max)
+        The score for <board> is the largest key, or 0 if there are none.
+        """
+        counts = {}
+        for size in _leaf_blob_sizes(board, self.colour_index):
+            counts[size] = counts.get(size, 0) + 1
+        return counts
+
+    def _score_flattened(self, b: List[List[int]]) -> int:
+        """Return the score of the board flattened into <b> by _flatten.
+        """
+        return max(_blob_sizes(b, self.colour_index), default=0)
+
+    def _score_array(self, grid: np.ndarray) -> int:
+        """Return the score of the board flattened into <grid> by
+        _flatten_array.
+        """
+        return int(_largest_blobs(grid[np.newaxis])[0, self.colour_index])
+
+    def _score_bitboard(self, bits: Bitboard) -> int:
+        """Return the score of the board in <bits>.
+        """
+        return bits.largest_blob(self.colour_index)
 
     def _undiscovered_blob_size(self, pos: Tuple[int, int],
-                                board: List[List[Tuple[int, int, int]]],
+                                board: List[List[int]],
                                 visited: List[List[int]]) -> int:
         """Return the size of the largest connected blob that (a) is of this
         Goal's target colour, (b) includes the cell at <pos>, and (c) involves
@@ -280,32 +817,281 @@ class BlobGoal(Goal):
         Update <visited> so that all cells that are visited are marked with
         either 0 or 1.
         """
+        # The cells still to be visited are kept on an explicit stack, so a
+        # large blob cannot exceed the recursion limit.
+        n = len(board)
+        size = 0
+        stack = [pos]
+        while stack:
+            i, j = stack.pop()
+            if not (0 <= i < n and 0 <= j < n):
+                continue
+            elif board[i][j] != self.colour_index:
+                visited[i][j] = 0
+            elif visited[i][j] == -1:
+                # We know that (i, j) is of target colour
+                visited[i][j] = 1
+                size += 1
+                stack.extend([(i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)])
+        return size
+
+    def description(self) -> str:
         # TODO: Implement me
-        i, j = pos[0], pos[1]
-        if i not in range(len(board)) or j not in range(len(board)):
-            return 0
+        return f'Get the largest *connected* blob of colour ' \
+               f'{colour_name(self.colour)}'
 
-        elif board[i][j] != self.colour:
-            visited[i][j] = 0
-            return 0
 
-        elif visited[i][j] == 0 or visited[i][j] == 1:
-            return 0
+class BlobIndex:
+    """The connected blobs of every colour on a board, kept up to date as moves
+    are made on the board.
 
+    Blobs are made of leaves, and each leaf is named by the unit cell at its
+    upper left corner, counted as in iter_cells. After a move, update relabels
+    only the leaves of the moved block and the blobs that had a leaf in it or
+    along its sides, so the largest blob of a colour can be looked up without
+    rescoring the board.
+    """
+    # === Private Attributes ===
+    # _board:
+    #   The board whose blobs are indexed.
+    # _end:
+    #   The number of unit cells along each side of <_board>.
+    # _leaves:
+    #   The colour index and span of each leaf of <_board>, by name.
+    # _label:
+    #   The label of the blob each leaf belongs to, by name.
+    # _members:
+    #   The names of the leaves in each blob, by label.
+    # _size:
+    #   The number of unit cells in each blob, by label.
+    # _colour:
+    #   The colour index of each blob, by label.
+    # _counts:
+    #   For each colour index, how many blobs of that colour there are of
+    #   each size.
+    # _next_label:
+    #   The label that the next blob to be found will get.
+    _board: Block
+    _end: int
+    _leaves: Dict[int, Tuple[int, int]]
+    _label: Dict[int, int]
+    _members: Dict[int, List[int]]
+    _size: Dict[int, int]
+    _colour: Dict[int, int]
+    _counts: List[Dict[int, int]]
+    _next_label: int
+
+    def __init__(self, board: Block) -> None:
+        """Initialize this index with the blobs of <board>.
+        """
+        self._board = board
+        self._end = 2 ** (board.max_depth - board.level)
+        self._leaves = {}
+        self._label = {}
+        self._members = {}
+        self._size = {}
+        self._colour = {}
+        self._counts = [{} for _ in COLOUR_LIST]
+        self._next_label = 0
+
+        for leaf, column, row, span in board.iter_cells():
+            self._leaves[column * self._end + row] = (leaf.colour_index, span)
+        self._label_blobs(list(self._leaves))
+
+    def largest(self, colour: int) -> int:
+        """Return the number of unit cells in the largest blob of the colour
+        with index <colour> in COLOUR_LIST, or 0 if there are none.
+        """
+        return max(self._counts[colour], default=0)
 
-        else:
-            # We know that pos is of target colour
-            visited[i][j] = 1
-            return 1 + \
-                   self._undiscovered_blob_size((i + 1, j), board, visited) + \
-                   self._undiscovered_blob_size((i - 1, j), board, visited) + \
-                   self._undiscovered_blob_size((i, j + 1), board, visited) + \
-                   self._undiscovered_blob_size((i, j - 1), board, visited)
+    def histogram(self, colour: int) -> Dict[int, int]:
+        """Return how many blobs of the colour with index <colour> in
+        COLOUR_LIST there are of each size.
+        """
+        return dict(self._counts[colour])
 
-    def description(self) -> str:
-        # TODO: Implement me
-        return f'Get the largest *connected* blob of colour ' \
-               f'{colour_name(self.colour)}'
+    def update(self, block: Block) -> None:
+        """Bring this index up to date after a move was made on <block>.
+
+        Precondition: <block> is the board of this index or one of its
+        descendants, and nothing outside of <block> has changed since this
+        index was last up to date.
+        """
+        column, row, span = _cells_of(self._board, block)
+        old = list(self._leaves_in(column, row, span))
+
+        # Every blob that had a leaf in the block, or that touches its sides,
+        # may have been split or joined to another one by the move.
+        touched = {self._label[k] for k in old}
+        touched.update(self._label[k] for k in self._around(column, row, span))
+        relabel = []
+        for label in touched:
+            relabel.extend(self._remove_blob(label))
+
+        for k in old:
+            del self._leaves[k]
+        relabel = [k for k in relabel if k in self._leaves]
+        for leaf, c, r, s in block.iter_cells():
+            k = (column + c) * self._end + row + r
+            self._leaves[k] = (leaf.colour_index, s)
+            relabel.append(k)
+        self._label_blobs(relabel)
+
+    def largest_after(self, block: Block, after: Block, colour: int) -> int:
+        """Return the number of unit cells in the largest blob of the colour
+        with index <colour> in COLOUR_LIST if <block> were replaced by
+        <after>, or 0 if there would be none.
+
+        Only the blobs of <colour> that have a leaf in <block> or along its
+        sides are relabelled, and this index is left as it was.
+
+        Precondition: <block> is the board of this index or one of its
+        descendants, this index is up to date, and <after> is at the same
+        level as <block>.
+        """
+        column, row, span = _cells_of(self._board, block)
+        old = list(self._leaves_in(column, row, span))
+        touched = {self._label[k] for k in old}
+        touched.update(self._label[k] for k in self._around(column, row, span))
+        touched = [label for label in touched if self._colour[label] == colour]
+
+        counts = dict(self._counts[colour])
+        for label in touched:
+            counts[self._size[label]] -= 1
+            if counts[self._size[label]] == 0:
+                del counts[self._size[label]]
+
+        # The leaves of <after> stand in for those of <block> while the
+        # touched blobs are relabelled, and are taken out again afterwards.
+        saved = {k: self._leaves.pop(k) for k in old}
+        new = []
+        for leaf, c, r, s in after.iter_cells():
+            k = (column + c) * self._end + row + r
+            self._leaves[k] = (leaf.colour_index, s)
+            new.append(k)
+        try:
+            starts = [k for label in touched for k in self._members[label]
+                      if k not in saved]
+            starts.extend(k for k in new if self._leaves[k][0] == colour)
+            seen = set()
+            for start in starts:
+                if start in seen:
+                    continue
+                seen.add(start)
+                size = 0
+                stack = [start]
+                while stack:
+                    k = stack.pop()
+                    s = self._leaves[k][1]
+                    size += s * s
+                    for n in self._around(k // self._end, k % self._end, s):
+                        if n not in seen and self._leaves[n][0] == colour:
+                            seen.add(n)
+                            stack.append(n)
+                counts[size] = counts.get(size, 0) + 1
+        finally:
+            for k in new:
+                del self._leaves[k]
+            self._leaves.update(saved)
+        return max(counts, default=0)
+
+    def _leaf_at(self, column: int, row: int) -> int:
+        """Return the name of the leaf that covers the unit cell at <column>
+        and <row>.
+        """
+        span = 1
+        while True:
+            k = (column - column % span) * self._end + row - row % span
+            leaf = self._leaves.get(k)
+            if leaf is not None and leaf[1] == span:
+                return k
+            span *= 2
+
+    def _leaves_in(self, column: int, row: int, span: int) -> Iterator[int]:
+        """Yield the names of the leaves inside the <span> by <span> square of
+        unit cells from <column> and <row>.
+
+        Precondition: the square is covered by a block of the board.
+        """
+        stack = [(column, row, span)]
+        while stack:
+            c, r, s = stack.pop()
+            k = self._leaf_at(c, r)
+            if self._leaves[k][1] >= s:
+                yield k
+            else:
+                half = s // 2
+                stack.extend([(c, r, half), (c + half, r, half),
+                              (c, r + half, half), (c + half, r + half, half)])
+
+    def _around(self, column: int, row: int, span: int) -> Iterator[int]:
+        """Yield the names of the leaves outside the <span> by <span> square of
+        unit cells from <column> and <row> that share part of its sides.
+
+        A leaf is yielded once for each side it shares.
+        """
+        end = self._end
+        # Each side is walked one neighbouring leaf at a time, jumping over
+        # the cells each leaf covers.
+        for outside, start, along_column in ((column - 1, row, False),
+                                             (column + span, row, False),
+                                             (row - 1, column, True),
+                                             (row + span, column, True)):
+            if not 0 <= outside < end:
+                continue
+            i = start
+            while i < start + span:
+                if along_column:
+                    k = self._leaf_at(i, outside)
+                    i = k // end + self._leaves[k][1]
+                else:
+                    k = self._leaf_at(outside, i)
+                    i = k % end + self._leaves[k][1]
+                yield k
+
+    def _remove_blob(self, label: int) -> List[int]:
+        """Forget the blob with <label>, and return the names of its leaves.
+        """
+        members = self._members.pop(label)
+        size = self._size.pop(label)
+        counts = self._counts[self._colour.pop(label)]
+        counts[size] -= 1
+        if counts[size] == 0:
+            del counts[size]
+        for k in members:
+            del self._label[k]
+        return members
+
+    def _label_blobs(self, names: List[int]) -> None:
+        """Label the blob of every leaf in <names> that is not labelled yet.
+
+        Precondition: every unlabelled leaf that touches a leaf of the same
+        colour in <names> is also in <names>.
+        """
+        for start in names:
+            if start in self._label:
+                continue
+            label = self._next_label
+            self._next_label += 1
+            colour = self._leaves[start][0]
+            self._label[start] = label
+            members = [start]
+            size = 0
+            stack = [start]
+            while stack:
+                k = stack.pop()
+                span = self._leaves[k][1]
+                size += span * span
+                for n in self._around(k // self._end, k % self._end, span):
+                    if n not in self._label and self._leaves[n][0] == colour:
+                        self._label[n] = label
+                        members.append(n)
+                        stack.append(n)
+
+            self._members[label] = members
+            self._size[label] = size
+            self._colour[label] = colour
+            self._counts[colour][size] = self._counts[colour].get(size, 0) + 1
 
 
 if __name__ == '__main__':
@@ -314,7 +1100,7 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'allowed-import-modules': [
             'doctest', 'python_ta', 'random', 'typing', 'block', 'settings',
-            'math', '__future__'
+            'math', '__future__', 'numpy', 'bitboard'
         ],
         'max-attributes': 15
     })
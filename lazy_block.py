@@ -0,0 +1,458 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains the LazyBlock class, an alternative to the Block class in
+which a block's position and size are derived from its quadrant path instead
+of being stored. Swapping or rotating a LazyBlock only moves its children
+around, and never rewrites the positions of its descendants.
+"""
+from __future__ import annotations
+
+import random
+from typing import List, Optional, Tuple
+
+from math import exp
+from block import Block, BlockTraversal, _OFFSETS, _majority_colour
+from settings import COLOUR_LIST, colour_index, colour_name
+
+# For each direction, the old index of the child that ends up at each index.
+_SWAP_ORDER = {0: (1, 0, 3, 2), 1: (3, 2, 1, 0)}
+_ROTATE_ORDER = {1: (1, 2, 3, 0), 3: (3, 0, 1, 2)}
+
+
+def generate_lazy_board(max_depth: int, size: int) -> LazyBlock:
+    """Return a new game board with a depth of <max_depth> and dimensions of
+    <size> by <size>, made of LazyBlocks.
+
+    >>> board = generate_lazy_board(3, 750)
+    >>> board.size
+    750
+    >>> len(board.children) == 4
+    True
+    """
+    board = LazyBlock((0, 0), size, random.choice(COLOUR_LIST), 0, max_depth)
+    board.smash()
+
+    return board
+
+
+class LazyBlock(BlockTraversal):
+    """A square Block in the Blocky game whose position and size are computed
+    on demand.
+
+    Only the root of a board stores a position and size. Every other block
+    stores a reference to its parent, and its quadrant path (the index of each
+    block on the way down from the root) is found by following those
+    references. <position> and <size> are then computed from the root, so they
+    cost O(level) to read, but a swap is a permutation of four references and
+    a rotate is one permutation per descendant.
+
+    LazyBlock has the same public attributes and methods as Block.
+
+    === Public Attributes ===
+    colour_index:
+        If this block is not subdivided, <colour_index> stores the index of its
+        colour in COLOUR_LIST. Otherwise, <colour_index> is None. The colour
+        itself can be read and set through <colour>.
+    level:
+        The level of this block within the overall block structure.
+    max_depth:
+        The deepest level allowed in the overall block structure.
+    children:
+        The blocks into which this block is subdivided, in the order
+        upper-right, upper-left, lower-left, lower-right.
+
+    === Representation Invariants ===
+    - len(children) == 0 or len(children) == 4
+    - Every child's _parent is this block.
+    - _origin and _size are None iff _parent is not None.
+    - level <= max_depth
+    """
+    # === Private Attributes ===
+    # _parent:
+    #   The block this block is a child of, or None if it is a root.
+    # _origin:
+    #   The position of this block if it is a root, otherwise None.
+    # _size:
+    #   The size of this block if it is a root, otherwise None.
+    __slots__ = ('colour_index', 'level', 'max_depth', 'children', '_parent',
+                 '_origin', '_size')
+    colour_index: Optional[int]
+    level: int
+    max_depth: int
+    children: List[LazyBlock]
+    _parent: Optional[LazyBlock]
+    _origin: Optional[Tuple[int, int]]
+    _size: Optional[int]
+
+    def __init__(self, position: Tuple[int, int], size: int,
+                 colour: Optional[Tuple[int, int, int]], level: int,
+                 max_depth: int) -> None:
+        """Initialize this block as a root with <position>, dimensions <size>
+        by <size>, the given <colour>, at <level>, and with no children.
+
+        Preconditions:
+            - position[0] >= 0 and position[1] >= 0
+            - size > 0
+            - level >= 0
+            - max_depth >= level
+            - colour is None or colour in COLOUR_LIST
+        """
+        self.colour = colour
+        self.level = level
+        self.max_depth = max_depth
+        self.children = []
+        self._parent = None
+        self._origin = position
+        self._size = size
+
+    @classmethod
+    def _child(cls, parent: LazyBlock, colour: Optional[int]) -> LazyBlock:
+        """Return a new block that is a child of <parent>, whose colour has the
+        index <colour> in COLOUR_LIST.
+
+        The new block is not added to <parent>'s children.
+        """
+        block = cls.__new__(cls)
+        block.colour_index = colour
+        block.level = parent.level + 1
+        block.max_depth = parent.max_depth
+        block.children = []
+        block._parent = parent
+        block._origin = None
+        block._size = None
+        return block
+
+    @classmethod
+    def from_block(cls, block: Block) -> LazyBlock:
+        """Return a LazyBlock that is equivalent to <block> and all its
+        descendants.
+        """
+        root = cls(block.position, block.size, block.colour, block.level,
+                   block.max_depth)
+        stack = [(block, root)]
+        while stack:
+            b, lazy = stack.pop()
+            for child in b.children:
+                c = cls._child(lazy, child.colour_index)
+                lazy.children.append(c)
+                stack.append((child, c))
+
+        return root
+
+    def to_block(self) -> Block:
+        """Return a new Block that is equivalent to this block and all its
+        descendants.
+        """
+        position, size = self._geometry()
+        root = Block(position, size, self.colour, self.level, self.max_depth)
+        stack = [(self, root)]
+        while stack:
+            lazy, block = stack.pop()
+            positions = block._children_positions()
+            for i in range(len(lazy.children)):
+                child = lazy.children[i]
+                b = Block(positions[i], block._child_size(), None,
+                          child.level, child.max_depth)
+                b.colour_index = child.colour_index
+                block.children.append(b)
+                stack.append((child, b))
+
+        return root
+
+    @property
+    def colour(self) -> Optional[Tuple[int, int, int]]:
+        """The colour of this block if it is not subdivided, otherwise None.
+        """
+        if self.colour_index is None:
+            return None
+        return COLOUR_LIST[self.colour_index]
+
+    @colour.setter
+    def colour(self, colour: Optional[Tuple[int, int, int]]) -> None:
+        """Set the colour of this block to <colour>.
+
+        Precondition: colour is None or colour in COLOUR_LIST
+        """
+        self.colour_index = None if colour is None else colour_index(colour)
+
+    def path(self) -> List[int]:
+        """Return the index of each block on the way from the root of this
+        block's board down to this block.
+
+        The root's path is empty.
+        """
+        path = []
+        block = self
+        while block._parent is not None:
+            siblings = block._parent.children
+            i = 0
+            while siblings[i] is not block:
+                i += 1
+            path.append(i)
+            block = block._parent
+        path.reverse()
+        return path
+
+    def _root(self) -> LazyBlock:
+        """Return the root of this block's board.
+        """
+        block = self
+        while block._parent is not None:
+            block = block._parent
+        return block
+
+    def _geometry(self) -> Tuple[Tuple[int, int], int]:
+        """Return the position and size of this block, computed by walking
+        down its quadrant path from the root.
+        """
+        root = self._root()
+        x, y = root._origin
+        size = root._size
+        for i in self.path():
+            size = round(size / 2.0)
+            x += _OFFSETS[i][0] * size
+            y += _OFFSETS[i][1] * size
+        return (x, y), size
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        """The (x, y) coordinates of the upper left corner of this Block.
+        """
+        return self._geometry()[0]
+
+    @property
+    def size(self) -> int:
+        """The height and width of this square Block.
+        """
+        if self._parent is None:
+            return self._size
+        return self._geometry()[1]
+
+    def __str__(self) -> str:
+        """Return this Block in a string format.
+        """
+        lines = []
+        stack = [(self,) + self._geometry()]
+        while stack:
+            block, position, size = stack.pop()
+            indents = '\t' * block.level
+            if len(block.children) == 0:
+                colour = colour_name(block.colour)
+                lines.append(f'{indents}Leaf: colour={colour}, '
+                             f'pos={position}, size={size}, '
+                             f'level={block.level}\n')
+            else:
+                lines.append(f'{indents}Parent: pos={position},'
+                             f'size={size}, level={block.level}\n')
+                child_size = round(size / 2.0)
+                for i in range(3, -1, -1):
+                    child_position = (position[0] + _OFFSETS[i][0] * child_size,
+                                      position[1] + _OFFSETS[i][1] * child_size)
+                    stack.append((block.children[i], child_position,
+                                  child_size))
+
+        return ''.join(lines)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True iff this Block and all its descendents are equivalent to
+        the <other> Block and all its descendents.
+
+        <other> may be a Block or a LazyBlock.
+        """
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if len(a.children) != len(b.children):
+                return False
+            elif len(a.children) == 0:
+                if a.position != b.position or a.size != b.size or \
+                        a.colour_index != b.colour_index or \
+                        a.level != b.level or \
+                        a.max_depth != b.max_depth:
+                    return False
+            else:
+                stack.extend(zip(a.children, b.children))
+
+        return True
+
+    def _child_size(self) -> int:
+        """Return the size of this Block's children.
+        """
+        return round(self.size / 2.0)
+
+    def _children_positions(self) -> List[Tuple[int, int]]:
+        """Return the positions of this Block's four children.
+
+        The positions are returned in this order: upper-right child, upper-left
+        child, lower-left child, lower-right child.
+        """
+        (x, y), size = self._geometry()
+        size = round(size / 2.0)
+
+        return [(x + size, y), (x, y), (x, y + size), (x + size, y + size)]
+
+    def smashable(self) -> bool:
+        """Return True iff this block can be smashed.
+
+        A block can be smashed if it has no children and its level is not at
+        max_depth.
+        """
+        return self.level != self.max_depth and len(self.children) == 0
+
+    def smash(self, rng: Optional[random.Random] = None) -> bool:
+        """Sub-divide this block so that it has four randomly generated
+        children.
+
+        If this Block's level is <max_depth>, do nothing. If this block has
+        children, do nothing.
+
+        The children are drawn from <rng> if it is given, and from the random
+        module otherwise.
+
+        Return True iff the smash was performed.
+        """
+        if not self.smashable():
+            return False
+        if rng is None:
+            rng = random
+
+        self.children = [
+            LazyBlock._child(self, rng.randrange(len(COLOUR_LIST)))
+            for _ in range(4)]
+        self.colour_index = None
+
+        if rng.random() < exp(-0.25 * self.level):
+            for child in self.children:
+                child.smash(rng)
+
+        return True
+
+    def swap(self, direction: int) -> bool:
+        """Swap the child Blocks of this Block.
+
+        If this Block has no children, do nothing. Otherwise, if <direction> is
+        1, swap vertically. If <direction> is 0, swap horizontally.
+
+        Return True iff the swap was performed.
+
+        Precondition: <direction> is either 0 or 1
+        """
+        if not self.children:
+            return False
+
+        children = self.children
+        self.children = [children[i] for i in _SWAP_ORDER[direction]]
+        return True
+
+    def rotate(self, direction: int) -> bool:
+        """Rotate this Block and all its descendants.
+
+        If this Block has no children, do nothing. If <direction> is 1, rotate
+        clockwise. If <direction> is 3, rotate counter-clockwise.
+
+        Return True iff the rotate was performed.
+
+        Precondition: <direction> is either 1 or 3.
+        """
+        if not self.children:
+            return False
+
+        order = _ROTATE_ORDER[direction]
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            if block.children:
+                children = block.children
+                block.children = [children[i] for i in order]
+                stack.extend(block.children)
+
+        return True
+
+    def paint(self, colour: Tuple[int, int, int]) -> bool:
+        """Change this Block's colour iff it is a leaf at a level of max_depth
+        and its colour is different from <colour>.
+
+        Return True iff this Block's colour was changed.
+
+        Precondition: colour in COLOUR_LIST
+        """
+        index = colour_index(colour)
+        if self.level == self.max_depth and not self.children and \
+                self.colour_index != index:
+            self.colour_index = index
+            return True
+        return False
+
+    def combine(self) -> bool:
+        """Turn this Block into a leaf based on the majority colour of its
+        children.
+
+        If there is no majority colour, do nothing. If this block is not at a
+        level of max_depth - 1, or this block has no children, do nothing.
+
+        Return True iff this Block was turned into a leaf node.
+        """
+        if self.level != self.max_depth - 1 or not self.children:
+            return False
+
+        colour = _majority_colour([block.colour_index
+                                   for block in self.children])
+        if colour is None:
+            return False
+        self.children = []
+        self.colour_index = colour
+        return True
+
+    def create_copy(self) -> LazyBlock:
+        """Return a new LazyBlock that is a deep copy of this LazyBlock.
+
+        The copy is the root of its own board, at the same position as this
+        block.
+        """
+        position, size = self._geometry()
+        root = LazyBlock(position, size, self.colour, self.level,
+                         self.max_depth)
+        stack = [(self, root)]
+        while stack:
+            block, copy = stack.pop()
+            for child in block.children:
+                c = LazyBlock._child(copy, child.colour_index)
+                copy.children.append(c)
+                stack.append((child, c))
+
+        return root
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'random', 'typing', '__future__', 'math',
+            'block', 'settings'
+        ],
+        'max-attributes': 15
+    })
+
+    b = generate_lazy_board(3, 750)
+    print("\n=== random lazy board ===")
+    print(b)
@@ -0,0 +1,475 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains the LinearBlock class, an array-backed alternative to the
+Block class. A whole board is stored as a linear quadtree in one flat array,
+so copying a board is a single buffer copy.
+"""
+from __future__ import annotations
+
+import random
+from array import array
+from typing import List, Optional, Tuple
+
+from math import exp
+from block import Block, BlockTraversal, _majority_colour
+from settings import COLOUR_LIST, colour_index, colour_name
+
+# The number of ints used to store each node, and the offset of each field
+# within a node.
+_STRIDE = 3
+_SPLIT = 0
+_COLOUR = 1
+_CHILD = 2
+
+# For each direction, the old index of the child that ends up at each index.
+_SWAP_ORDER = {0: (1, 0, 3, 2), 1: (3, 2, 1, 0)}
+_ROTATE_ORDER = {1: (1, 2, 3, 0), 3: (3, 0, 1, 2)}
+
+
+def generate_linear_board(max_depth: int, size: int) -> LinearBlock:
+    """Return a new game board with a depth of <max_depth> and dimensions of
+    <size> by <size>, stored as a linear quadtree.
+
+    >>> board = generate_linear_board(3, 750)
+    >>> board.max_depth
+    3
+    >>> len(board.children) == 4
+    True
+    """
+    board = LinearBlock((0, 0), size, random.choice(COLOUR_LIST), 0, max_depth)
+    board.smash()
+
+    return board
+
+
+def _permute_children(nodes: array, index: int,
+                      order: Tuple[int, int, int, int]) -> None:
+    """Reorder the four children of the node at slot <index> in <nodes> so that
+    the child at old index order[i] moves to index i.
+
+    Each child's own children move with it, since only the child records are
+    copied.
+    """
+    start = nodes[index * _STRIDE + _CHILD] * _STRIDE
+    old = nodes[start:start + 4 * _STRIDE]
+    for i, j in enumerate(order):
+        nodes[start + i * _STRIDE:start + (i + 1) * _STRIDE] = \
+            old[j * _STRIDE:(j + 1) * _STRIDE]
+
+
+class LinearBlock(BlockTraversal):
+    """A square Block in the Blocky game, backed by a linear quadtree.
+
+    A LinearBlock is a handle onto one node of a board whose nodes are all
+    stored in a single flat array of ints. Each node takes up three entries:
+    its split flag, the index of its colour in COLOUR_LIST (-1 if it is split),
+    and the slot of the first of its four children (-1 if it has never been
+    smashed). A node's children always occupy four consecutive slots, in the
+    same order as Block.children.
+
+    LinearBlock has the same public attributes and methods as Block, so the
+    goal, player and game code can run on it unchanged. Because a handle names
+    a slot rather than a subtree, a handle keeps its position after a swap or
+    rotate, and refers to whichever block now occupies that position.
+
+    === Public Attributes ===
+    position:
+        The (x, y) coordinates of the upper left corner of this Block.
+    size:
+        The height and width of this square Block.
+    level:
+        The level of this block within the overall block structure.
+    max_depth:
+        The deepest level allowed in the overall block structure.
+
+    === Representation Invariants ===
+    - A node's split flag is 1 iff its colour is -1.
+    - If a node's split flag is 1, its child slot is not -1.
+    - level <= max_depth
+    """
+    # === Private Attributes ===
+    # _nodes:
+    #   The flat array holding every node of the board this block belongs to.
+    # _index:
+    #   The slot of this block's node in <_nodes>.
+    position: Tuple[int, int]
+    size: int
+    level: int
+    max_depth: int
+    _nodes: array
+    _index: int
+
+    def __init__(self, position: Tuple[int, int], size: int,
+                 colour: Optional[Tuple[int, int, int]], level: int,
+                 max_depth: int) -> None:
+        """Initialize this block as the root of a new board with <position>,
+        dimensions <size> by <size>, the given <colour>, at <level>, and with
+        no children.
+
+        Preconditions:
+            - position[0] >= 0 and position[1] >= 0
+            - size > 0
+            - level >= 0
+            - max_depth >= level
+            - colour is None or colour in COLOUR_LIST
+        """
+        if colour is None:
+            nodes = array('i', [1, -1, -1])
+        else:
+            nodes = array('i', [0, colour_index(colour), -1])
+        self._nodes = nodes
+        self._index = 0
+        self.position = position
+        self.size = size
+        self.level = level
+        self.max_depth = max_depth
+
+    @classmethod
+    def _handle(cls, nodes: array, index: int, position: Tuple[int, int],
+                size: int, level: int, max_depth: int) -> LinearBlock:
+        """Return a new handle onto the node at slot <index> in <nodes>.
+        """
+        block = cls.__new__(cls)
+        block._nodes = nodes
+        block._index = index
+        block.position = position
+        block.size = size
+        block.level = level
+        block.max_depth = max_depth
+        return block
+
+    @classmethod
+    def from_block(cls, block: Block) -> LinearBlock:
+        """Return a LinearBlock that is equivalent to <block> and all its
+        descendants.
+
+        Precondition: every leaf in <block> has a colour in COLOUR_LIST.
+        """
+        nodes = array('i', [0, -1, -1])
+        stack = [(block, 0)]
+        while stack:
+            b, index = stack.pop()
+            base = index * _STRIDE
+            if b.children:
+                first = len(nodes) // _STRIDE
+                nodes.extend([0, -1, -1] * 4)
+                nodes[base + _SPLIT] = 1
+                nodes[base + _CHILD] = first
+                for i in range(4):
+                    stack.append((b.children[i], first + i))
+            else:
+                nodes[base + _COLOUR] = b.colour_index
+
+        return cls._handle(nodes, 0, block.position, block.size, block.level,
+                           block.max_depth)
+
+    def to_block(self) -> Block:
+        """Return a new Block that is equivalent to this block and all its
+        descendants.
+        """
+        root = Block(self.position, self.size, None, self.level,
+                     self.max_depth)
+        root.colour_index = self.colour_index
+        stack = [(self, root)]
+        while stack:
+            linear, block = stack.pop()
+            for child in linear.children:
+                b = Block(child.position, child.size, None, child.level,
+                          child.max_depth)
+                b.colour_index = child.colour_index
+                block.children.append(b)
+                stack.append((child, b))
+
+        return root
+
+    @property
+    def colour_index(self) -> Optional[int]:
+        """The index in COLOUR_LIST of the colour of this block if it is not
+        subdivided, otherwise None.
+        """
+        index = self._nodes[self._index * _STRIDE + _COLOUR]
+        if index < 0:
+            return None
+        return index
+
+    @colour_index.setter
+    def colour_index(self, index: Optional[int]) -> None:
+        """Set the colour of this block to the colour at <index> in
+        COLOUR_LIST, or to None.
+        """
+        self._nodes[self._index * _STRIDE + _COLOUR] = \
+            -1 if index is None else index
+
+    @property
+    def colour(self) -> Optional[Tuple[int, int, int]]:
+        """The colour of this block if it is not subdivided, otherwise None.
+        """
+        index = self._nodes[self._index * _STRIDE + _COLOUR]
+        if index < 0:
+            return None
+        return COLOUR_LIST[index]
+
+    @colour.setter
+    def colour(self, colour: Optional[Tuple[int, int, int]]) -> None:
+        """Set the colour of this block to <colour>.
+
+        Precondition: colour is None or colour in COLOUR_LIST
+        """
+        self.colour_index = None if colour is None else colour_index(colour)
+
+    @property
+    def children(self) -> List[LinearBlock]:
+        """The blocks into which this block is subdivided, in the order
+        upper-right, upper-left, lower-left, lower-right.
+        """
+        base = self._index * _STRIDE
+        if not self._nodes[base + _SPLIT]:
+            return []
+
+        first = self._nodes[base + _CHILD]
+        size = self._child_size()
+        positions = self._children_positions()
+        return [LinearBlock._handle(self._nodes, first + i, positions[i], size,
+                                    self.level + 1, self.max_depth)
+                for i in range(4)]
+
+    def __str__(self) -> str:
+        """Return this Block in a string format.
+        """
+        lines = []
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            indents = '\t' * block.level
+            children = block.children
+            if len(children) == 0:
+                colour = colour_name(block.colour)
+                lines.append(f'{indents}Leaf: colour={colour}, '
+                             f'pos={block.position}, size={block.size}, '
+                             f'level={block.level}\n')
+            else:
+                lines.append(f'{indents}Parent: pos={block.position},'
+                             f'size={block.size}, level={block.level}\n')
+                stack.extend(reversed(children))
+
+        return ''.join(lines)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True iff this Block and all its descendents are equivalent to
+        the <other> Block and all its descendents.
+
+        <other> may be a Block or a LinearBlock.
+        """
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            a_children, b_children = a.children, b.children
+            if len(a_children) != len(b_children):
+                return False
+            elif len(a_children) == 0:
+                if a.position != b.position or a.size != b.size or \
+                        a.colour_index != b.colour_index or \
+                        a.level != b.level or \
+                        a.max_depth != b.max_depth:
+                    return False
+            else:
+                stack.extend(zip(a_children, b_children))
+
+        return True
+
+    def _is_split(self) -> bool:
+        """Return True iff this block has children.
+        """
+        return bool(self._nodes[self._index * _STRIDE + _SPLIT])
+
+    def _child_size(self) -> int:
+        """Return the size of this Block's children.
+        """
+        return round(self.size / 2.0)
+
+    def _children_positions(self) -> List[Tuple[int, int]]:
+        """Return the positions of this Block's four children.
+
+        The positions are returned in this order: upper-right child, upper-left
+        child, lower-left child, lower-right child.
+        """
+        x = self.position[0]
+        y = self.position[1]
+        size = self._child_size()
+
+        return [(x + size, y), (x, y), (x, y + size), (x + size, y + size)]
+
+    def smashable(self) -> bool:
+        """Return True iff this block can be smashed.
+
+        A block can be smashed if it has no children and its level is not at
+        max_depth.
+        """
+        return self.level != self.max_depth and not self._is_split()
+
+    def smash(self, rng: Optional[random.Random] = None) -> bool:
+        """Sub-divide this block so that it has four randomly generated
+        children.
+
+        If this Block's level is <max_depth>, do nothing. If this block has
+        children, do nothing.
+
+        The children are drawn from <rng> if it is given, and from the random
+        module otherwise.
+
+        Return True iff the smash was performed.
+        """
+        if not self.smashable():
+            return False
+        if rng is None:
+            rng = random
+
+        nodes = self._nodes
+        base = self._index * _STRIDE
+        first = nodes[base + _CHILD]
+        if first < 0:
+            # Slots are only allocated the first time a node is smashed; a
+            # node that is later combined keeps them for its next smash.
+            first = len(nodes) // _STRIDE
+            nodes.extend([0, -1, -1] * 4)
+            nodes[base + _CHILD] = first
+
+        for i in range(4):
+            nodes[(first + i) * _STRIDE + _SPLIT] = 0
+            nodes[(first + i) * _STRIDE + _COLOUR] = \
+                rng.randrange(len(COLOUR_LIST))
+        nodes[base + _SPLIT] = 1
+        nodes[base + _COLOUR] = -1
+
+        if rng.random() < exp(-0.25 * self.level):
+            for child in self.children:
+                child.smash(rng)
+
+        return True
+
+    def swap(self, direction: int) -> bool:
+        """Swap the child Blocks of this Block.
+
+        If this Block has no children, do nothing. Otherwise, if <direction> is
+        1, swap vertically. If <direction> is 0, swap horizontally.
+
+        Return True iff the swap was performed.
+
+        Precondition: <direction> is either 0 or 1
+        """
+        if not self._is_split():
+            return False
+
+        _permute_children(self._nodes, self._index, _SWAP_ORDER[direction])
+        return True
+
+    def rotate(self, direction: int) -> bool:
+        """Rotate this Block and all its descendants.
+
+        If this Block has no children, do nothing. If <direction> is 1, rotate
+        clockwise. If <direction> is 3, rotate counter-clockwise.
+
+        Return True iff the rotate was performed.
+
+        Precondition: <direction> is either 1 or 3.
+        """
+        if not self._is_split():
+            return False
+
+        nodes = self._nodes
+        order = _ROTATE_ORDER[direction]
+        stack = [self._index]
+        while stack:
+            index = stack.pop()
+            if nodes[index * _STRIDE + _SPLIT]:
+                _permute_children(nodes, index, order)
+                first = nodes[index * _STRIDE + _CHILD]
+                stack.extend(range(first, first + 4))
+
+        return True
+
+    def paint(self, colour: Tuple[int, int, int]) -> bool:
+        """Change this Block's colour iff it is a leaf at a level of max_depth
+        and its colour is different from <colour>.
+
+        Return True iff this Block's colour was changed.
+
+        Precondition: colour in COLOUR_LIST
+        """
+        if self.level != self.max_depth or self._is_split():
+            return False
+
+        index = colour_index(colour)
+        base = self._index * _STRIDE
+        if self._nodes[base + _COLOUR] == index:
+            return False
+        self._nodes[base + _COLOUR] = index
+        return True
+
+    def combine(self) -> bool:
+        """Turn this Block into a leaf based on the majority colour of its
+        children.
+
+        If there is no majority colour, do nothing. If this block is not at a
+        level of max_depth - 1, or this block has no children, do nothing.
+
+        Return True iff this Block was turned into a leaf node.
+        """
+        if self.level != self.max_depth - 1 or not self._is_split():
+            return False
+
+        nodes = self._nodes
+        base = self._index * _STRIDE
+        first = nodes[base + _CHILD]
+        colour = _majority_colour(
+            [nodes[(first + i) * _STRIDE + _COLOUR] for i in range(4)])
+
+        if colour is None:
+            return False
+        nodes[base + _SPLIT] = 0
+        nodes[base + _COLOUR] = colour
+        return True
+
+    def create_copy(self) -> LinearBlock:
+        """Return a new LinearBlock that is a deep copy of this LinearBlock.
+
+        The copy is made with a single copy of the underlying array.
+        """
+        return LinearBlock._handle(self._nodes[:], self._index, self.position,
+                                   self.size, self.level, self.max_depth)
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'random', 'typing', '__future__', 'math',
+            'array', 'block', 'settings'
+        ],
+        'max-attributes': 15,
+        'max-args': 7
+    })
+
+    b = generate_linear_board(3, 750)
+    print("\n=== random linear board ===")
+    print(b)
@@ -0,0 +1,399 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains a persistent (immutable) version of the Blocky board.
+
+A move on a PersistentBoard never changes it. Instead it returns a new board
+that shares every subtree the move did not touch with the old one, so copying a
+board is free and a move only allocates the blocks on the path to the block
+that was moved. A rotation is recorded on the rotated block and only applied
+to its children as they are looked at, so a rotate copies no more than any
+other move.
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from math import exp
+from block import Block, _majority_colour
+from settings import COLOUR_LIST, colour_index
+
+# For each direction, the old index of the child that ends up at each index.
+_SWAP_ORDER = {0: (1, 0, 3, 2), 1: (3, 2, 1, 0)}
+
+# Leaves are immutable, so there only ever needs to be one leaf for each
+# combination of colour, level and max_depth.
+_LEAVES: Dict[Tuple[int, int, int], PersistentBlock] = {}
+
+
+def _leaf(colour: int, level: int, max_depth: int) -> PersistentBlock:
+    """Return the leaf whose colour has the index <colour> in COLOUR_LIST, at
+    <level> on a board with <max_depth>.
+    """
+    key = (colour, level, max_depth)
+    if key not in _LEAVES:
+        _LEAVES[key] = PersistentBlock(colour, level, max_depth, ())
+    return _LEAVES[key]
+
+
+def _random_children(level: int, max_depth: int) -> Tuple[PersistentBlock, ...]:
+    """Return four randomly generated children for a block at <level>, chosen
+    the same way Block.smash chooses them.
+    """
+    if level + 1 < max_depth and random.random() < exp(-0.25 * level):
+        return tuple(PersistentBlock(None, level + 1, max_depth,
+                                     _random_children(level + 1, max_depth))
+                     for _ in range(4))
+    return tuple(_leaf(random.randrange(len(COLOUR_LIST)), level + 1,
+                       max_depth)
+                 for _ in range(4))
+
+
+def _turned(block: PersistentBlock, turns: int) -> PersistentBlock:
+    """Return <block> turned clockwise by <turns> quarter turns, with all its
+    descendants turned as well.
+
+    Only a new block with the rotation recorded on it is made, sharing its
+    children with <block>. Leaves look the same when turned, so a leaf is
+    returned as it is.
+    """
+    if not block._children or turns % 4 == 0:
+        return block
+    return PersistentBlock(None, block.level, block.max_depth,
+                           block._children, (block._turns + turns) % 4)
+
+
+def generate_persistent_board(max_depth: int, size: int) -> PersistentBoard:
+    """Return a new persistent game board with a depth of <max_depth> and
+    dimensions of <size> by <size>.
+
+    >>> board = generate_persistent_board(3, 750)
+    >>> board.size
+    750
+    >>> len(board.root.children) == 4
+    True
+    """
+    root = PersistentBlock(None, 0, max_depth, _random_children(0, max_depth))
+    return PersistentBoard(root, (0, 0), size)
+
+
+class PersistentBlock:
+    """An immutable square block in a persistent Blocky board.
+
+    A PersistentBlock does not know its position or size, since the same block
+    may appear in many boards at different places. Those are tracked by the
+    PersistentBoard that contains it.
+
+    === Public Attributes ===
+    colour_index:
+        If this block is not subdivided, <colour_index> stores the index of its
+        colour in COLOUR_LIST. Otherwise, <colour_index> is None. The colour
+        itself can be read through <colour>.
+    level:
+        The level of this block within the overall block structure.
+    max_depth:
+        The deepest level allowed in the overall block structure.
+    children:
+        The blocks into which this block is subdivided, in the order
+        upper-right, upper-left, lower-left, lower-right. If this block is
+        turned, its children are turned as they are looked up.
+
+    === Representation Invariants ===
+    - len(children) == 0 or len(children) == 4
+    - No attribute of a PersistentBlock is changed after it is created.
+    """
+    # === Private Attributes ===
+    # _children:
+    #   The children of this block before it is turned.
+    # _turns:
+    #   The number of clockwise quarter turns this block and all its
+    #   descendants have been rotated by, from 0 to 3.
+    __slots__ = ('colour_index', 'level', 'max_depth', '_children', '_turns')
+    colour_index: Optional[int]
+    level: int
+    max_depth: int
+    _children: Tuple[PersistentBlock, ...]
+    _turns: int
+
+    def __init__(self, colour_index: Optional[int], level: int,
+                 max_depth: int, children: Tuple[PersistentBlock, ...],
+                 turns: int = 0) -> None:
+        """Initialize this block with the colour at <colour_index> in
+        COLOUR_LIST, at <level>, and with <children>, turned clockwise by
+        <turns> quarter turns.
+        """
+        self.colour_index = colour_index
+        self.level = level
+        self.max_depth = max_depth
+        self._children = children
+        self._turns = turns
+
+    @property
+    def children(self) -> Tuple[PersistentBlock, ...]:
+        """The children of this block, as they are after it is turned.
+
+        Turning a block clockwise moves the child at index (i + 1) % 4 to
+        index i, and turns every child the same way.
+        """
+        if self._turns == 0:
+            return self._children
+        return tuple(_turned(self._children[(i + self._turns) % 4],
+                             self._turns) for i in range(4))
+
+    @property
+    def colour(self) -> Optional[Tuple[int, int, int]]:
+        """The colour of this block if it is not subdivided, otherwise None.
+        """
+        if self.colour_index is None:
+            return None
+        return COLOUR_LIST[self.colour_index]
+
+    def __eq__(self, other: object) -> bool:
+        """Return True iff this block and all its descendants are equivalent
+        to the <other> block and all its descendants.
+
+        Shared subtrees are recognised without being walked.
+        """
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            elif len(a.children) != len(b.children) or a.level != b.level or \
+                    a.max_depth != b.max_depth or \
+                    a.colour_index != b.colour_index:
+                return False
+            stack.extend(zip(a.children, b.children))
+
+        return True
+
+
+class PersistentBoard:
+    """A Blocky board that is never changed once it is created.
+
+    Blocks are addressed by their quadrant path: the index of each child on the
+    way down from the root, so the root's path is [] and its upper-left child's
+    path is [1]. Each move returns a new PersistentBoard, or None if the move
+    could not be performed, and the board it was made on is left unchanged.
+
+    === Public Attributes ===
+    root:
+        The block at the top of this board.
+    position:
+        The (x, y) coordinates of the upper left corner of this board.
+    size:
+        The height and width of this board.
+    """
+    __slots__ = ('root', 'position', 'size')
+    root: PersistentBlock
+    position: Tuple[int, int]
+    size: int
+
+    def __init__(self, root: PersistentBlock, position: Tuple[int, int],
+                 size: int) -> None:
+        """Initialize this board with <root> at <position>, with dimensions
+        <size> by <size>.
+        """
+        self.root = root
+        self.position = position
+        self.size = size
+
+    @classmethod
+    def from_block(cls, block: Block) -> PersistentBoard:
+        """Return a persistent board that is equivalent to <block> and all its
+        descendants.
+        """
+        def convert(b: Block) -> PersistentBlock:
+            if not b.children:
+                return _leaf(b.colour_index, b.level, b.max_depth)
+            return PersistentBlock(None, b.level, b.max_depth,
+                                   tuple(convert(c) for c in b.children))
+
+        return cls(convert(block), block.position, block.size)
+
+    def to_block(self) -> Block:
+        """Return a new Block that is equivalent to this board.
+        """
+        root = Block(self.position, self.size, self.root.colour,
+                     self.root.level, self.root.max_depth)
+        stack = [(self.root, root)]
+        while stack:
+            node, block = stack.pop()
+            positions = block._children_positions()
+            for i in range(len(node.children)):
+                child = node.children[i]
+                b = Block(positions[i], block._child_size(), None,
+                          child.level, child.max_depth)
+                b.colour_index = child.colour_index
+                block.children.append(b)
+                stack.append((child, b))
+
+        return root
+
+    def __eq__(self, other: object) -> bool:
+        """Return True iff this board is equivalent to <other>.
+        """
+        return isinstance(other, PersistentBoard) and \
+            self.position == other.position and self.size == other.size and \
+            self.root == other.root
+
+    def create_copy(self) -> PersistentBoard:
+        """Return a copy of this board.
+
+        Nothing is ever changed in a PersistentBoard, so the copy shares all of
+        its blocks with this board.
+        """
+        return PersistentBoard(self.root, self.position, self.size)
+
+    def block_at(self, path: List[int]) -> PersistentBlock:
+        """Return the block at <path> on this board.
+
+        Precondition: <path> is a valid quadrant path on this board.
+        """
+        block = self.root
+        for i in path:
+            block = block.children[i]
+        return block
+
+    def path_at(self, location: Tuple[int, int], level: int) -> List[int]:
+        """Return the path of the block at <level> that includes <location>,
+        or of the deepest block that includes it if <level> is deeper than
+        that block.
+
+        Precondition: <location> is on this board.
+        """
+        x = location[0] - self.position[0]
+        y = location[1] - self.position[1]
+        size = self.size
+        block = self.root
+        path = []
+        while block.level < level and block.children:
+            size = round(size / 2.0)
+            right, bottom = x >= size, y >= size
+            if bottom:
+                i = 3 if right else 2
+                y -= size
+            else:
+                i = 0 if right else 1
+            if right:
+                x -= size
+            path.append(i)
+            block = block.children[i]
+        return path
+
+    def _replace(self, path: List[int],
+                 block: PersistentBlock) -> PersistentBoard:
+        """Return a board in which the block at <path> is replaced by <block>.
+
+        Only the ancestors of the replaced block are copied.
+        """
+        ancestors = [self.root]
+        for i in path[:-1]:
+            ancestors.append(ancestors[-1].children[i])
+
+        for parent, i in zip(reversed(ancestors), reversed(path)):
+            children = parent.children[:i] + (block,) + parent.children[i + 1:]
+            block = PersistentBlock(None, parent.level, parent.max_depth,
+                                    children)
+        return PersistentBoard(block, self.position, self.size)
+
+    def smash(self, path: List[int]) -> Optional[PersistentBoard]:
+        """Return this board with the block at <path> sub-divided into four
+        randomly generated children, or None if that block cannot be smashed.
+        """
+        block = self.block_at(path)
+        if block.level == block.max_depth or block.children:
+            return None
+        return self._replace(path, PersistentBlock(
+            None, block.level, block.max_depth,
+            _random_children(block.level, block.max_depth)))
+
+    def swap(self, path: List[int], direction: int) -> \
+            Optional[PersistentBoard]:
+        """Return this board with the children of the block at <path> swapped,
+        or None if that block has no children.
+
+        If <direction> is 1, swap vertically. If <direction> is 0, swap
+        horizontally.
+        """
+        block = self.block_at(path)
+        if not block.children:
+            return None
+        children = tuple(block.children[i] for i in _SWAP_ORDER[direction])
+        return self._replace(path, PersistentBlock(None, block.level,
+                                                   block.max_depth, children))
+
+    def rotate(self, path: List[int], direction: int) -> \
+            Optional[PersistentBoard]:
+        """Return this board with the block at <path> and all its descendants
+        rotated, or None if that block has no children.
+
+        If <direction> is 1, rotate clockwise. If <direction> is 3, rotate
+        counter-clockwise. The descendants are not copied: the rotation is
+        recorded on the new block, and applied to them as they are looked up.
+        """
+        block = self.block_at(path)
+        if not block.children:
+            return None
+        # A direction of 1 or 3 is that many clockwise quarter turns.
+        return self._replace(path, _turned(block, direction))
+
+    def paint(self, path: List[int], colour: Tuple[int, int, int]) -> \
+            Optional[PersistentBoard]:
+        """Return this board with the block at <path> painted <colour>, or
+        None if that block is not a leaf at max_depth or is already <colour>.
+        """
+        index = colour_index(colour)
+        block = self.block_at(path)
+        if block.level != block.max_depth or block.children or \
+                block.colour_index == index:
+            return None
+        return self._replace(path, _leaf(index, block.level, block.max_depth))
+
+    def combine(self, path: List[int]) -> Optional[PersistentBoard]:
+        """Return this board with the block at <path> turned into a leaf of
+        the majority colour of its children, or None if it cannot be combined.
+        """
+        block = self.block_at(path)
+        if block.level != block.max_depth - 1 or not block.children:
+            return None
+        colour = _majority_colour([child.colour_index
+                                   for child in block.children])
+        if colour is None:
+            return None
+        return self._replace(path, _leaf(colour, block.level, block.max_depth))
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'random', 'typing', '__future__', 'math',
+            'block', 'settings'
+        ],
+        'max-attributes': 15
+    })
+
+    b = generate_persistent_board(3, 750)
+    print("\n=== random persistent board ===")
+    print(b.to_block())
@@ -22,24 +22,31 @@ Misha Schwartz, and Jaisie Sin.
 This file contains the hierarchy of player classes.
 """
 from __future__ import annotations
-from typing import List, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import math
 import random
+import sys
+import time
 import pygame
 
 from block import Block
+from board_io import encode_board
 from goal import Goal, generate_goals
+from search import BoardPool, MoveEvaluator, block_at, \
+    evaluate_candidates, iter_legal_moves, iter_legal_paths
 
-from actions import KEY_ACTION, ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, \
-    SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, PASS, PAINT, COMBINE
+from actions import ACTION_PENALTY, KEY_ACTION, PASS, SMASH
 
 
-def create_players(num_human: int, num_random: int, smart_players: List[int]) \
-        -> List[Player]:
+def create_players(num_human: int, num_random: int, smart_players: List[int],
+                   processes: int = 1) -> List[Player]:
     """Return a new list of Player objects.
 
     <num_human> is the number of human player, <num_random> is the number of
     random players, and <smart_players> is a list of difficulty levels for each
-    SmartPlayer that is to be created.
+    SmartPlayer that is to be created. Each SmartPlayer evaluates its moves on
+    <processes> processes.
 
     The list should contain <num_human> HumanPlayer objects first, then
     <num_random> RandomPlayer objects, then the same number of SmartPlayer
@@ -69,10 +76,15 @@ def create_players(num_human: int, num_random: int, smart_players: List[int]) \
         for i in range(len(smart_players)):
             # use id as num_humans + num_random + i
             result.append(SmartPlayer(total + i, goals[total + i],
-                                      smart_players[i]))
+                                      smart_players[i], processes))
     return result
 
 
+# The index of the child in each quadrant of a Block, indexed first by whether
+# the quadrant is in the bottom half and then by whether it is in the right half.
+_QUADRANT = ((1, 0), (2, 3))
+
+
 def _get_block(block: Block, location: Tuple[int, int], level: int) -> \
         Optional[Block]:
     """Return the Block within <block> that is at <level> and includes
@@ -94,33 +106,68 @@ def _get_block(block: Block, location: Tuple[int, int], level: int) -> \
     # TODO: Implement me
     x, y = location[0], location[1]
 
-    if block.level == level or (block.level < level and not block.children):
-        if x in range(block.position[0], block.position[0] + block.size) and \
-                y in range(block.position[1], block.position[1] + block.size):
-            return block
-        return None
+    # Work out which child includes the location from where it is relative to
+    # the centre of the block, instead of checking every child.
+    while block.level < level and block.children:
+        size = block._child_size()
+        bottom = y >= block.position[1] + size
+        right = x >= block.position[0] + size
+        block = block.children[_QUADRANT[bottom][right]]
 
-    else:
-        # We know that block.level < level and block.children
-        for blocky in block.children:
-            if _get_block(blocky, location, level) is not None:
-                return _get_block(blocky, location, level)
-        return None
+    if block.position[0] <= x < block.position[0] + block.size and \
+            block.position[1] <= y < block.position[1] + block.size:
+        return block
+    return None
 
 
-def _get_random_blocky(copy: Block) -> Block:
-    """Returns a random block from a copied board. """
-    rx = random.randrange(0, copy.size)
-    ry = random.randrange(0, copy.size)
-    rl = random.randrange(0, copy.max_depth)
-    block = _get_block(copy, (rx, ry), rl)
+def _get_blocks(block: Block, locations: List[Tuple[int, int]],
+                levels: List[int]) -> List[Optional[Block]]:
+    """Return the Block that _get_block(block, locations[i], levels[i]) would
+    return, for every i.
 
-    return block
+    All the locations are resolved in one walk down <block>: at each Block, the
+    locations that need to go deeper are split between its children, so each
+    Block on the way is only visited once however many locations pass through
+    it.
+
+    Preconditions:
+        - len(locations) == len(levels)
+        - 0 <= levels[i] <= max_depth for every i
+    """
+    result = [None] * len(locations)
+    stack = [(block, list(range(len(locations))))]
+    while stack:
+        b, indices = stack.pop()
+        deeper = [[], [], [], []]
+        if b.children:
+            size = b._child_size()
+            mid_x, mid_y = b.position[0] + size, b.position[1] + size
+        x0, y0 = b.position
+        for i in indices:
+            x, y = locations[i]
+            if b.level < levels[i] and b.children:
+                deeper[_QUADRANT[y >= mid_y][x >= mid_x]].append(i)
+            elif x0 <= x < x0 + b.size and y0 <= y < y0 + b.size:
+                result[i] = b
+
+        if any(deeper):
+            children = b.children
+            for q in range(4):
+                if deeper[q]:
+                    stack.append((children[q], deeper[q]))
+
+    return result
+
+
+def _random_move(board: Block, colour: Tuple[int, int, int]) -> \
+        Optional[Tuple[str, Optional[int], Block]]:
+    """Return a move chosen uniformly from every legal move on <board>,
+    painting with <colour>, or None if there are none."""
+    moves = list(iter_legal_moves(board, colour))
+    if not moves:
+        return None
+    return random.choice(moves)
 
-def _get_random_action(lst: list) -> Tuple[str, int]:
-    """ Returns a random action from list. """
-    ra = lst[random.randrange(len(lst))]
-    return ra
 
 def _create_move(action: Tuple[str, Optional[int]], block: Block) -> \
         Tuple[str, Optional[int], Block]:
@@ -147,6 +194,20 @@ class Player:
         self.goal = goal
         self.id = player_id
 
+    def set_players(self, players: List[Player]) -> None:
+        """Tell this player that it is playing a game with <players>, in the
+        order they take turns.
+
+        Players that do not plan around the other players ignore this.
+        """
+
+    def close(self) -> None:
+        """Release anything this player holds on to between turns, such as
+        processes, because the game is over.
+
+        Players that hold on to nothing ignore this.
+        """
+
     def get_selected_block(self, board: Block) -> Optional[Block]:
         """Return the block that is currently selected by the player.
 
@@ -172,24 +233,6 @@ class Player:
         """
         raise NotImplementedError
 
-    def _check_action_validity(self, action: Tuple[str, int],
-                               block: Block) -> bool:
-        if action[0] == 'rotate':
-            if action[1] == 1:
-                return block.rotate(1)
-            else:
-                return block.rotate(3)
-        elif action[0] == 'swap':
-            if action[1] == 0:
-                return block.swap(0)
-            else:
-                return block.swap(1)
-        elif action[0] == 'smash':
-            return block.smash()
-        elif action[0] == 'combine':
-            return block.combine()
-        else:
-            return block.paint(self.goal.colour)
 
 class HumanPlayer(Player):
     """A human player.
@@ -296,27 +339,12 @@ class RandomPlayer(Player):
 
         # TODO: Implement Me
         else:
-            # create copy of the board
-            copy = board.create_copy()
-            # randomly choose block and level in  board
-
-            # randomly choose action
-            actions = [ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE,
-                       SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, COMBINE, PAINT]
-            m = _get_random_action(actions)
-
-            valid = False
-            while not valid:
-                block = _get_random_blocky(copy)
-                m = _get_random_action(actions)
-
-                if self._check_action_validity(m, block):
-                    valid = True
-                    move = _create_move(m, _get_block(board, block.position,
-                                                      block.level))
-                    self._proceed = False  # Must set to False before returning!
-                    return move
-
+            # choose uniformly from every legal move on the board
+            move = _random_move(board, self.goal.colour)
+            self._proceed = False  # Must set to False before returning!
+            if move is None:
+                return _create_move(PASS, board)
+            return move
 
 
 class SmartPlayer(Player):
@@ -327,18 +355,29 @@ class SmartPlayer(Player):
     # _difficulty:
     #   The number of randomly generated valid moves the player selects the
     #   highest scoring move from.
+    # _processes:
+    #   The number of processes the moves are evaluated on.
+    # _pool:
+    #   The pool of processes the moves are evaluated on, kept from one turn
+    #   to the next, or None if it has not been started.
     # ==================== Representation Invariants =====================
     # _difficulty >= 0
+    # _processes >= 1
     """ Computer player that chooses a random move that makes the highest
     increase score. """
     _proceed: bool
     _difficulty: int
+    _processes: int
+    _pool: Optional[BoardPool]
 
-    def __init__(self, player_id: int, goal: Goal, difficulty: int) -> None:
+    def __init__(self, player_id: int, goal: Goal, difficulty: int,
+                 processes: int = 1) -> None:
         # TODO: Implement Me
         Player.__init__(self, player_id, goal)
         self._difficulty = difficulty
         self._proceed = False
+        self._processes = max(1, processes)
+        self._pool = None
 
     def get_selected_block(self, board: Block) -> Optional[Block]:
         return None
@@ -357,43 +396,610 @@ class SmartPlayer(Player):
         performed on the <board>. If no move can be found that is better than
         the current score, this player will pass.
 
+        If this player has more than one process, the moves are evaluated in
+        parallel, and the same move is chosen as with one process. If the
+        move is a smash, the random module is seeded so that smashing the
+        block makes the board the move was scored on.
+
         This function does not mutate <board>.
         """
         if not self._proceed:
             return None  # Do not remove
         else:
             # TODO: Implement Me
-            curr = self.goal.score(board)
-            possible_actions = []
-            possible_scores = []
-            actions = [ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE,
-                       SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, COMBINE, PAINT]
-
-            # get self._difficulty number of random moves
-            while len(possible_actions) - 1 < self._difficulty:
-                m = _get_random_action(actions)
-                blocky = _get_random_blocky(board)
-                if self._check_action_validity(m, blocky):
-                    possible_actions.append((m, blocky))
-
-            # get score
-            for x in possible_actions:
-                blocky = x[-1]
-                possible_scores.append(self.goal.score(blocky))
-
-            # get max score
-            _max = max(possible_scores)
-            index = possible_scores.index(_max)
-
-            # if max score == current score: pass
-            if curr == _max:
-                self._proceed = False  # Must set to False before returning!
+            # evaluate self._difficulty different legal moves, or all of them
+            # if there are fewer, each with its own seed in case it is a smash
+            moves = list(iter_legal_paths(board, self.goal.colour))
+            moves = random.sample(moves, min(self._difficulty, len(moves)))
+            candidates = [(m[0], m[1], m[2], random.getrandbits(64))
+                          for m in moves]
+
+            if self._processes > 1 and self._pool is None:
+                self._pool = BoardPool(self._processes, board.max_depth)
+            scores = evaluate_candidates(board, self.goal, candidates,
+                                         self._pool)
+
+            # keep the first move with the highest score
+            best, best_score = None, self.goal.score(board)
+            for i, score in enumerate(scores):
+                if score is not None and score > best_score:
+                    best, best_score = i, score
+
+            self._proceed = False  # Must set to False before returning!
+            # if no move beats the current score: pass
+            if best is None:
                 return _create_move(PASS, board)
+            # else return the best move, seeding the random module so that a
+            # smash made with it once it is returned is the one that scored
+            action, direction, _, seed = candidates[best]
+            if (action, direction) == SMASH:
+                random.seed(seed)
+            return action, direction, moves[best][3]
+
+    def close(self) -> None:
+        """Shut down the processes this player evaluates moves on, if they
+        were started. They are started again if they are needed.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class _TreeNode:
+    """A node of the search tree of an MCTSPlayer, standing for the board
+    after the moves on the path to it from the root.
+
+    === Public Attributes ===
+    move:
+        The move that leads to this node from its parent, as an action, a
+        direction, the path to the block it is made on as returned by
+        block_path, and the seed a smash is made with, or None for the root.
+    parent:
+        The node this node's move is made from, or None for the root.
+    children:
+        The nodes of the moves from this node that have been tried.
+    untried:
+        The legal moves from this node that have no node yet, or None if
+        this node has not been visited.
+    visits:
+        The number of playouts that have been through this node.
+    total:
+        The sum of the rewards of those playouts.
+    """
+    move: Optional[Tuple[str, Optional[int], Tuple[int, ...], int]]
+    parent: Optional[_TreeNode]
+    children: List[_TreeNode]
+    untried: Optional[List[Tuple[str, Optional[int], Tuple[int, ...], int]]]
+    visits: int
+    total: float
+
+    def __init__(self, move: Optional[Tuple[str, Optional[int],
+                                            Tuple[int, ...], int]],
+                 parent: Optional[_TreeNode]) -> None:
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.total = 0.0
+
+
+class MCTSPlayer(Player):
+    # === Private Attributes ===
+    # _proceed:
+    #   True when the player should make a move, False when the player should
+    #   wait.
+    # _budget:
+    #   The number of milliseconds the player searches for each move.
+    # _exploration:
+    #   How much the search favours moves it has tried less, as a multiple of
+    #   the spread of the rewards seen so far.
+    # _playout_length:
+    #   The number of random moves made in each playout.
+    # ==================== Representation Invariants =====================
+    # _budget > 0
+    # _playout_length >= 0
+    """Computer player that chooses its move by Monte Carlo tree search.
+
+    Until its time budget for the move runs out, the player grows a tree of
+    sequences of its own moves with UCT, and finishes each sequence with a
+    playout of random moves chosen like a RandomPlayer's. The reward of a
+    playout is the best score, less the penalties of the moves made to reach
+    it, seen after any of its moves, since the player can always stop by
+    passing. The move from the root that was tried most often is made, unless
+    it does no better on average than passing.
+
+    === Public Attributes ===
+    playouts:
+        The number of playouts this player has made.
+    elapsed:
+        The number of seconds this player has spent searching.
+    """
+    playouts: int
+    elapsed: float
+    _proceed: bool
+    _budget: int
+    _exploration: float
+    _playout_length: int
+
+    def __init__(self, player_id: int, goal: Goal, budget: int,
+                 exploration: float = math.sqrt(2),
+                 playout_length: int = 1) -> None:
+        """Initialize this MCTSPlayer to search for <budget> milliseconds for
+        each move, with the UCT constant <exploration> and playouts of
+        <playout_length> random moves.
+        """
+        Player.__init__(self, player_id, goal)
+        self._proceed = False
+        self._budget = budget
+        self._exploration = exploration
+        self._playout_length = playout_length
+        self.playouts = 0
+        self.elapsed = 0.0
+
+    def get_selected_block(self, board: Block) -> Optional[Block]:
+        return None
+
+    def process_event(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self._proceed = True
+
+    def generate_move(self, board: Block) ->\
+            Optional[Tuple[str, Optional[int], Block]]:
+        """Return the valid move that the search finds best within the time
+        budget, or PASS if no move is expected to do better than passing.
+
+        This function does not mutate <board>.
+        """
+        if not self._proceed:
+            return None  # Do not remove
+
+        start = time.perf_counter()
+        deadline = start + self._budget / 1000
+        scratch = MoveEvaluator(board, self.goal)
+        base = self.goal.score(board)
+        root = _TreeNode(None, None)
+        # The lowest and highest rewards seen, which scale the exploration.
+        bounds = [base, base]
+
+        while True:
+            reward = self._search(scratch, root, base, bounds)
+            scratch.revert()
+            self.playouts += 1
+            bounds[0], bounds[1] = min(bounds[0], reward), \
+                max(bounds[1], reward)
+            if time.perf_counter() >= deadline:
+                break
+        self.elapsed += time.perf_counter() - start
+
+        self._proceed = False  # Must set to False before returning!
+        if not root.children:
+            return _create_move(PASS, board)
+        best = max(root.children, key=lambda child: (
+            child.visits, child.total / child.visits))
+        if best.total / best.visits <= base:
+            return _create_move(PASS, board)
+        action, direction, path, _ = best.move
+        return action, direction, block_at(board, path)
+
+    def playouts_per_second(self) -> float:
+        """Return the number of playouts this player has made per second
+        spent searching, or 0.0 if it has not searched.
+        """
+        if self.elapsed == 0.0:
+            return 0.0
+        return self.playouts / self.elapsed
+
+    def _search(self, scratch: MoveEvaluator, root: _TreeNode, base: int,
+                bounds: List[float]) -> float:
+        """Select a path down the tree from <root>, add a node to it, play
+        out from that node on the scratch board of <scratch>, and record the
+        reward in every node on the path. Return the reward.
+
+        The moves of the path and the playout are left made on <scratch>.
+        """
+        node = root
+        penalty = 0
+        # Select, while every move from the node has been tried.
+        while node.untried == [] and node.children:
+            node = self._select(node, bounds)
+            penalty += self._make(scratch, node.move)
+
+        # Expand, unless the node has no moves at all.
+        if node.untried is None:
+            moves = iter_legal_paths(scratch.current_board(), self.goal.colour)
+            node.untried = [(m[0], m[1], m[2], random.getrandbits(64))
+                            for m in moves]
+            random.shuffle(node.untried)
+        if node.untried:
+            child = _TreeNode(node.untried.pop(), node)
+            node.children.append(child)
+            node = child
+            penalty += self._make(scratch, node.move)
+
+        # Play out, keeping the best reward after any move.
+        reward = base if node is root else \
+            self.goal.score(scratch.current_board()) - penalty
+        for _ in range(self._playout_length):
+            move = _random_move(scratch.current_board(), self.goal.colour)
+            if move is None:
+                break
+            scratch.apply(move)
+            penalty += ACTION_PENALTY[(move[0], move[1])]
+            reward = max(reward,
+                         self.goal.score(scratch.current_board()) - penalty)
+
+        while node is not None:
+            node.visits += 1
+            node.total += reward
+            node = node.parent
+        return reward
+
+    def _select(self, node: _TreeNode, bounds: List[float]) -> _TreeNode:
+        """Return the child of <node> with the highest UCT value.
+        """
+        scale = self._exploration * max(1.0, bounds[1] - bounds[0])
+        log_visits = math.log(node.visits)
+        return max(node.children,
+                   key=lambda child: child.total / child.visits +
+                   scale * math.sqrt(log_visits / child.visits))
+
+    def _make(self, scratch: MoveEvaluator,
+              move: Tuple[str, Optional[int], Tuple[int, ...], int]) -> int:
+        """Make the tree move <move> on <scratch>, and return its penalty.
+        """
+        action, direction, path, seed = move
+        scratch.apply((action, direction,
+                       block_at(scratch.current_board(), path)),
+                      random.Random(seed))
+        return ACTION_PENALTY[(action, direction)]
+
+
+class _SearchTimeout(Exception):
+    """Raised when a LookaheadPlayer runs out of time in the middle of a
+    search."""
+
+
+# How the value stored in a transposition table entry relates to the true
+# value of the board: it is the value, at most the value, or at least it.
+_EXACT, _UPPER, _LOWER = 0, 1, 2
+
+# The key of a pass in a LookaheadPlayer's search.
+_PASS_KEY = (PASS[0], PASS[1], ())
+
+# The bytes an OrderedDict uses to hold each entry, apart from the key and
+# value themselves: its hash table slot and index, and the node linking the
+# entry into its order, with room for the table to grow. Measured with
+# tracemalloc as at most about 117 bytes on 64-bit CPython 3.
+_TABLE_ENTRY_OVERHEAD = 128
+
+
+def _entry_bytes(key: Tuple[int, int],
+                 entry: Tuple[int, float, int,
+                              Optional[Tuple[str, Optional[int],
+                                             Tuple[int, ...]]]]) -> int:
+    """Return an upper bound on the bytes used by a LookaheadPlayer's
+    transposition table to hold <entry> under <key>.
+
+    The depth, bound, and turn are small ints, and the action names are
+    strings, that Python shares between all the entries, so they are not
+    counted.
+    """
+    size = _TABLE_ENTRY_OVERHEAD + sys.getsizeof(key) + \
+        sys.getsizeof(key[0]) + sys.getsizeof(entry) + \
+        sys.getsizeof(entry[1])
+    if entry[3] is not None:
+        size += sys.getsizeof(entry[3]) + sys.getsizeof(entry[3][2])
+    return size
+
+
+class LookaheadPlayer(Player):
+    # === Private Attributes ===
+    # _proceed:
+    #   True when the player should make a move, False when the player should
+    #   wait.
+    # _budget:
+    #   The number of milliseconds the player searches for each move.
+    # _max_depth:
+    #   The most moves, across all players, the player looks ahead.
+    # _table_bytes:
+    #   The most bytes, as estimated by _entry_bytes, that <_table> may use.
+    # _table_used:
+    #   The bytes, as estimated by _entry_bytes, that <_table> uses.
+    # _players:
+    #   The players of the game, in the order they take turns.
+    # _table:
+    #   The transposition table, from the hash of a board and the index in
+    #   <_players> of the player to move to the depth searched, the value
+    #   found, how that value bounds the true value, and the key of the best
+    #   move. The least recently used entries are at the front.
+    # _killers:
+    #   For each ply of the search, the keys of the last two moves there that
+    #   caused a cutoff.
+    # _history:
+    #   For the key of each move that has caused a cutoff, how much it has
+    #   done so, weighted towards cutoffs found with deeper searches.
+    # _scratch:
+    #   The evaluator the current search makes moves on a copy of the board
+    #   with.
+    # _deadline:
+    #   The time, from time.perf_counter, at which the current search stops.
+    # _best:
+    #   The key of the best move found at the root by the last search.
+    # ==================== Representation Invariants =====================
+    # _budget > 0
+    # _max_depth >= 1
+    # _table_used <= _table_bytes
+    """Computer player that chooses its move by looking ahead over the moves
+    of every player.
+
+    The search is paranoid alpha-beta: the player assumes that every other
+    player moves to minimize this player's score, less this player's
+    penalties. It deepens one move at a time until its time budget for the
+    move runs out, and makes the best move of the deepest search that
+    finished. Values found are kept from move to move in a transposition
+    table that forgets the least recently used entries once the memory it
+    uses, estimated with sys.getsizeof, would go over its limit. An entry is
+    estimated at under 500 bytes on boards with a max_depth of up to 6, so
+    the default limit of 32 MiB holds at least 65 thousand entries.
+    Moves are tried in order: the best move from the table, then the killer
+    moves of the ply, then the moves with the most history of cutoffs.
+
+    A move is named by its action, its direction, and the path to its block
+    as returned by block_path. A smash is made with a random.Random seeded
+    from the board and the path, so the same smash always makes the same
+    board during a search. Boards are told apart by their zobrist hash, or,
+    on boards that cannot be hashed with zobrist, such as a LinearBlock, by
+    the board encoded by encode_board, read as an int.
+
+    === Public Attributes ===
+    depth:
+        The depth of the deepest search that finished for the last move.
+    nodes:
+        The number of boards searched for the last move.
+    """
+    depth: int
+    nodes: int
+    _proceed: bool
+    _budget: int
+    _max_depth: int
+    _table_bytes: int
+    _table_used: int
+    _players: List[Player]
+    _table: OrderedDict
+    _killers: Dict[int, List[Tuple[str, Optional[int], Tuple[int, ...]]]]
+    _history: Dict[Tuple[str, Optional[int], Tuple[int, ...]], int]
+    _scratch: Optional[MoveEvaluator]
+    _deadline: float
+    _best: Optional[Tuple[str, Optional[int], Tuple[int, ...]]]
+
+    def __init__(self, player_id: int, goal: Goal, budget: int = 1000,
+                 max_depth: int = 3, table_bytes: int = 32 * 2 ** 20) -> None:
+        """Initialize this LookaheadPlayer to search for <budget> milliseconds
+        and at most <max_depth> moves ahead for each move, keeping at most
+        <table_bytes> bytes of entries in its transposition table.
+
+        Until set_players is called, this player looks ahead as if it were
+        playing alone.
+        """
+        Player.__init__(self, player_id, goal)
+        self._proceed = False
+        self._budget = budget
+        self._max_depth = max_depth
+        self._table_bytes = table_bytes
+        self._table_used = 0
+        self._players = [self]
+        self._table = OrderedDict()
+        self._killers = {}
+        self._history = {}
+        self._scratch = None
+        self._deadline = 0.0
+        self._best = None
+        self.depth = 0
+        self.nodes = 0
+
+    def set_players(self, players: List[Player]) -> None:
+        """Look ahead over the moves of <players>, in the order they take
+        turns.
+        """
+        self._players = players
+        self._clear_table()
+
+    def get_selected_block(self, board: Block) -> Optional[Block]:
+        return None
+
+    def process_event(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self._proceed = True
+
+    def generate_move(self, board: Block) ->\
+            Optional[Tuple[str, Optional[int], Block]]:
+        """Return the best move found by searching deeper and deeper until
+        the time budget runs out, or PASS if no move is better.
+
+        This function does not mutate <board>.
+        """
+        if not self._proceed:
+            return None  # Do not remove
 
-            # else return action with max score
+        self._deadline = time.perf_counter() + self._budget / 1000
+        self._scratch = MoveEvaluator(board, self.goal)
+        self._killers = {}
+        self._history = {}
+        self.depth = 0
+        self.nodes = 0
+        turn = self._players.index(self)
+
+        best = None
+        try:
+            for depth in range(1, self._max_depth + 1):
+                self._best = None
+                self._search(depth, turn, -math.inf, math.inf, 0)
+                best, self.depth = self._best, depth
+        except _SearchTimeout:
+            self._scratch.revert()
+        self._scratch = None
+
+        self._proceed = False  # Must set to False before returning!
+        if best is None or best == _PASS_KEY:
+            return _create_move(PASS, board)
+        return best[0], best[1], block_at(board, best[2])
+
+    def _search(self, depth: int, turn: int, alpha: float, beta: float,
+                ply: int) -> float:
+        """Return the value to this player of the scratch board when player
+        <turn> is to move, searching <depth> more moves, where values at most
+        <alpha> or at least <beta> need not be exact.
+
+        Precondition: depth >= 1
+
+        The value is this player's score once the moves are made, less the
+        penalties of this player's moves. <ply> is the number of moves made
+        since the root of the search.
+        """
+        if time.perf_counter() >= self._deadline:
+            raise _SearchTimeout
+        self.nodes += 1
+        key = (self._board_key(), turn)
+        best_key = None
+        if key in self._table:
+            self._table.move_to_end(key)
+            stored_depth, value, bound, best_key = self._table[key]
+            if stored_depth >= depth and ply > 0:
+                if bound == _EXACT:
+                    return value
+                elif bound == _LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        original_alpha, original_beta = alpha, beta
+        player = self._players[turn]
+        maximising = player is self
+        best = -math.inf if maximising else math.inf
+        best_move = None
+        for move_key, block in self._ordered_moves(player, ply, best_key):
+            # The deadline is checked before each move as well, since the
+            # boards after the last move are scored without calling _search.
+            if time.perf_counter() >= self._deadline:
+                raise _SearchTimeout
+            checkpoint = self._scratch.checkpoint()
+            penalty = 0
+            if move_key != _PASS_KEY:
+                self._make(move_key, block, player)
+                if maximising:
+                    penalty = ACTION_PENALTY[(move_key[0], move_key[1])]
+            if depth == 1:
+                # The boards after the last move are scored here rather than
+                # searched, since they are most of the boards searched.
+                self.nodes += 1
+                value = self.goal.score(self._scratch.current_board()) - \
+                    penalty
+            else:
+                value = self._search(depth - 1,
+                                     (turn + 1) % len(self._players),
+                                     alpha + penalty, beta + penalty,
+                                     ply + 1) - penalty
+            self._scratch.revert(checkpoint)
+
+            if (maximising and value > best) or \
+                    (not maximising and value < best):
+                best, best_move = value, move_key
+            if maximising:
+                alpha = max(alpha, value)
             else:
-                self._proceed = False  # Must set to False before returning!
-                return _create_move(possible_actions[index][0], board)
+                beta = min(beta, value)
+            if alpha >= beta:
+                self._record_cutoff(move_key, depth, ply)
+                break
+
+        if best <= original_alpha:
+            bound = _UPPER
+        elif best >= original_beta:
+            bound = _LOWER
+        else:
+            bound = _EXACT
+        self._store(key, (depth, best, bound, best_move))
+
+        if ply == 0:
+            self._best = best_move
+        return best
+
+    def _clear_table(self) -> None:
+        """Forget every entry of the transposition table.
+        """
+        self._table.clear()
+        self._table_used = 0
+
+    def _store(self, key: Tuple[int, int],
+               entry: Tuple[int, float, int,
+                            Optional[Tuple[str, Optional[int],
+                                           Tuple[int, ...]]]]) -> None:
+        """Store <entry> under <key> in the transposition table as its most
+        recently used entry, forgetting the least recently used entries while
+        the table is over its limit.
+        """
+        if key in self._table:
+            self._table_used -= _entry_bytes(key, self._table[key])
+        self._table[key] = entry
+        self._table.move_to_end(key)
+        self._table_used += _entry_bytes(key, entry)
+        while self._table_used > self._table_bytes and self._table:
+            old_key, old_entry = self._table.popitem(last=False)
+            self._table_used -= _entry_bytes(old_key, old_entry)
+
+    def _ordered_moves(self, player: Player, ply: int,
+                       best_key: Optional[Tuple[str, Optional[int],
+                                                Tuple[int, ...]]]) \
+            -> List[Tuple[Tuple[str, Optional[int], Tuple[int, ...]], Block]]:
+        """Return the key and block of every legal move of <player> on the
+        scratch board, and of a pass, in the order they should be searched at
+        <ply>, where <best_key> is the best move found there before, if any.
+        """
+        board = self._scratch.current_board()
+        moves = [((m[0], m[1], m[2]), m[3])
+                 for m in iter_legal_paths(board, player.goal.colour)]
+        moves.append((_PASS_KEY, board))
+        killers = self._killers.get(ply, [])
+        moves.sort(key=lambda m: (m[0] != best_key, m[0] not in killers,
+                                  -self._history.get(m[0], 0)))
+        return moves
+
+    def _record_cutoff(self, move_key: Tuple[str, Optional[int],
+                                             Tuple[int, ...]],
+                       depth: int, ply: int) -> None:
+        """Remember that the move with <move_key> caused a cutoff at <ply>,
+        with <depth> moves left to search.
+        """
+        killers = self._killers.setdefault(ply, [])
+        if move_key not in killers:
+            killers.insert(0, move_key)
+            del killers[2:]
+        self._history[move_key] = self._history.get(move_key, 0) + \
+            depth * depth
+
+    def _board_key(self) -> int:
+        """Return the hash the scratch board is told apart from other boards
+        by.
+        """
+        board = self._scratch.current_board()
+        if hasattr(board, 'zobrist'):
+            return board.zobrist()
+        # A leading 1 byte keeps encodings that start with zero bytes apart.
+        return int.from_bytes(b'\x01' + encode_board(board), 'big')
+
+    def _make(self, move_key: Tuple[str, Optional[int], Tuple[int, ...]],
+              block: Block, player: Player) -> None:
+        """Make the move with <move_key> on <block> of the scratch board for
+        <player>.
+        """
+        rng = None
+        if (move_key[0], move_key[1]) == SMASH:
+            rng = random.Random(hash((self._board_key(), move_key[2])))
+        self._scratch.apply((move_key[0], move_key[1], block), rng,
+                            player.goal.colour)
 
 
 if __name__ == '__main__':
@@ -403,7 +1009,8 @@ if __name__ == '__main__':
         'allowed-io': ['process_event'],
         'allowed-import-modules': [
             'doctest', 'python_ta', 'random', 'typing', 'actions', 'block',
-            'goal', 'pygame', '__future__'
+            'goal', 'pygame', '__future__', 'search', 'math', 'time',
+            'collections', 'sys', 'board_io'
         ],
         'max-attributes': 10,
         'generated-members': 'pygame.*'
@@ -0,0 +1,506 @@
+"""CSC148 Assignment 2
+
+=== CSC148 Winter 2020 ===
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+Authors: Diane Horton, David Liu, Mario Badr, Sophia Huynh, Misha Schwartz,
+and Jaisie Sin
+
+All of the files in this directory and all subdirectories are:
+Copyright (c) Diane Horton, David Liu, Mario Badr, Sophia Huynh,
+Misha Schwartz, and Jaisie Sin
+
+=== Module Description ===
+
+This file contains the tools computer players use to search for moves:
+iter_legal_moves, which lists the moves that can be made on a board, the
+MoveEvaluator class, which finds out what moves would score without changing
+the board being played on, and evaluate_candidates, which does the same for
+many moves at once, optionally spread over a BoardPool of processes.
+"""
+from __future__ import annotations
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import RawArray
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, \
+    Tuple
+
+from block import Block, _majority_colour
+from board_io import decode_board, encode_board, max_encoded_size
+from goal import Goal
+from settings import colour_index
+
+from actions import ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE, \
+    SWAP_HORIZONTAL, SWAP_VERTICAL, SMASH, PAINT, COMBINE
+
+
+def apply_move(move: Tuple[str, Optional[int], Block],
+               colour: Tuple[int, int, int],
+               rng: Optional[random.Random] = None) -> bool:
+    """Make <move> on the block it names, painting with <colour> if it is a
+    paint and smashing with <rng> if it is a smash.
+
+    Return True iff the move was successful. A pass is never successful here,
+    since it does not change the board.
+    """
+    action, block = (move[0], move[1]), move[2]
+    if action in (ROTATE_CLOCKWISE, ROTATE_COUNTER_CLOCKWISE):
+        return block.rotate(move[1])
+    elif action in (SWAP_HORIZONTAL, SWAP_VERTICAL):
+        return block.swap(move[1])
+    elif action == SMASH:
+        return block.smash(rng)
+    elif action == PAINT:
+        return block.paint(colour)
+    elif action == COMBINE:
+        return block.combine()
+    return False
+
+
+def _same_blocks(a: Block, b: Block) -> bool:
+    """Return True iff <a> and <b> have the same shape and colours, wherever
+    they are on the board.
+
+    The hashes are compared first if <a> and <b> can be hashed with zobrist,
+    so most blocks that differ are told apart without walking them.
+
+    Precondition: <a> and <b> are at the same level.
+    """
+    if hasattr(a, 'zobrist') and a.zobrist() != b.zobrist():
+        return False
+    for x, y in zip(a.iter_nodes(), b.iter_nodes()):
+        if len(x.children) != len(y.children) or \
+                x.colour_index != y.colour_index:
+            return False
+    return True
+
+
+def _block_in_place(board: Block, block: Block) -> Block:
+    """Return the block of <board> at the same position and level as <block>.
+
+    Precondition: <board> has a block at that position and level.
+    """
+    x, y = block.position
+    while board.level < block.level:
+        size = board._child_size()
+        i = (1, 0, 2, 3)[(y >= board.position[1] + size) * 2 +
+                         (x >= board.position[0] + size)]
+        board = board.children[i]
+    return board
+
+
+def iter_legal_moves(board: Block, colour: Tuple[int, int, int]) \
+        -> Iterator[Tuple[str, Optional[int], Block]]:
+    """Yield every move other than a pass that would be successful on a block
+    of <board>, painting with <colour>, in one pre-order walk of <board>.
+
+    Moves that are known to leave the board exactly as it was are left out:
+    rotating a block whose children are leaves of one colour, swapping halves
+    that are the same, and painting a block that is already <colour>.
+    """
+    for action, direction, _, block in iter_legal_paths(board, colour):
+        yield action, direction, block
+
+
+def iter_legal_paths(board: Block, colour: Tuple[int, int, int]) \
+        -> Iterator[Tuple[str, Optional[int], Tuple[int, ...], Block]]:
+    """Yield the same moves as iter_legal_moves(<board>, <colour>), in the
+    same order, each as its action, its direction, the indices of the
+    children to follow from <board> to its block, and its block.
+
+    The paths are built during the walk, which is much faster than calling
+    block_path for each move.
+    """
+    target = colour_index(colour)
+    stack = [(board, ())]
+    while stack:
+        block, path = stack.pop()
+        children = block.children
+        if not children:
+            if block.level < block.max_depth:
+                yield SMASH[0], SMASH[1], path, block
+            elif block.colour_index != target:
+                yield PAINT[0], PAINT[1], path, block
+            continue
+
+        if any(child.children for child in children) or \
+                len({child.colour_index for child in children}) > 1:
+            yield ROTATE_CLOCKWISE[0], ROTATE_CLOCKWISE[1], path, block
+            yield ROTATE_COUNTER_CLOCKWISE[0], ROTATE_COUNTER_CLOCKWISE[1], \
+                path, block
+        # The children are ordered upper-right, upper-left, lower-left,
+        # lower-right, so a horizontal swap exchanges 0 with 1 and 2 with 3,
+        # and a vertical swap exchanges 0 with 3 and 1 with 2.
+        if not (_same_blocks(children[0], children[1]) and
+                _same_blocks(children[2], children[3])):
+            yield SWAP_HORIZONTAL[0], SWAP_HORIZONTAL[1], path, block
+        if not (_same_blocks(children[0], children[3]) and
+                _same_blocks(children[1], children[2])):
+            yield SWAP_VERTICAL[0], SWAP_VERTICAL[1], path, block
+        if block.level == block.max_depth - 1 and _majority_colour(
+                [child.colour_index for child in children]) is not None:
+            yield COMBINE[0], COMBINE[1], path, block
+        stack.extend((children[i], path + (i,)) for i in range(3, -1, -1))
+
+
+class MoveEvaluator:
+    """Scores moves by what a goal would score on the whole board after them.
+
+    Each move is made on a scratch copy of the board, the scratch board is
+    scored, and then the move is rolled back, so the board being played on is
+    never changed. The scratch board is copied once, when the evaluator is
+    made, so evaluating a move only allocates what the move itself does.
+
+    A board that cannot record its moves with checkpoint, such as a
+    LinearBlock or a LazyBlock, is copied again for each move instead, and the
+    move is made on the block of that copy in the same place. The evaluator
+    has its own checkpoint and revert, so a search can make and undo moves
+    on either kind of board.
+
+    === Public Attributes ===
+    board:
+        The scratch board that moves are evaluated on. The moves passed to
+        this evaluator must name blocks of this board.
+    goal:
+        The goal that moves are scored by.
+    evaluations:
+        The number of moves this evaluator has evaluated.
+    elapsed:
+        The number of seconds this evaluator has spent evaluating moves.
+    """
+    board: Block
+    goal: Goal
+    evaluations: int
+    elapsed: float
+
+    # === Private Attributes ===
+    # _checkpoint:
+    #   The checkpoint of <board> before any move was made on it, or None if
+    #   <board> cannot record its moves.
+    # _moved:
+    #   The copy of <board> that moves have been made on since the last
+    #   revert, or None if there is none. Only used when <_checkpoint> is None.
+    # _saved:
+    #   The value of <_moved> at each checkpoint that has not been reverted
+    #   past. Only used when <_checkpoint> is None.
+    # _shared:
+    #   True iff <_moved> may be in <_saved>, so it must be copied before the
+    #   next move is made on it.
+    _checkpoint: Optional[int]
+    _moved: Optional[Block]
+    _saved: List[Optional[Block]]
+    _shared: bool
+
+    def __init__(self, board: Block, goal: Goal) -> None:
+        """Initialize this MoveEvaluator to score moves on a copy of <board>
+        by <goal>.
+        """
+        self.board = board.create_copy()
+        self.goal = goal
+        self.evaluations = 0
+        self.elapsed = 0.0
+        self._checkpoint = None
+        self._moved = None
+        self._saved = []
+        self._shared = False
+        if hasattr(self.board, 'checkpoint'):
+            self._checkpoint = self.board.checkpoint()
+
+    def apply(self, move: Tuple[str, Optional[int], Block],
+              rng: Optional[random.Random] = None,
+              colour: Optional[Tuple[int, int, int]] = None) -> bool:
+        """Make <move> on the scratch board, smashing with <rng> if it is a
+        smash, and return True iff it was successful.
+
+        A paint is made with <colour>, or with the colour of the goal if
+        <colour> is None. The move stays made until revert is called.
+        """
+        if colour is None:
+            colour = self.goal.colour
+        if self._checkpoint is not None:
+            return apply_move(move, colour, rng)
+
+        if self._moved is None or self._shared:
+            self._moved = self.current_board().create_copy()
+            self._shared = False
+        block = _block_in_place(self._moved, move[2])
+        return apply_move((move[0], move[1], block), colour, rng)
+
+    def current_board(self) -> Block:
+        """Return the scratch board with the moves made since the last revert,
+        which is <board> unless <board> cannot record its moves.
+        """
+        return self.board if self._moved is None else self._moved
+
+    def checkpoint(self) -> int:
+        """Return a checkpoint that revert can undo the moves made after it
+        back to.
+        """
+        if self._checkpoint is not None:
+            return self.board.checkpoint()
+        self._saved.append(self._moved)
+        self._shared = True
+        return len(self._saved) - 1
+
+    def revert(self, checkpoint: Optional[int] = None) -> None:
+        """Undo every move made on the scratch board since <checkpoint> was
+        returned by this evaluator, or since this evaluator was made if
+        <checkpoint> is None.
+
+        Checkpoints returned after <checkpoint> can no longer be reverted to.
+        """
+        if self._checkpoint is not None:
+            self.board.rollback(self._checkpoint if checkpoint is None
+                                else checkpoint)
+        elif checkpoint is None:
+            self._moved = None
+            self._saved = []
+        else:
+            self._moved = self._saved[checkpoint]
+            del self._saved[checkpoint + 1:]
+            self._shared = True
+
+    def evaluate(self, move: Tuple[str, Optional[int], Block],
+                 rng: Optional[random.Random] = None) -> Optional[int]:
+        """Return the score of the scratch board after <move>, or None if the
+        move is not successful.
+
+        The scratch board is left as it was.
+        """
+        start = time.perf_counter()
+        score = None
+        if self.apply(move, rng):
+            score = self.goal.score(self.current_board())
+        self.revert()
+        self.evaluations += 1
+        self.elapsed += time.perf_counter() - start
+        return score
+
+    def best_move(self, moves: Iterable[Tuple[str, Optional[int], Block]]) \
+            -> Tuple[Optional[Tuple[str, Optional[int], Block]],
+                     Optional[int]]:
+        """Return the successful move in <moves> with the highest score and its
+        score, or (None, None) if none of <moves> is successful.
+
+        Of moves with the same score, the first one is returned. Only the best
+        move so far is kept, so <moves> can be generated as they are needed.
+        """
+        best, best_score = None, None
+        for move in moves:
+            score = self.evaluate(move)
+            if score is not None and \
+                    (best_score is None or score > best_score):
+                best, best_score = move, score
+        return best, best_score
+
+    def evaluations_per_second(self) -> float:
+        """Return the number of moves this evaluator has evaluated per second
+        spent evaluating them, or 0.0 if it has evaluated none.
+        """
+        if self.elapsed == 0.0:
+            return 0.0
+        return self.evaluations / self.elapsed
+
+
+def block_path(block: Block) -> Tuple[int, ...]:
+    """Return the indices of the children to follow from the root of the
+    board <block> is on to reach <block>.
+    """
+    path = []
+    while block._parent is not None:
+        parent = block._parent
+        path.append(next(i for i in range(4) if parent.children[i] is block))
+        block = parent
+    path.reverse()
+    return tuple(path)
+
+
+def block_at(board: Block, path: Tuple[int, ...]) -> Block:
+    """Return the block of <board> reached by following the children at the
+    indices in <path>, as returned by block_path.
+    """
+    for i in path:
+        board = board.children[i]
+    return board
+
+
+# The length of the encoded board at the start of the buffer of a BoardPool.
+_LENGTH = struct.Struct('<I')
+
+# In each worker process of a BoardPool, the buffer the pool writes its boards
+# to, and the MoveEvaluator of the last board it read from the buffer, keyed
+# by the number of boards written before it. A worker is sent only that number
+# with every batch of candidates in a turn, and only decodes the board once.
+_WORKER_BUFFER: List[Any] = []
+_WORKER_EVALUATORS: Dict[int, MoveEvaluator] = {}
+
+
+class BoardPool:
+    """A pool of worker processes that evaluate_candidates spreads candidates
+    over.
+
+    Each board whose candidates are evaluated is written once, in the compact
+    format of encode_board, to a buffer in memory shared with the workers,
+    rather than being sent with every batch of candidates.
+
+    === Public Attributes ===
+    processes:
+        The number of worker processes.
+    max_depth:
+        The largest max_depth of a board that fits in the buffer.
+    """
+    processes: int
+    max_depth: int
+
+    # === Private Attributes ===
+    # _buffer:
+    #   The shared memory that boards are written to, as the length of the
+    #   encoded board followed by the encoded board.
+    # _written:
+    #   The number of boards written to <_buffer> so far.
+    # _executor:
+    #   The worker processes.
+    _buffer: Any
+    _written: int
+    _executor: ProcessPoolExecutor
+
+    def __init__(self, processes: int, max_depth: int) -> None:
+        """Initialize this BoardPool with <processes> worker processes, for
+        boards with a max_depth of at most <max_depth>.
+        """
+        self.processes = processes
+        self.max_depth = max_depth
+        self._buffer = RawArray('B', _LENGTH.size +
+                                max_encoded_size(max_depth))
+        self._written = 0
+        self._executor = ProcessPoolExecutor(processes,
+                                             initializer=_init_worker,
+                                             initargs=(self._buffer,))
+
+    def write(self, board: Block) -> int:
+        """Write <board> to the buffer shared with the workers, and return
+        the number the workers know it by.
+
+        Precondition: <board> is at level 0, its max_depth is at most
+        <max_depth>, and no batch is being evaluated.
+        """
+        data = encode_board(board)
+        view = memoryview(self._buffer).cast('B')
+        _LENGTH.pack_into(view, 0, len(data))
+        view[_LENGTH.size:_LENGTH.size + len(data)] = data
+        self._written += 1
+        return self._written
+
+    def map(self, fn: Callable, *iterables: Iterable) -> Iterator:
+        """Return the results of calling <fn> on the items of <iterables> in
+        the worker processes, in order, as Executor.map does.
+        """
+        return self._executor.map(fn, *iterables)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, once they have finished what they were
+        given.
+        """
+        self._executor.shutdown()
+
+
+def _init_worker(buffer: Any) -> None:
+    """Keep the shared <buffer> of the BoardPool this worker process belongs
+    to.
+    """
+    _WORKER_BUFFER.append(buffer)
+
+
+def _read_board(buffer: Any) -> Block:
+    """Return the board last written to the shared <buffer> of a BoardPool.
+    """
+    view = memoryview(buffer).cast('B')
+    length = _LENGTH.unpack_from(view)[0]
+    return decode_board(bytes(view[_LENGTH.size:_LENGTH.size + length]))
+
+
+def _evaluate_shared(number: int, goal: Goal,
+                     candidates: List[Tuple[str, Optional[int],
+                                            Tuple[int, ...], int]]) \
+        -> List[Optional[int]]:
+    """Return the score of each of <candidates> on board <number> of the
+    BoardPool this worker process belongs to.
+    """
+    if number not in _WORKER_EVALUATORS:
+        _WORKER_EVALUATORS.clear()
+        _WORKER_EVALUATORS[number] = \
+            MoveEvaluator(_read_board(_WORKER_BUFFER[0]), goal)
+    evaluator = _WORKER_EVALUATORS[number]
+    evaluator.goal = goal
+    return _evaluate_all(evaluator, candidates)
+
+
+def _evaluate_all(evaluator: MoveEvaluator,
+                  candidates: List[Tuple[str, Optional[int],
+                                         Tuple[int, ...], int]]) \
+        -> List[Optional[int]]:
+    """Return the score <evaluator> gives each of <candidates>.
+    """
+    return [evaluator.evaluate((action, direction,
+                                block_at(evaluator.board, path)),
+                               random.Random(seed))
+            for action, direction, path, seed in candidates]
+
+
+def evaluate_candidates(board: Block, goal: Goal,
+                        candidates: List[Tuple[str, Optional[int],
+                                               Tuple[int, ...], int]],
+                        pool: Optional[BoardPool] = None) \
+        -> List[Optional[int]]:
+    """Return what <goal> would score on <board> after each of <candidates>,
+    or None for a candidate that would not be successful, without changing
+    <board>.
+
+    A candidate is an action, a direction, the path from the root of <board>
+    to the block it is made on as returned by block_path, and a seed. If the
+    action is a smash, the block is smashed with a random.Random made from
+    the seed, so every candidate scores the same every time it is evaluated.
+
+    If <pool> is given, the candidates are split into a batch for each of
+    its processes. <board> is written to the pool once, and each batch is
+    sent with only its number. The scores are the same as evaluating every
+    candidate here.
+
+    Preconditions:
+        - <board> is at level 0
+        - <pool> is None or <board>.max_depth <= <pool>.max_depth
+    """
+    if pool is None or pool.processes <= 1 or len(candidates) <= 1:
+        return _evaluate_all(MoveEvaluator(board, goal), candidates)
+
+    number = pool.write(board)
+    size = -(-len(candidates) // pool.processes)
+    batches = [candidates[i:i + size]
+               for i in range(0, len(candidates), size)]
+    scores = []
+    for batch_scores in pool.map(_evaluate_shared, [number] * len(batches),
+                                 [goal] * len(batches), batches):
+        scores.extend(batch_scores)
+    return scores
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-import-modules': [
+            'doctest', 'python_ta', 'random', 'typing', '__future__', 'time',
+            'concurrent.futures', 'block', 'board_io', 'goal', 'settings',
+            'actions', 'struct', 'multiprocessing'
+        ],
+        'max-attributes': 15
+    })
@@ -35,6 +35,7 @@ TEMPTING_TURQUOISE = (75, 196, 213)
 
 # A pallette of the colours we use in the game
 COLOUR_LIST = [PACIFIC_POINT, REAL_RED, OLD_OLIVE, DAFFODIL_DELIGHT]
+_COLOUR_INDEX = {colour: i for i, colour in enumerate(COLOUR_LIST)}
 
 # The game board will be a square with this size.
 BOARD_SIZE = 750
@@ -56,6 +57,22 @@ HIGHLIGHT_THICKNESS = 5
 ANIMATION_DURATION = 1
 
 
+def colour_index(colour: Tuple[int, int, int]) -> int:
+    """Return the index of this colour value in COLOUR_LIST.
+
+    Inside the game, colours are stored as these indices, and only turned back
+    into colour values when they are drawn.
+
+    Raise ValueError if this colour value isn't in our colour list.
+
+    >>> colour_index(REAL_RED)
+    1
+    """
+    if colour not in _COLOUR_INDEX:
+        raise ValueError(f'{colour} is not in COLOUR_LIST')
+    return _COLOUR_INDEX[colour]
+
+
 def colour_name(colour: Tuple[int, int, int]) -> str:
     """Return the colour name associated with this colour value, or the empty
     string if this colour value isn't in our colour list.